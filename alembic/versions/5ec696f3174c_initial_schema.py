@@ -20,13 +20,65 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Tables de départ (users, zones, sources, indicators) : une base déjà
+    # créée par create_all puis "stampée" à cette révision ne la rejoue pas.
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table(
+        'zones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('postal_code', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_zones_id', 'zones', ['id'], unique=False)
+
+    op.create_table(
+        'sources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('url', sa.String(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sources_id', 'sources', ['id'], unique=False)
+
+    op.create_table(
+        'indicators',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('unit', sa.String(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('zone_id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('extra_data', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['zone_id'], ['zones.id']),
+        sa.ForeignKeyConstraint(['source_id'], ['sources.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_indicators_id', 'indicators', ['id'], unique=False)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index('ix_indicators_id', table_name='indicators')
+    op.drop_table('indicators')
+    op.drop_index('ix_sources_id', table_name='sources')
+    op.drop_table('sources')
+    op.drop_index('ix_zones_id', table_name='zones')
+    op.drop_table('zones')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,54 @@
+"""indicator timeseries indexes
+
+Revision ID: 9b1f3c2d7a41
+Revises: 5ec696f3174c
+Create Date: 2026-10-17 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f3c2d7a41'
+down_revision: Union[str, Sequence[str], None] = '5ec696f3174c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # if_not_exists : app.main fait aussi un create_all au démarrage,
+    # les index peuvent donc déjà exister sur une base en service.
+    op.create_index(
+        'ix_indicators_type_zone_timestamp',
+        'indicators',
+        ['type', 'zone_id', 'timestamp'],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_indicators_source_timestamp',
+        'indicators',
+        ['source_id', 'timestamp'],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_indicators_timestamp',
+        'indicators',
+        ['timestamp'],
+        unique=False,
+        if_not_exists=True,
+    )
+    # Met à jour les statistiques du planificateur SQLite
+    op.execute('ANALYZE indicators')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_indicators_timestamp', table_name='indicators', if_exists=True)
+    op.drop_index('ix_indicators_source_timestamp', table_name='indicators', if_exists=True)
+    op.drop_index('ix_indicators_type_zone_timestamp', table_name='indicators', if_exists=True)
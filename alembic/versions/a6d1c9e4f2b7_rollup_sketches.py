@@ -0,0 +1,112 @@
+"""rollup sketches (sum of squares + value histogram bins)
+
+Revision ID: a6d1c9e4f2b7
+Revises: f3b8c6e1a9d4
+Create Date: 2026-10-17 19:40:00.000000
+
+"""
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1c9e4f2b7'
+down_revision: Union[str, Sequence[str], None] = 'f3b8c6e1a9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Format de stockage des DateTime SQLAlchemy sous SQLite, par granularité
+BUCKET_FORMATS = {
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000',
+    'month': '%Y-%m-01 00:00:00.000000',
+}
+
+# Copie figée de app.services.sketch.bin_of (précision relative de 1 %)
+_LOG_GAMMA = math.log(1.01 / 0.99)
+MIN_VALUE = 1e-9
+BIN_OFFSET = 2000
+
+
+def sketch_bin(value):
+    magnitude = abs(value)
+    if magnitude < MIN_VALUE:
+        return 0
+    k = math.ceil(math.log(magnitude) / _LOG_GAMMA) + BIN_OFFSET
+    return k if value > 0 else -k
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Base dont create_all (démarrage de l'API) a déjà créé le schéma courant
+    bind = op.get_bind()
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('indicator_rollups')}
+    if 'value_sumsq' not in columns:
+        op.add_column(
+            'indicator_rollups',
+            sa.Column('value_sumsq', sa.Float(), nullable=False, server_default='0'),
+        )
+    op.create_table(
+        'indicator_rollup_bins',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('zone_id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('bin', sa.Integer(), nullable=False),
+        sa.Column('value_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['source_id'], ['sources.id']),
+        sa.ForeignKeyConstraint(['zone_id'], ['zones.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ux_indicator_rollup_bins_key',
+        'indicator_rollup_bins',
+        ['granularity', 'type', 'zone_id', 'bucket_start', 'source_id', 'bin'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    # Rollups recalculés depuis les indicateurs déjà présents
+    # (sommes des carrés + cases d'histogramme)
+    bind.connection.driver_connection.create_function(
+        'sketch_bin', 1, sketch_bin, deterministic=True
+    )
+    op.execute('DELETE FROM indicator_rollups')
+    op.execute('DELETE FROM indicator_rollup_bins')
+    for granularity, fmt in BUCKET_FORMATS.items():
+        op.execute(
+            sa.text(
+                "INSERT INTO indicator_rollups "
+                "(granularity, type, zone_id, source_id, bucket_start, "
+                " value_sum, value_count, value_min, value_max, value_sumsq) "
+                "SELECT :granularity, type, zone_id, source_id, "
+                "       strftime(:fmt, timestamp) AS bucket, "
+                "       sum(value), count(*), min(value), max(value), sum(value * value) "
+                "FROM indicators "
+                "GROUP BY type, zone_id, source_id, bucket"
+            ).bindparams(granularity=granularity, fmt=fmt)
+        )
+        op.execute(
+            sa.text(
+                "INSERT INTO indicator_rollup_bins "
+                "(granularity, type, zone_id, source_id, bucket_start, bin, value_count) "
+                "SELECT :granularity, type, zone_id, source_id, "
+                "       strftime(:fmt, timestamp) AS bucket, sketch_bin(value) AS bin, count(*) "
+                "FROM indicators "
+                "GROUP BY type, zone_id, source_id, bucket, bin"
+            ).bindparams(granularity=granularity, fmt=fmt)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_indicator_rollup_bins_key', table_name='indicator_rollup_bins')
+    op.drop_table('indicator_rollup_bins')
+    with op.batch_alter_table('indicator_rollups') as batch_op:
+        batch_op.drop_column('value_sumsq')
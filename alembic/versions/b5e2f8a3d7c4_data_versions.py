@@ -0,0 +1,36 @@
+"""data versions (ETag)
+
+Revision ID: b5e2f8a3d7c4
+Revises: a6d1c9e4f2b7
+Create Date: 2026-10-17 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2f8a3d7c4'
+down_revision: Union[str, Sequence[str], None] = 'a6d1c9e4f2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Table vide : une portée sans ligne est en version 0
+    op.create_table(
+        'data_versions',
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('zone_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('type', 'zone_id'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_versions')
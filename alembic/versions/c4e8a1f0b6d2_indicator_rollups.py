@@ -0,0 +1,89 @@
+"""indicator rollups
+
+Revision ID: c4e8a1f0b6d2
+Revises: 9b1f3c2d7a41
+Create Date: 2026-10-17 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f0b6d2'
+down_revision: Union[str, Sequence[str], None] = '9b1f3c2d7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Format de stockage des DateTime SQLAlchemy sous SQLite, par granularité
+BUCKET_FORMATS = {
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000',
+    'month': '%Y-%m-01 00:00:00.000000',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    created_by_app = sa.inspect(bind).has_table('indicator_rollups')
+    op.create_table(
+        'indicator_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('zone_id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('value_count', sa.Integer(), nullable=False),
+        sa.Column('value_min', sa.Float(), nullable=False),
+        sa.Column('value_max', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['source_id'], ['sources.id']),
+        sa.ForeignKeyConstraint(['zone_id'], ['zones.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ux_indicator_rollups_key',
+        'indicator_rollups',
+        ['granularity', 'type', 'zone_id', 'bucket_start', 'source_id'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    if created_by_app:
+        # Tables du modèle courant (create_all au démarrage de l'API), avec
+        # des colonnes que cette révision ne connaît pas : calcul par
+        # app.services.rollups, seule définition de toutes les colonnes
+        from sqlalchemy.orm import Session
+
+        from app.services.rollups import rebuild_rollups
+
+        with Session(bind=bind) as db:
+            rebuild_rollups(db)
+        return
+
+    # Calcul initial depuis les indicateurs existants
+    op.execute('DELETE FROM indicator_rollups')
+    for granularity, fmt in BUCKET_FORMATS.items():
+        op.execute(
+            sa.text(
+                "INSERT INTO indicator_rollups "
+                "(granularity, type, zone_id, source_id, bucket_start, "
+                " value_sum, value_count, value_min, value_max) "
+                "SELECT :granularity, type, zone_id, source_id, "
+                "       strftime(:fmt, timestamp) AS bucket, "
+                "       sum(value), count(*), min(value), max(value) "
+                "FROM indicators "
+                "GROUP BY type, zone_id, source_id, bucket"
+            ).bindparams(granularity=granularity, fmt=fmt)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_indicator_rollups_key', table_name='indicator_rollups')
+    op.drop_table('indicator_rollups')
@@ -0,0 +1,66 @@
+"""indicator natural key
+
+Revision ID: e7a2d5b9c3f1
+Revises: c4e8a1f0b6d2
+Create Date: 2026-10-17 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2d5b9c3f1'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f0b6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Format de stockage des DateTime SQLAlchemy sous SQLite, par granularité
+BUCKET_FORMATS = {
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000',
+    'month': '%Y-%m-01 00:00:00.000000',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Dédoublonnage : pour chaque clé naturelle, on garde la ligne
+    # la plus récente (id max), comme le ferait un upsert.
+    op.execute(
+        "DELETE FROM indicators WHERE id NOT IN ("
+        "  SELECT max(id) FROM indicators"
+        "  GROUP BY type, zone_id, source_id, timestamp"
+        ")"
+    )
+    op.create_index(
+        'ux_indicators_natural_key',
+        'indicators',
+        ['type', 'zone_id', 'source_id', 'timestamp'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    # Les doublons supprimés étaient comptés dans les rollups
+    op.execute('DELETE FROM indicator_rollups')
+    for granularity, fmt in BUCKET_FORMATS.items():
+        op.execute(
+            sa.text(
+                "INSERT INTO indicator_rollups "
+                "(granularity, type, zone_id, source_id, bucket_start, "
+                " value_sum, value_count, value_min, value_max) "
+                "SELECT :granularity, type, zone_id, source_id, "
+                "       strftime(:fmt, timestamp) AS bucket, "
+                "       sum(value), count(*), min(value), max(value) "
+                "FROM indicators "
+                "GROUP BY type, zone_id, source_id, bucket"
+            ).bindparams(granularity=granularity, fmt=fmt)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Les doublons supprimés à l'upgrade ne sont pas restaurés
+    op.drop_index('ux_indicators_natural_key', table_name='indicators', if_exists=True)
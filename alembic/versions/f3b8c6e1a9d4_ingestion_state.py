@@ -0,0 +1,49 @@
+"""ingestion state (high-water marks)
+
+Revision ID: f3b8c6e1a9d4
+Revises: e7a2d5b9c3f1
+Create Date: 2026-10-17 18:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c6e1a9d4'
+down_revision: Union[str, Sequence[str], None] = 'e7a2d5b9c3f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Table vide : le premier passage de chaque ingestion la remplit
+    # (fenêtre par défaut, puis seulement les heures suivantes).
+    op.create_table(
+        'ingestion_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('zone_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('last_observed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['source_id'], ['sources.id']),
+        sa.ForeignKeyConstraint(['zone_id'], ['zones.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ux_ingestion_state_key',
+        'ingestion_state',
+        ['source_id', 'zone_id', 'type'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_ingestion_state_key', table_name='ingestion_state')
+    op.drop_table('ingestion_state')
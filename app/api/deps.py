@@ -14,61 +14,197 @@ def get_db() -> Generator:
 ## authentification dependencies 
 # app/api/deps.py
 
-from fastapi import Depends, HTTPException, status
+import time
+import zlib
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import ReadSessionLocal, SessionLocal
 from app.models.user import User
+from app.services import data_versions
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  
 
 
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Copie figée de l'utilisateur authentifié (mise en cache par token)."""
+    id: int
+    email: str
+    role: str
+    is_active: bool
 
-def get_db():
-    db = SessionLocal()
+
+# token -> (expiration du token, UserSnapshot)
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """À appeler quand un utilisateur est modifié ou supprimé."""
+    principal_cache.discard_where(lambda token, entry: entry[1].id == user_id)
+
+
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def get_db(request: Request):
+    # Routes de lecture -> moteur lecture seule ; mutations -> moteur d'écriture
+    # (c'est le même moteur avec le profil "default").
+    if request.method in READ_METHODS:
+        db = ReadSessionLocal()
+    else:
+        db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token invalide ou expiré.",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _cached_principal(token: str) -> UserSnapshot | None:
+    # Token déjà vu : ni décodage JWT ni requête SQL
+    cached = principal_cache.get(token)
+    if cached is not None and cached[0] > time.time():
+        return cached[1]
+    return None
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
 
-    user = db.query(User).filter(User.email == email).first()
 
+def _remember_principal(token: str, payload: dict, user: User | None) -> UserSnapshot:
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    snapshot = UserSnapshot(
+        id=user.id,
+        email=user.email,
+        role=user.role,
+        is_active=user.is_active,
+    )
+    principal_cache.set(token, (payload.get("exp", 0), snapshot))
+    return snapshot
 
-    return user
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> UserSnapshot:
+    snapshot = _cached_principal(token)
+    if snapshot is not None:
+        return snapshot
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
+    payload = _decode_token(token)
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    return _remember_principal(token, payload, user)
+
+
+async def get_async_db():
+    from app.db.async_session import get_async_sessionmaker
+
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    """Équivalent async de get_current_user (routes de lecture async)."""
+    snapshot = _cached_principal(token)
+    if snapshot is not None:
+        return snapshot
+
+    payload = _decode_token(token)
+    result = await db.execute(select(User).where(User.email == payload["sub"]))
+    return _remember_principal(token, payload, result.scalars().first())
+
+
+def get_current_admin(current_user: UserSnapshot = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=403, detail="Accès réservé aux administrateurs."
         )
     return current_user
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Comparaison faible : W/"x" et "x" désignent la même version
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _conditional(request: Request, response: Response, version: int) -> str:
+    # Version lue avant le calcul : une écriture concurrente change l'ETag suivant
+    url = f"{request.url.path}?{request.url.query}".encode()
+    etag = f'W/"{version}-{zlib.crc32(url):08x}"'
+    # no-cache : le navigateur garde la réponse mais revalide à chaque appel
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return etag
+
+
+def data_etag(
+    request: Request,
+    response: Response,
+    indicator_type: str | None = None,
+    zone_id: int | None = None,
+    db: Session = Depends(get_db),
+) -> str | None:
+    """
+    ETag des lectures d'indicateurs : version de la portée (type, zone),
+    lue en base (une requête), + empreinte de l'URL. If-None-Match
+    identique -> 304, avant tout calcul ou sérialisation. À déclarer
+    après la dépendance d'authentification.
+    """
+    if not settings.HTTP_ETAGS:
+        return None
+    return _conditional(request, response, data_versions.version(db, indicator_type, zone_id))
+
+
+async def data_etag_async(
+    request: Request,
+    response: Response,
+    indicator_type: str | None = None,
+    zone_id: int | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> str | None:
+    """Équivalent async de data_etag (routes de lecture async)."""
+    if not settings.HTTP_ETAGS:
+        return None
+    version = await db.scalar(data_versions.version_query(indicator_type, zone_id))
+    return _conditional(request, response, version or 0)
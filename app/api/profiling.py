@@ -0,0 +1,228 @@
+# app/api/profiling.py
+"""
+Profilage à la demande d'une requête, réservé aux admins.
+
+Avec l'en-tête `X-Profile: tree` (ou `folded`), la requête est exécutée
+normalement pendant qu'un thread échantillonne ses piles toutes les
+PROFILING_INTERVAL_MS ; la réponse est remplacée par le rapport (arbre
+d'appels en texte, ou piles "folded" pour flamegraph.pl / speedscope), le
+statut d'origine dans `X-Profile-Status`. Sans l'en-tête : une recherche
+dans les en-têtes, rien d'autre.
+
+Les piles retenues sont celles de la requête seule, même avec du trafic
+concurrent : boucle d'événements quand la coroutine de la requête s'exécute,
+threads du threadpool (routes et dépendances synchrones) quand ils exécutent
+une fonction dans le contexte de la requête (copié par anyio).
+"""
+
+import contextvars
+import inspect
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from app.api.deps import get_current_admin, get_current_user, get_db, oauth2_scheme
+
+HEADER = b"x-profile"
+FORMATS = ("tree", "folded")
+
+_session: contextvars.ContextVar["RequestSampler | None"] = contextvars.ContextVar(
+    "profiling_session", default=None
+)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    if "site-packages" in filename:
+        filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+    else:
+        for base in (ROOT_DIR, STDLIB_DIR):
+            if filename.startswith(base):
+                filename = os.path.relpath(filename, base)
+                break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+# Worker anyio : sa méthode `run` garde dans la variable locale `context`
+# le contexte copié de la requête qu'il exécute. Détail interne d'anyio :
+# s'il change, _worker_context renvoie None et le rapport ne contient plus
+# que les piles de la boucle d'événements (pas d'erreur).
+_WORKER_FUNCTION = "run"
+_WORKER_CONTEXT_LOCAL = "context"
+
+
+def _worker_context(frame) -> contextvars.Context | None:
+    if frame.f_code.co_name != _WORKER_FUNCTION:
+        return None
+    try:
+        context = frame.f_locals.get(_WORKER_CONTEXT_LOCAL)
+    except Exception:  # frame d'un autre thread : lecture au mieux
+        return None
+    return context if isinstance(context, contextvars.Context) else None
+
+
+def _is_idle(code) -> bool:
+    # Worker inoccupé : attente sur sa file de travail, ou signalement du résultat
+    filename = code.co_filename
+    return filename.endswith(("queue.py", "threading.py")) or f"{os.sep}asyncio{os.sep}" in filename
+
+
+class RequestSampler:
+    """Échantillonneur de piles d'une requête (voir la docstring du module)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.ticks = 0
+        self.root = None
+        self.started = self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self, root_frame) -> None:
+        self.root = root_frame
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self._sample(frame)
+
+    def _sample(self, frame) -> None:
+        stack = []
+        child = None
+        while frame is not None:
+            if frame is self.root:
+                self.stacks[("[boucle d'événements]", *reversed(stack))] += 1
+                return
+            context = _worker_context(frame)
+            if context is not None:
+                # Compte seulement si le worker exécute notre travail
+                if context.get(_session) is self and child is not None and not _is_idle(child.f_code):
+                    self.stacks[("[threadpool]", *reversed(stack))] += 1
+                return
+            stack.append(_label(frame.f_code))
+            child = frame
+            frame = frame.f_back
+
+    def folded(self) -> str:
+        """Une ligne par pile : `racine;appelant;appelé nombre`."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def tree(self, min_percent: float = 0.5) -> str:
+        """Arbre d'appels : part des échantillons de chaque nœud, enfants triés."""
+        root: dict = {}
+        for stack, count in self.stacks.items():
+            node = root
+            for label in stack:
+                entry = node.setdefault(label, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        sampled = sum(self.stacks.values())
+        lines = [
+            f"Durée {self.elapsed * 1000:.1f} ms, {self.ticks} ticks de {self.interval * 1000:g} ms, "
+            f"{sampled} échantillons de la requête "
+            f"(le reste : attente d'I/O ou du threadpool)",
+            "",
+        ]
+
+        def walk(node: dict, depth: int) -> None:
+            for label, (count, children) in sorted(node.items(), key=lambda item: -item[1][0]):
+                percent = count / max(self.ticks, 1) * 100
+                if percent < min_percent:
+                    continue
+                lines.append(f"{percent:5.1f}% {count:6d}  {'  ' * depth}{label}")
+                walk(children, depth + 1)
+
+        walk(root, 0)
+        return "\n".join(lines) + "\n"
+
+
+async def _check_admin(scope) -> None:
+    """
+    Mêmes règles que les routes : get_current_user puis get_current_admin,
+    avec la session de get_db (ou de sa surcharge dans dependency_overrides).
+    """
+    request = Request(scope)
+    token = await oauth2_scheme(request)
+    provider = request.app.dependency_overrides.get(get_db, get_db)
+    wants_request = "request" in inspect.signature(provider).parameters
+
+    def check() -> None:
+        sessions = provider(request) if wants_request else provider()
+        try:
+            get_current_admin(get_current_user(token, next(sessions)))
+        finally:
+            sessions.close()
+
+    await run_in_threadpool(check)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, interval_ms: float = 1.0):
+        self.app = app
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        for name, value in scope["headers"]:
+            if name == HEADER:
+                break
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        report_format = value.decode("latin-1").strip().lower() or "tree"
+        if report_format not in FORMATS:
+            response = JSONResponse({"detail": f"X-Profile : {' ou '.join(FORMATS)}"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        try:
+            await _check_admin(scope)
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def capture(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        sampler = RequestSampler(self.interval)
+        token = _session.set(sampler)
+        sampler.start(sys._getframe())
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            sampler.stop()
+            _session.reset(token)
+
+        body = sampler.folded() if report_format == "folded" else sampler.tree()
+        response = PlainTextResponse(body, headers={"X-Profile-Status": str(status)})
+        await response(scope, receive, send)
@@ -0,0 +1,50 @@
+# app/api/responses.py
+"""
+Chemin de réponse rapide des listes (/indicators/, /zones/, /sources/).
+
+Les routes lisent seulement les colonnes du schéma de lecture (select()
+de colonnes : ni instances ORM ni identity map), puis renvoient
+directement une RowsResponse. FastAPI ne revalide alors pas chaque ligne
+avec le response_model, qui sert seulement à la doc OpenAPI. Les valeurs
+viennent de colonnes typées et ont été validées à l'écriture.
+L'encodage utilise orjson s'il est installé, sinon json.
+"""
+
+import json
+from datetime import date, datetime
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optionnel : repli sur json (plus lent)
+    orjson = None
+
+
+def read_columns(model, schema) -> tuple:
+    """Colonnes de `model` lues par `schema`, dans l'ordre de ses champs."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def rows_as_dicts(rows, columns) -> list[dict]:
+    keys = [column.key for column in columns]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+class RowsResponse(Response):
+    """Réponse JSON sans validation pydantic, encodée avec orjson si possible."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
@@ -0,0 +1,276 @@
+# app/api/routes/async_reads.py
+"""
+Versions async (SQLAlchemy asyncio + aiosqlite) des routes de lecture
+les plus sollicitées. Incluses avant les routes sync quand
+DB_ASYNC_READS est activé : elles tournent dans la boucle d'événements
+au lieu d'occuper un thread du threadpool de Starlette.
+"""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import data_etag_async, get_async_db, get_current_user_async
+from app.api.responses import RowsResponse, rows_as_dicts
+from app.api.routes import indicators, sources, zones
+from app.api.routes.indicators import paginate, set_next_cursor
+from app.api.routes.stats import (
+    average_payload,
+    batch_keys,
+    batch_payload,
+    series_payload,
+    summary_payload,
+    timeseries_payload,
+)
+from app.models.indicator import Indicator
+from app.schemas.indicator import IndicatorRead
+from app.schemas.stats import Downsample, Fill, GroupBy, StatsBatchRequest
+from app.schemas.source import SourceRead
+from app.schemas.zone import ZoneRead
+from app.services import stats as stats_service
+from app.services.stats_cache import aget_or_compute, aget_or_compute_many, cache_key
+
+router = APIRouter()
+
+
+@router.get("/indicators/", response_model=list[IndicatorRead], tags=["Indicators"])
+async def list_indicators_async(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async),
+    etag=Depends(data_etag_async),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+    indicator_type: str | None = None,
+):
+    stmt = paginate(
+        select(*indicators.READ_COLUMNS),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        from_date=from_date,
+        to_date=to_date,
+        zone_id=zone_id,
+        source_id=source_id,
+        indicator_type=indicator_type,
+    )
+    rows = (await db.execute(stmt)).all()
+
+    result = RowsResponse(rows_as_dicts(rows, indicators.READ_COLUMNS), headers=response.headers)
+    set_next_cursor(result, rows, limit)
+    return result
+
+
+# ":int" : "/indicators/export" doit continuer d'atteindre la route sync
+@router.get("/indicators/{indicator_id:int}", response_model=IndicatorRead, tags=["Indicators"])
+async def get_indicator_async(
+    indicator_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async),
+):
+    indicator = await db.get(Indicator, indicator_id)
+    if not indicator:
+        raise HTTPException(status_code=404, detail="Indicateur non trouvé")
+    return indicator
+
+
+@router.get("/zones/", response_model=list[ZoneRead], tags=["Zones"])
+async def list_zones_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async),
+):
+    rows = (await db.execute(select(*zones.READ_COLUMNS))).all()
+    return RowsResponse(rows_as_dicts(rows, zones.READ_COLUMNS))
+
+
+@router.get("/sources/", response_model=list[SourceRead], tags=["Sources"])
+async def list_sources_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async),
+):
+    rows = (await db.execute(select(*sources.READ_COLUMNS))).all()
+    return RowsResponse(rows_as_dicts(rows, sources.READ_COLUMNS))
+
+
+@router.get("/stats/average", tags=["Stats"])
+async def average_indicator_async(
+    indicator_type: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+    etag=Depends(data_etag_async),
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+):
+    key = cache_key(
+        "average", indicator_type, zone_id,
+        from_date=from_date, to_date=to_date, source_id=source_id,
+    )
+    # run_sync : le calcul (rollups + bords bruts) est partagé avec la route sync
+    avg_value, count = await aget_or_compute(
+        key,
+        lambda: db.run_sync(
+            stats_service.average,
+            indicator_type,
+            from_date=from_date,
+            to_date=to_date,
+            zone_id=zone_id,
+            source_id=source_id,
+        ),
+    )
+    return average_payload(
+        indicator_type, avg_value, count,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, source_id=source_id,
+    )
+
+
+@router.get("/stats/summary", tags=["Stats"])
+async def indicator_summary_async(
+    indicator_type: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+    etag=Depends(data_etag_async),
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+):
+    key = cache_key(
+        "summary", indicator_type, zone_id,
+        from_date=from_date, to_date=to_date, source_id=source_id,
+    )
+    result = await aget_or_compute(
+        key,
+        lambda: db.run_sync(
+            stats_service.summary,
+            indicator_type,
+            from_date=from_date,
+            to_date=to_date,
+            zone_id=zone_id,
+            source_id=source_id,
+        ),
+    )
+    return summary_payload(
+        indicator_type, result,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, source_id=source_id,
+    )
+
+
+@router.get("/stats/timeseries", tags=["Stats"])
+async def indicator_timeseries_async(
+    indicator_type: str,
+    group_by: GroupBy = "day",
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+    etag=Depends(data_etag_async),
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    interval: str | None = None,
+    fill: Fill = "none",
+    max_points: int | None = None,
+    downsample: Downsample = "lttb",
+):
+    key = cache_key(
+        "timeseries", indicator_type, zone_id,
+        group_by=group_by, from_date=from_date, to_date=to_date,
+        interval=interval, fill=fill, max_points=max_points, downsample=downsample,
+    )
+    try:
+        points = await aget_or_compute(
+            key,
+            lambda: db.run_sync(
+                stats_service.timeseries,
+                indicator_type,
+                group_by=group_by,
+                from_date=from_date,
+                to_date=to_date,
+                zone_id=zone_id,
+                interval=interval,
+                fill=fill,
+                max_points=max_points,
+                downsample=downsample,
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return timeseries_payload(
+        indicator_type, group_by, points,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, interval=interval, fill=fill,
+    )
+
+
+@router.get("/stats/series", tags=["Stats"])
+async def indicator_raw_series_async(
+    indicator_type: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+    etag=Depends(data_etag_async),
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+    max_points: int = 1000,
+    downsample: Downsample = "lttb",
+):
+    key = cache_key(
+        "series", indicator_type, zone_id,
+        from_date=from_date, to_date=to_date, source_id=source_id,
+        max_points=max_points, downsample=downsample,
+    )
+    try:
+        result = await aget_or_compute(
+            key,
+            lambda: db.run_sync(
+                stats_service.raw_series,
+                indicator_type,
+                from_date=from_date,
+                to_date=to_date,
+                zone_id=zone_id,
+                source_id=source_id,
+                max_points=max_points,
+                downsample=downsample,
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return series_payload(
+        indicator_type, result,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, source_id=source_id,
+        downsample=downsample,
+    )
+
+
+@router.post("/stats/batch", tags=["Stats"])
+async def indicator_timeseries_batch_async(
+    body: StatsBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    async def compute(missing: list[tuple]) -> list[list[dict]]:
+        results = await db.run_sync(
+            stats_service.timeseries_many,
+            [key[1:3] for key in missing],
+            group_by=body.group_by,
+            from_date=body.from_date,
+            to_date=body.to_date,
+            interval=body.interval,
+            fill=body.fill,
+            max_points=body.max_points,
+            downsample=body.downsample,
+        )
+        return [results[key[1:3]] for key in missing]
+
+    try:
+        results = await aget_or_compute_many(batch_keys(body), compute)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return batch_payload(body, results)
@@ -1,26 +1,135 @@
 # app/api/routes/indicators.py
 
+import base64
+import csv
+import io
+import json
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user, get_current_admin
-from app.schemas.indicator import IndicatorCreate, IndicatorRead, IndicatorUpdate
+from app.api.deps import data_etag, get_db, get_current_user, get_current_admin
+from app.api.responses import RowsResponse, read_columns, rows_as_dicts
+from app.schemas.indicator import (
+    IndicatorBulkError,
+    IndicatorBulkResult,
+    IndicatorCreate,
+    IndicatorRead,
+    IndicatorUpdate,
+)
 from app.models.indicator import Indicator
 from app.models.zone import Zone
 from app.models.source import Source
+from app.services import indicators as indicator_service
 
 router = APIRouter(prefix="/indicators", tags=["Indicators"])
 
+# Colonnes exportées par /indicators/export (même ordre que l'en-tête CSV)
+EXPORT_COLUMNS = (
+    Indicator.id,
+    Indicator.type,
+    Indicator.value,
+    Indicator.unit,
+    Indicator.timestamp,
+    Indicator.zone_id,
+    Indicator.source_id,
+    Indicator.extra_data,
+)
+# Colonnes lues par GET /indicators/ (champs de IndicatorRead)
+READ_COLUMNS = read_columns(Indicator, IndicatorRead)
+EXPORT_BATCH_SIZE = 5000
+BULK_MAX_ITEMS = 50_000
+
+
+def _duplicate_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Un indicateur existe déjà pour ce type, cette zone, cette source et cet horodatage",
+    )
+
+
+def _encode_cursor(timestamp: datetime, indicator_id: int) -> str:
+    """Curseur opaque : (timestamp, id) du dernier élément de la page."""
+    raw = json.dumps([timestamp.isoformat(), indicator_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts_str, indicator_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(ts_str), int(indicator_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+
+def _apply_filters(
+    query,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+    indicator_type: str | None = None,
+):
+    """Filtres communs aux routes de lecture des indicateurs."""
+    if from_date is not None:
+        query = query.filter(Indicator.timestamp >= from_date)
+    if to_date is not None:
+        query = query.filter(Indicator.timestamp <= to_date)
+    if zone_id is not None:
+        query = query.filter(Indicator.zone_id == zone_id)
+    if source_id is not None:
+        query = query.filter(Indicator.source_id == source_id)
+    if indicator_type is not None:
+        query = query.filter(Indicator.type == indicator_type)
+    return query
+
+
+def paginate(query, skip: int, limit: int, cursor: str | None, **filters):
+    """
+    Filtres + tri (timestamp DESC, id DESC) + pagination, sur une Query ORM
+    ou un select() (utilisé aussi par les routes async).
+    """
+    query = _apply_filters(query, **filters)
+
+    if cursor is not None:
+        # Keyset : on reprend juste après le dernier (timestamp, id) vu,
+        # le coût d'une page ne dépend plus de sa profondeur.
+        last_ts, last_id = _decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Indicator.timestamp, Indicator.id) < (last_ts, last_id)
+        )
+
+    query = query.order_by(Indicator.timestamp.desc(), Indicator.id.desc())
+    if cursor is None and skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, indicators: list, limit: int) -> None:
+    """Page pleine : on indique le curseur de la page suivante."""
+    if indicators and len(indicators) == limit:
+        last = indicators[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.timestamp, last.id)
+
 
 @router.get("/", response_model=list[IndicatorRead])
 def list_indicators(
+    response: Response,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),
+    etag=Depends(data_etag),
 
     # pagination
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 
     # filtres
     from_date: datetime | None = None,
@@ -34,29 +143,115 @@ def list_indicators(
     - from_date / to_date : filtre sur la date
     - zone_id, source_id : filtre sur la zone / source
     - indicator_type : filtre sur le type (PM10, CO2, etc.)
+    - cursor : pagination par curseur (prioritaire sur skip). Le curseur de
+      la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
     """
 
-    query = db.query(Indicator)
+    stmt = paginate(
+        select(*READ_COLUMNS),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        from_date=from_date,
+        to_date=to_date,
+        zone_id=zone_id,
+        source_id=source_id,
+        indicator_type=indicator_type,
+    )
+    rows = db.execute(stmt).all()
+
+    # Réponse renvoyée telle quelle : on reprend les en-têtes des dépendances (ETag)
+    result = RowsResponse(rows_as_dicts(rows, READ_COLUMNS), headers=response.headers)
+    set_next_cursor(result, rows, limit)
+    return result
+
+
+def _export_ndjson(result):
+    for rows in result.partitions():
+        yield "".join(
+            json.dumps(
+                {
+                    "id": row.id,
+                    "type": row.type,
+                    "value": row.value,
+                    "unit": row.unit,
+                    "timestamp": row.timestamp.isoformat(),
+                    "zone_id": row.zone_id,
+                    "source_id": row.source_id,
+                    "extra_data": row.extra_data,
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+            for row in rows
+        )
+
+
+def _export_csv(result):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    for rows in result.partitions():
+        writer.writerows(
+            (
+                row.id,
+                row.type,
+                row.value,
+                row.unit,
+                row.timestamp.isoformat(),
+                row.zone_id,
+                row.source_id,
+                json.dumps(row.extra_data, ensure_ascii=False) if row.extra_data is not None else "",
+            )
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
 
-    if from_date is not None:
-        query = query.filter(Indicator.timestamp >= from_date)
-    if to_date is not None:
-        query = query.filter(Indicator.timestamp <= to_date)
-    if zone_id is not None:
-        query = query.filter(Indicator.zone_id == zone_id)
-    if source_id is not None:
-        query = query.filter(Indicator.source_id == source_id)
-    if indicator_type is not None:
-        query = query.filter(Indicator.type == indicator_type)
 
-    indicators = (
-        query.order_by(Indicator.timestamp.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+@router.get("/export")
+def export_indicators(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] = "ndjson",
+
+    # filtres (identiques à la liste)
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+    indicator_type: str | None = None,
+):
+    """
+    Export en flux (NDJSON ou CSV) de tous les indicateurs correspondant aux filtres,
+    triés par date croissante.
+    Les lignes sont lues par lots (yield_per) et envoyées au fil de l'eau :
+    la mémoire reste constante quel que soit le volume exporté.
+    """
+    stmt = _apply_filters(
+        select(*EXPORT_COLUMNS),
+        from_date=from_date,
+        to_date=to_date,
+        zone_id=zone_id,
+        source_id=source_id,
+        indicator_type=indicator_type,
+    ).order_by(Indicator.timestamp, Indicator.id)
+
+    result = db.execute(
+        stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
     )
 
-    return indicators
+    if format == "csv":
+        body, media_type = _export_csv(result), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _export_ndjson(result), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="indicators.{format}"'},
+    )
 
 
 @router.get("/{indicator_id}", response_model=IndicatorRead)
@@ -77,31 +272,121 @@ def create_indicator(
     db: Session = Depends(get_db),
     admin_user = Depends(get_current_admin),
 ):
-    # (optionnel) vérifier que la zone et la source existent
-    zone = db.query(Zone).filter(Zone.id == indicator_in.zone_id).first()
-    if not zone:
+    # Zone et source existent ? (une seule requête pour les deux)
+    zone_exists, source_exists = db.execute(
+        select(
+            select(Zone.id).where(Zone.id == indicator_in.zone_id).exists(),
+            select(Source.id).where(Source.id == indicator_in.source_id).exists(),
+        )
+    ).one()
+    if not zone_exists:
         raise HTTPException(status_code=400, detail="Zone invalide")
-
-    source = db.query(Source).filter(Source.id == indicator_in.source_id).first()
-    if not source:
+    if not source_exists:
         raise HTTPException(status_code=400, detail="Source invalide")
 
-    indicator = Indicator(
-        type=indicator_in.type,
-        value=indicator_in.value,
-        unit=indicator_in.unit,
-        timestamp=indicator_in.timestamp,
-        zone_id=indicator_in.zone_id,
-        source_id=indicator_in.source_id,
-        extra_data=indicator_in.extra_data,
-    )
-
-    db.add(indicator)
+    try:
+        indicator = indicator_service.add_indicator(db, indicator_in.model_dump())
+    except IntegrityError:
+        db.rollback()
+        raise _duplicate_exception()
     db.commit()
     db.refresh(indicator)
     return indicator
 
 
+async def read_bulk_payload(request: Request, admin_user = Depends(get_current_admin)) -> list:
+    """
+    Corps de POST /indicators/bulk : un tableau JSON, ou du NDJSON
+    (Content-Type application/x-ndjson, un objet par ligne).
+    Une ligne NDJSON illisible est gardée telle quelle (str) pour être
+    signalée comme erreur de ligne, sans faire échouer le lot.
+    Lu seulement une fois l'admin authentifié.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    if "ndjson" in content_type:
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="NDJSON invalide (UTF-8 attendu)")
+        items = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(line)
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON invalide")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Un tableau d'indicateurs est attendu")
+
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Trop d'éléments (max {BULK_MAX_ITEMS} par requête)",
+        )
+    return items
+
+
+@router.post("/bulk", response_model=IndicatorBulkResult)
+def bulk_create_indicators(
+    admin_user = Depends(get_current_admin),
+    items: list = Depends(read_bulk_payload),
+    db: Session = Depends(get_db),
+):
+    """
+    Création en masse d'indicateurs (admin uniquement).
+    Les éléments invalides (schéma, zone ou source inconnue) sont renvoyés
+    dans `errors` avec leur position ; les autres sont insérés dans une
+    seule transaction. Un indicateur déjà présent (même type, zone, source
+    et horodatage) est mis à jour ; `inserted` compte les lignes écrites.
+    """
+    errors: list[IndicatorBulkError] = []
+    valid: list[tuple[int, IndicatorCreate]] = []
+
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            errors.append(IndicatorBulkError(index=index, detail="Ligne NDJSON invalide"))
+            continue
+        try:
+            valid.append((index, IndicatorCreate.model_validate(item)))
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                for err in exc.errors()
+            )
+            errors.append(IndicatorBulkError(index=index, detail=detail))
+
+    zones, sources = indicator_service.existing_zone_and_source_ids(
+        db,
+        {ind.zone_id for _, ind in valid},
+        {ind.source_id for _, ind in valid},
+    )
+
+    rows = []
+    for index, ind in valid:
+        if ind.zone_id not in zones:
+            errors.append(IndicatorBulkError(index=index, detail="Zone invalide"))
+        elif ind.source_id not in sources:
+            errors.append(IndicatorBulkError(index=index, detail="Source invalide"))
+        else:
+            rows.append(ind.model_dump())
+
+    inserted, updated = indicator_service.upsert_indicators(db, rows)
+    db.commit()
+
+    errors.sort(key=lambda err: err.index)
+    return IndicatorBulkResult(
+        received=len(items), inserted=inserted, updated=updated, errors=errors
+    )
+
+
 @router.patch("/{indicator_id}", response_model=IndicatorRead)
 def update_indicator(
     indicator_id: int,
@@ -113,21 +398,14 @@ def update_indicator(
     if not indicator:
         raise HTTPException(status_code=404, detail="Indicateur non trouvé")
 
-    if indicator_in.type is not None:
-        indicator.type = indicator_in.type
-    if indicator_in.value is not None:
-        indicator.value = indicator_in.value
-    if indicator_in.unit is not None:
-        indicator.unit = indicator_in.unit
-    if indicator_in.timestamp is not None:
-        indicator.timestamp = indicator_in.timestamp
-    if indicator_in.zone_id is not None:
-        indicator.zone_id = indicator_in.zone_id
-    if indicator_in.source_id is not None:
-        indicator.source_id = indicator_in.source_id
-    if indicator_in.extra_data is not None:
-        indicator.extra_data = indicator_in.extra_data
-
+    # Seuls les champs renseignés (non None) sont modifiés
+    try:
+        indicator_service.update_indicator(
+            db, indicator, indicator_in.model_dump(exclude_none=True)
+        )
+    except IntegrityError:
+        db.rollback()
+        raise _duplicate_exception()
     db.commit()
     db.refresh(indicator)
     return indicator
@@ -143,7 +421,7 @@ def delete_indicator(
     if not indicator:
         raise HTTPException(status_code=404, detail="Indicateur non trouvé")
 
-    db.delete(indicator)
+    indicator_service.delete_indicator(db, indicator)
     db.commit()
     return
    
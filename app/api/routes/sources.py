@@ -1,14 +1,18 @@
 # app/api/routes/sources.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_admin
+from app.api.responses import RowsResponse, read_columns, rows_as_dicts
 from app.schemas.source import SourceCreate, SourceRead, SourceUpdate
 from app.models.source import Source
 
 router = APIRouter(prefix="/sources", tags=["Sources"])
 
+READ_COLUMNS = read_columns(Source, SourceRead)
+
 
 @router.get("/", response_model=list[SourceRead])
 def list_sources(
@@ -16,8 +20,8 @@ def list_sources(
     current_user = Depends(get_current_user),
 ):
     """Lister toutes les sources (user connecté requis)."""
-    sources = db.query(Source).all()
-    return sources
+    rows = db.execute(select(*READ_COLUMNS)).all()
+    return RowsResponse(rows_as_dicts(rows, READ_COLUMNS))
 
 
 @router.get("/{source_id}", response_model=SourceRead)
@@ -1,23 +1,149 @@
 # app/api/routes/stats.py
 
 from datetime import datetime
-from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
-from app.models.indicator import Indicator
+from app.api.deps import data_etag, get_db, get_current_user, get_current_admin
+from app.schemas.stats import Downsample, Fill, GroupBy, StatsBatchRequest
+from app.services import stats as stats_service
+from app.services.stats_cache import cache_key, get_or_compute, get_or_compute_many, stats_cache
 
 router = APIRouter(prefix="/stats", tags=["Stats"])
 
 
+def average_payload(indicator_type, avg_value, count, from_date, to_date, zone_id, source_id):
+    """Réponse de /stats/average (partagée avec la version async)."""
+    if count == 0:
+        raise HTTPException(status_code=404, detail="Aucune donnée pour ces critères.")
+
+    return {
+        "indicator_type": indicator_type,
+        "zone_id": zone_id,
+        "source_id": source_id,
+        "from_date": from_date,
+        "to_date": to_date,
+        "average": float(avg_value),
+        "count": count,
+    }
+
+
+def timeseries_payload(
+    indicator_type, group_by, points, from_date, to_date, zone_id, interval=None, fill="none"
+):
+    """Réponse de /stats/timeseries (partagée avec la version async)."""
+    if not points:
+        raise HTTPException(status_code=404, detail="Aucune donnée pour ces critères.")
+
+    # Format pratique pour un front (labels + series)
+    return {
+        "indicator_type": indicator_type,
+        "group_by": group_by,
+        "interval": interval,
+        "fill": fill,
+        "from_date": from_date,
+        "to_date": to_date,
+        "zone_id": zone_id,
+        "labels": [p["period"] for p in points],
+        "series": [
+            {
+                "name": f"{indicator_type} average",
+                "data": [p["average"] for p in points],
+            }
+        ],
+        "raw_points": points,  # utile pour debug
+    }
+
+
+def summary_payload(indicator_type, result, from_date, to_date, zone_id, source_id):
+    """Réponse de /stats/summary (partagée avec la version async)."""
+    if result["count"] == 0:
+        raise HTTPException(status_code=404, detail="Aucune donnée pour ces critères.")
+
+    return {
+        "indicator_type": indicator_type,
+        "zone_id": zone_id,
+        "source_id": source_id,
+        "from_date": from_date,
+        "to_date": to_date,
+        **result,
+    }
+
+
+def series_payload(indicator_type, result, from_date, to_date, zone_id, source_id, downsample):
+    """Réponse de /stats/series (partagée avec la version async)."""
+    if result["count"] == 0:
+        raise HTTPException(status_code=404, detail="Aucune donnée pour ces critères.")
+
+    return {
+        "indicator_type": indicator_type,
+        "zone_id": zone_id,
+        "source_id": source_id,
+        "from_date": from_date,
+        "to_date": to_date,
+        "downsample": downsample,
+        "count": result["count"],  # mesures avant réduction
+        "returned": len(result["values"]),
+        "timestamps": result["timestamps"],
+        "values": result["values"],
+    }
+
+
+def batch_keys(body: StatsBatchRequest) -> list[tuple]:
+    """
+    Une clé par série, identique à celle de /stats/timeseries : le cache
+    et son invalidation par (type, zone) sont partagés entre les deux routes.
+    """
+    return [
+        cache_key(
+            "timeseries", item.indicator_type, item.zone_id,
+            group_by=body.group_by, from_date=body.from_date, to_date=body.to_date,
+            interval=body.interval, fill=body.fill,
+            max_points=body.max_points, downsample=body.downsample,
+        )
+        for item in body.series
+    ]
+
+
+def batch_payload(body: StatsBatchRequest, results: list[list[dict]]):
+    """Réponse de /stats/batch : une liste de labels commune, tableaux alignés."""
+    labels = sorted({p["period"] for points in results for p in points})
+    position = {label: i for i, label in enumerate(labels)}
+
+    series = []
+    for item, points in zip(body.series, results):
+        data = [None] * len(labels)
+        counts = [0] * len(labels)
+        for p in points:
+            data[position[p["period"]]] = p["average"]
+            counts[position[p["period"]]] = p["count"]
+        series.append(
+            {
+                "indicator_type": item.indicator_type,
+                "zone_id": item.zone_id,
+                "data": data,  # None : aucune mesure sur la période
+                "counts": counts,
+            }
+        )
+
+    return {
+        "group_by": body.group_by,
+        "interval": body.interval,
+        "fill": body.fill,
+        "from_date": body.from_date,
+        "to_date": body.to_date,
+        "labels": labels,
+        "series": series,
+    }
+
+
 @router.get("/average")
 def average_indicator(
     indicator_type: str,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
+    etag=Depends(data_etag),
     from_date: datetime | None = None,
     to_date: datetime | None = None,
     zone_id: int | None = None,
@@ -25,103 +151,208 @@ def average_indicator(
 ):
     """
     Renvoie la moyenne d'un indicateur, avec des filtres optionnels.
+    Calculée depuis les rollups, les lignes brutes ne servent que pour
+    les bords de période qui ne tombent pas sur une tranche entière.
     """
 
-    query = db.query(
-        func.avg(Indicator.value).label("avg_value"),
-        func.count(Indicator.id).label("count"),
-    ).filter(Indicator.type == indicator_type)
+    key = cache_key(
+        "average", indicator_type, zone_id,
+        from_date=from_date, to_date=to_date, source_id=source_id,
+    )
+    avg_value, count = get_or_compute(
+        key,
+        lambda: stats_service.average(
+            db,
+            indicator_type,
+            from_date=from_date,
+            to_date=to_date,
+            zone_id=zone_id,
+            source_id=source_id,
+        ),
+    )
 
-    if from_date is not None:
-        query = query.filter(Indicator.timestamp >= from_date)
-    if to_date is not None:
-        query = query.filter(Indicator.timestamp <= to_date)
-    if zone_id is not None:
-        query = query.filter(Indicator.zone_id == zone_id)
-    if source_id is not None:
-        query = query.filter(Indicator.source_id == source_id)
+    return average_payload(
+        indicator_type, avg_value, count,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, source_id=source_id,
+    )
 
-    result = query.one()
 
-    if result.count == 0:
-        raise HTTPException(status_code=404, detail="Aucune donnée pour ces critères.")
+@router.get("/timeseries")
+def indicator_timeseries(
+    indicator_type: str,
+    group_by: GroupBy = "day",
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    etag=Depends(data_etag),
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    interval: str | None = None,
+    fill: Fill = "none",
+    max_points: int | None = None,
+    downsample: Downsample = "lttb",
+):
+    """
+    Renvoie une série temporelle des moyennes d'un indicateur, groupée
+    par 15min, heure, jour, semaine (lundi), mois ou `interval`
+    quelconque (ex. 5min, 2h, 3d). `fill` ajoute les périodes vides :
+    null, valeur précédente (previous) ou interpolée (linear).
+    `max_points` réduit la série pour l'affichage (lttb ou minmax).
+    """
 
-    return {
-        "indicator_type": indicator_type,
-        "zone_id": zone_id,
-        "source_id": source_id,
-        "from_date": from_date,
-        "to_date": to_date,
-        "average": float(result.avg_value),
-        "count": result.count,
-    }
+    key = cache_key(
+        "timeseries", indicator_type, zone_id,
+        group_by=group_by, from_date=from_date, to_date=to_date,
+        interval=interval, fill=fill, max_points=max_points, downsample=downsample,
+    )
+    try:
+        points = get_or_compute(
+            key,
+            lambda: stats_service.timeseries(
+                db,
+                indicator_type,
+                group_by=group_by,
+                from_date=from_date,
+                to_date=to_date,
+                zone_id=zone_id,
+                interval=interval,
+                fill=fill,
+                max_points=max_points,
+                downsample=downsample,
+            ),
+        )
+    except ValueError as exc:
+        # interval ou max_points invalide, remplissage trop grand
+        raise HTTPException(status_code=400, detail=str(exc))
 
+    return timeseries_payload(
+        indicator_type, group_by, points,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, interval=interval, fill=fill,
+    )
 
-@router.get("/timeseries")
-def indicator_timeseries(
+
+@router.get("/summary")
+def indicator_summary(
     indicator_type: str,
-    group_by: Literal["day", "month"] = "day",
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
+    etag=Depends(data_etag),
     from_date: datetime | None = None,
     to_date: datetime | None = None,
     zone_id: int | None = None,
+    source_id: int | None = None,
 ):
     """
-    Renvoie une série temporelle des moyennes d'un indicateur,
-    groupée par jour ou par mois.
+    Renvoie la distribution d'un indicateur en une requête : nombre,
+    moyenne, min, max, écart-type et percentiles (p50, p90, p95, p99).
+    Comme /stats/average, calculée depuis les rollups et les bords bruts.
     """
 
-    # Choix de la fonction de groupement SQLite
-    if group_by == "day":
-        # 2025-11-21
-        period_expr = func.date(Indicator.timestamp)
-    else:  # "month"
-        # 2025-11
-        period_expr = func.strftime("%Y-%m", Indicator.timestamp)
+    key = cache_key(
+        "summary", indicator_type, zone_id,
+        from_date=from_date, to_date=to_date, source_id=source_id,
+    )
+    result = get_or_compute(
+        key,
+        lambda: stats_service.summary(
+            db,
+            indicator_type,
+            from_date=from_date,
+            to_date=to_date,
+            zone_id=zone_id,
+            source_id=source_id,
+        ),
+    )
 
-    query = db.query(
-        period_expr.label("period"),
-        func.avg(Indicator.value).label("avg_value"),
-        func.count(Indicator.id).label("count"),
-    ).filter(Indicator.type == indicator_type)
+    return summary_payload(
+        indicator_type, result,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, source_id=source_id,
+    )
 
-    if from_date is not None:
-        query = query.filter(Indicator.timestamp >= from_date)
-    if to_date is not None:
-        query = query.filter(Indicator.timestamp <= to_date)
-    if zone_id is not None:
-        query = query.filter(Indicator.zone_id == zone_id)
 
-    query = query.group_by("period").order_by("period")
+@router.get("/series")
+def indicator_raw_series(
+    indicator_type: str,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    etag=Depends(data_etag),
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+    max_points: int = 1000,
+    downsample: Downsample = "lttb",
+):
+    """
+    Renvoie les mesures brutes d'un indicateur, réduites côté serveur à
+    `max_points` points (LTTB, ou minmax qui garde tous les pics) :
+    tableaux timestamps / values prêts pour un graphe.
+    """
 
-    rows = query.all()
+    key = cache_key(
+        "series", indicator_type, zone_id,
+        from_date=from_date, to_date=to_date, source_id=source_id,
+        max_points=max_points, downsample=downsample,
+    )
+    try:
+        result = get_or_compute(
+            key,
+            lambda: stats_service.raw_series(
+                db,
+                indicator_type,
+                from_date=from_date,
+                to_date=to_date,
+                zone_id=zone_id,
+                source_id=source_id,
+                max_points=max_points,
+                downsample=downsample,
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    if not rows:
-        raise HTTPException(status_code=404, detail="Aucune donnée pour ces critères.")
+    return series_payload(
+        indicator_type, result,
+        from_date=from_date, to_date=to_date, zone_id=zone_id, source_id=source_id,
+        downsample=downsample,
+    )
 
-    points = [
-        {
-            "period": row.period,
-            "average": float(row.avg_value),
-            "count": row.count,
-        }
-        for row in rows
-    ]
 
-    # Format pratique pour un front (labels + series)
-    return {
-        "indicator_type": indicator_type,
-        "group_by": group_by,
-        "from_date": from_date,
-        "to_date": to_date,
-        "zone_id": zone_id,
-        "labels": [p["period"] for p in points],
-        "series": [
-            {
-                "name": f"{indicator_type} average",
-                "data": [p["average"] for p in points],
-            }
-        ],
-        "raw_points": points,  # utile pour debug
-    }
+@router.post("/batch")
+def indicator_timeseries_batch(
+    body: StatsBatchRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Plusieurs séries temporelles (type, zone) sur la même période en un
+    appel : les séries absentes du cache sont calculées en une seule
+    requête groupée par (type, zone, période). `max_points` réduit
+    chaque série pour l'affichage (lttb ou minmax).
+    """
+
+    def compute(missing: list[tuple]) -> list[list[dict]]:
+        results = stats_service.timeseries_many(
+            db,
+            [key[1:3] for key in missing],
+            group_by=body.group_by,
+            from_date=body.from_date,
+            to_date=body.to_date,
+            interval=body.interval,
+            fill=body.fill,
+            max_points=body.max_points,
+            downsample=body.downsample,
+        )
+        return [results[key[1:3]] for key in missing]
+
+    try:
+        results = get_or_compute_many(batch_keys(body), compute)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return batch_payload(body, results)
+
+
+@router.get("/cache")
+def stats_cache_info(admin_user=Depends(get_current_admin)):
+    """Compteurs du cache des statistiques (admin), pour le dimensionner."""
+    return stats_cache.stats()
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user, get_current_admin
+from app.api.deps import (
+    UserSnapshot,
+    get_current_admin,
+    get_current_user,
+    get_db,
+    invalidate_user,
+)
 from app.schemas.user import UserRead, UserCreate, UserUpdate
 from app.models.user import User
 
@@ -10,7 +16,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/me", response_model=UserRead)
 def read_current_user(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     return current_user
 
@@ -20,7 +26,7 @@ def read_current_user(
 @router.get("/", response_model=list[UserRead])
 def list_users(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(get_current_admin),
+    admin_user: UserSnapshot = Depends(get_current_admin),
     skip: int = 0,
     limit: int = 50,
 ):
@@ -35,7 +41,7 @@ def list_users(
 def get_user_by_id(
     user_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(get_current_admin),
+    admin_user: UserSnapshot = Depends(get_current_admin),
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -47,7 +53,7 @@ def get_user_by_id(
 def create_user_admin(
     user_in: UserCreate,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(get_current_admin),
+    admin_user: UserSnapshot = Depends(get_current_admin),
 ):
     """
     Créer un utilisateur (admin). Similaire à /auth/register mais réservé admin.
@@ -77,7 +83,7 @@ def update_user_admin(
     user_id: int,
     user_in: UserUpdate,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(get_current_admin),
+    admin_user: UserSnapshot = Depends(get_current_admin),
 ):
     """
     Modifier email, rôle, is_active (admin).
@@ -104,6 +110,7 @@ def update_user_admin(
         user.is_active = user_in.is_active
 
     db.commit()
+    invalidate_user(user_id)
     db.refresh(user)
     return user
 
@@ -112,7 +119,7 @@ def update_user_admin(
 def delete_user_admin(
     user_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(get_current_admin),
+    admin_user: UserSnapshot = Depends(get_current_admin),
 ):
     """
     Suppression d'un utilisateur (admin). Pour un vrai projet on ferait un soft delete,
@@ -124,4 +131,5 @@ def delete_user_admin(
 
     db.delete(user)
     db.commit()
+    invalidate_user(user_id)
     return
@@ -1,22 +1,26 @@
 # app/api/routes/zones.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_admin
+from app.api.responses import RowsResponse, read_columns, rows_as_dicts
 from app.schemas.zone import ZoneCreate, ZoneRead, ZoneUpdate
 from app.models.zone import Zone
 
 router = APIRouter(prefix="/zones", tags=["Zones"])
 
+READ_COLUMNS = read_columns(Zone, ZoneRead)
+
 
 @router.get("/", response_model=list[ZoneRead])
 def list_zones(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),  # juste pour exiger d'être connecté
 ):
-    zones = db.query(Zone).all()
-    return zones
+    rows = db.execute(select(*READ_COLUMNS)).all()
+    return RowsResponse(rows_as_dicts(rows, READ_COLUMNS))
 
 
 @router.get("/{zone_id}", response_model=ZoneRead)
@@ -0,0 +1,69 @@
+# app/core/compression.py
+"""
+Compression des réponses : brotli si le paquet `brotli` est installé et
+accepté par le client, sinon gzip (GZipMiddleware de Starlette). Les
+réponses sous `minimum_size` octets partent telles quelles.
+"""
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+
+try:
+    import brotli
+except ImportError:  # optionnel : gzip seulement
+    brotli = None
+
+# Au-delà, la compression quitte la boucle d'événements (comme gzip)
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        if name.strip() == coding:
+            q = params.replace(" ", "").removeprefix("q=")
+            try:
+                return not params or float(q) > 0
+            except ValueError:
+                return True
+    return False
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self._compress, body, more_body)
+        return self._compress(body, more_body)
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6, brotli_quality: int = 5):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] == "http"
+            and brotli is not None
+            and _accepts(Headers(scope=scope).get("accept-encoding", ""), "br")
+        ):
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                self.brotli_quality,
+                exclude_content_types=self.exclude_content_types,
+            )
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -10,5 +10,55 @@ class Settings:
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+    # Base de données
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./ecotrack.db")
+    # "default" : moteur SQLite nu (dev) ;
+    # "production" : WAL + pragmas, moteurs lecture / écriture séparés
+    DB_ENGINE_PROFILE: str = os.getenv("DB_ENGINE_PROFILE", "default")
+    DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+    DB_WRITE_POOL_SIZE: int = int(os.getenv("DB_WRITE_POOL_SIZE", "2"))
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Routes de lecture en async (SQLAlchemy asyncio + aiosqlite) au lieu du threadpool
+    DB_ASYNC_READS: bool = os.getenv("DB_ASYNC_READS", "false").lower() in ("1", "true", "yes")
+
+    # Cache des résultats /stats (0 entrée = cache désactivé)
+    STATS_CACHE_MAX_ENTRIES: int = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "1024"))
+    STATS_CACHE_TTL_SECONDS: float = float(os.getenv("STATS_CACHE_TTL_SECONDS", "300"))
+    # Cache colonnaire NumPy des séries pour /stats/timeseries, en nombre total
+    # de points (16 octets / point) ; 0 = désactivé, numpy requis sinon
+    SERIES_CACHE_MAX_POINTS: int = int(os.getenv("SERIES_CACHE_MAX_POINTS", "0"))
+
+    # Compression des réponses (gzip, brotli si le paquet est installé) à partir
+    # de COMPRESSION_MIN_SIZE octets ; 0 = désactivée
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    # ETag / 304 sur /indicators/ et /stats/* (versions en mémoire : un seul worker)
+    HTTP_ETAGS: bool = os.getenv("HTTP_ETAGS", "true").lower() in ("1", "true", "yes")
+
+    # Latences / tailles de réponse par route, exposées sur /metrics (Prometheus)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Nombre de requêtes SQL et temps en base par requête HTTP (en-tête Server-Timing)
+    SQL_SERVER_TIMING: bool = os.getenv("SQL_SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+    # Requêtes SQL journalisées avec leur plan au-delà de ce seuil (0 = désactivé)
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+
+    # Profilage d'une requête par un admin (en-tête X-Profile), période d'échantillonnage
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() in ("1", "true", "yes")
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "1"))
+
+    # Cache token -> utilisateur de get_current_user (0 entrée = désactivé)
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "4096"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+    # Ingestion Open-Meteo multi-villes
+    OPEN_METEO_URL: str = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+    OPEN_METEO_CONCURRENCY: int = int(os.getenv("OPEN_METEO_CONCURRENCY", "16"))
+    OPEN_METEO_MAX_RETRIES: int = int(os.getenv("OPEN_METEO_MAX_RETRIES", "3"))
+
 settings = Settings()
 
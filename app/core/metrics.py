@@ -0,0 +1,135 @@
+# app/core/metrics.py
+"""
+Métriques HTTP au format texte Prometheus, sans dépendance.
+
+Par (méthode, route, statut) : histogramme des latences et des tailles de
+réponse (octets envoyés, donc compressés le cas échéant) ; plus une jauge
+des requêtes en cours. La route est le gabarit ("/indicators/{indicator_id}")
+et non le chemin : nombre de séries borné ; "unmatched" si aucune route.
+
+Tout se passe dans la boucle d'événements (pas de verrou) et les compteurs
+sont propres au processus : avec plusieurs workers, chaque scrape n'en voit
+qu'un.
+"""
+
+import time
+from bisect import bisect_left
+
+from starlette.responses import Response
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Comptes par case (non cumulés : cumul au rendu), somme et total."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # dernière case : +Inf
+        self.sum = 0.0
+
+    def observe(self, buckets: tuple, value: float) -> None:
+        self.counts[bisect_left(buckets, value)] += 1
+        self.sum += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self, prefix: str = "ecotrack", latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS):
+        self.prefix = prefix
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.enabled = True
+        self.clear()
+
+    def clear(self) -> None:
+        self.latencies: dict[tuple[str, str, int], Histogram] = {}
+        self.sizes: dict[tuple[str, str, int], Histogram] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        key = (method, route, status)
+        latency = self.latencies.get(key)
+        if latency is None:
+            latency = self.latencies[key] = Histogram(len(self.latency_buckets))
+            self.sizes[key] = Histogram(len(self.size_buckets))
+        latency.observe(self.latency_buckets, seconds)
+        self.sizes[key].observe(self.size_buckets, size)
+
+    def _histogram(self, lines: list[str], name: str, help_text: str, buckets: tuple, series: dict) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        bounds = [repr(float(b)) for b in buckets] + ["+Inf"]
+        for (method, route, status), hist in sorted(series.items()):
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            total = 0
+            for bound, count in zip(bounds, hist.counts):
+                total += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum!r}")
+            lines.append(f"{name}_count{{{labels}}} {total}")
+
+    def render(self) -> str:
+        lines: list[str] = []
+        self._histogram(
+            lines, f"{self.prefix}_http_request_duration_seconds",
+            "Durée des requêtes HTTP (secondes).", self.latency_buckets, self.latencies,
+        )
+        self._histogram(
+            lines, f"{self.prefix}_http_response_size_bytes",
+            "Taille des corps de réponse envoyés (octets).", self.size_buckets, self.sizes,
+        )
+        name = f"{self.prefix}_http_requests_in_flight"
+        lines.append(f"# HELP {name} Requêtes HTTP en cours.")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {self.in_flight}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : à ajouter en dernier (le plus externe) pour tout mesurer."""
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send) -> None:
+        registry = self.registry
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # exception avant le début de la réponse
+        size = 0
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            # Renseigné par le routeur de Starlette sur le scope partagé
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            registry.observe(scope["method"], route, status, time.perf_counter() - start, size)
+
+
+def metrics_response(registry: Metrics = metrics) -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
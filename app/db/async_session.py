@@ -0,0 +1,38 @@
+# app/db/async_session.py
+"""
+Moteur / sessions SQLAlchemy asyncio (aiosqlite), utilisés par les routes
+de lecture async quand DB_ASYNC_READS est activé. Créés à la première
+utilisation : aiosqlite n'est requis que si l'option est activée.
+"""
+
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.session import SQLALCHEMY_DATABASE_URL, _set_sqlite_pragmas
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:///./x.db -> sqlite+aiosqlite:///./x.db"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+def create_async_db_engine(url: str, profile: str = "default") -> AsyncEngine:
+    engine = create_async_engine(to_async_url(url))
+
+    if profile == "production" and url.startswith("sqlite"):
+        @event.listens_for(engine.sync_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _set_sqlite_pragmas(dbapi_connection, read_only=True)
+
+    return engine
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker:
+    engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL, settings.DB_ENGINE_PROFILE)
+    return async_sessionmaker(engine, expire_on_commit=False)
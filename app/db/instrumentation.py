@@ -0,0 +1,137 @@
+# app/db/instrumentation.py
+"""
+Instrumentation SQL, sur tous les moteurs (événements de la classe Engine,
+donc aussi le moteur synchrone sous-jacent des moteurs async) :
+
+- nombre de requêtes et temps passé en base pendant un bloc
+  `count_queries()` ; le middleware en ouvre un par requête HTTP et
+  l'expose dans l'en-tête `Server-Timing` ;
+- requêtes plus lentes que `SQL_SLOW_QUERY_MS` journalisées avec leur
+  plan (EXPLAIN QUERY PLAN, SQLite uniquement).
+
+Le compteur courant vit dans une ContextVar : il suit la requête dans la
+boucle d'événements comme dans le threadpool des routes synchrones.
+"""
+
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger("ecotrack.sql")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.3f};desc="{self.count} queries"'
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def parse_server_timing(header: str) -> QueryStats | None:
+    """En-tête Server-Timing -> QueryStats (sans les requêtes), ou None."""
+    match = _SERVER_TIMING.search(header or "")
+    if match is None:
+        return None
+    return QueryStats(count=int(match.group(2)), seconds=float(match.group(1)) / 1000)
+
+
+@contextmanager
+def count_queries():
+    """Compte les requêtes SQL exécutées dans le bloc (même contexte)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def explain(conn, statement: str, parameters) -> str:
+    """Plan SQLite d'une requête, sur un curseur DBAPI à part (sans événements)."""
+    if isinstance(parameters, list):  # executemany : le plan de la première ligne
+        parameters = parameters[0] if parameters else ()
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return " | ".join(str(row[-1]) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements.append(statement)
+
+    threshold = settings.SQL_SLOW_QUERY_MS
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        plan = None
+        if conn.dialect.name == "sqlite":
+            try:
+                plan = explain(conn, statement, parameters)
+            except Exception as exc:  # le plan ne doit jamais faire échouer la requête
+                plan = f"indisponible ({exc})"
+        logger.warning(
+            "Requête lente (%.1f ms) : %s\n  plan : %s", elapsed * 1000, " ".join(statement.split()), plan
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute n'est pas appelé : on dépile le départ
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+class QueryStatsMiddleware:
+    """Un compteur par requête HTTP, renvoyé dans l'en-tête Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_wrapper(message) -> None:
+            # Les requêtes d'une réponse en streaming ne sont comptées
+            # que jusqu'à l'envoi des en-têtes
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
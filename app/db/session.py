@@ -1,14 +1,77 @@
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ecotrack.db"
+from app.core.config import settings
+import app.db.instrumentation  # noqa: F401  (événements SQL sur tous les moteurs)
 
-engine = create_engine(
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+
+def _set_sqlite_pragmas(dbapi_connection, read_only: bool) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL : les lecteurs ne bloquent plus derrière l'écrivain (et inversement)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # valeur négative = taille en KiB
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(
+    url: str,
+    profile: str = "default",
+    read_only: bool = False,
+    pool_size: int | None = None,
+) -> Engine:
+    """
+    Crée un moteur selon le profil :
+    - "default" : comportement historique (aucun pragma) ;
+    - "production" : WAL, synchronous, mmap, cache, busy_timeout,
+      et query_only sur les moteurs de lecture.
+    """
+    is_sqlite = url.startswith("sqlite")
+    kwargs = {}
+    if is_sqlite:
+        kwargs["connect_args"] = {"check_same_thread": False}  # only for SQLite
+    if profile == "production" and pool_size is not None:
+        kwargs["pool_size"] = pool_size
+        kwargs["max_overflow"] = 0
+
+    engine = create_engine(url, **kwargs)
+
+    if profile == "production" and is_sqlite:
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _set_sqlite_pragmas(dbapi_connection, read_only)
+
+    return engine
+
+
+# Moteur d'écriture (et unique moteur en profil "default")
+engine = create_db_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},  # only for SQLite
+    profile=settings.DB_ENGINE_PROFILE,
+    pool_size=settings.DB_WRITE_POOL_SIZE,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
+if settings.DB_ENGINE_PROFILE == "production":
+    read_engine = create_db_engine(
+        SQLALCHEMY_DATABASE_URL,
+        profile=settings.DB_ENGINE_PROFILE,
+        read_only=True,
+        pool_size=settings.DB_READ_POOL_SIZE,
+    )
+else:
+    read_engine = engine
 
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
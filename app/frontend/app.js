@@ -2,6 +2,7 @@
 
 let accessToken = null;
 let statsChart = null;
+let nextIndicatorsCursor = null; // curseur de la page suivante (X-Next-Cursor)
 
 const apiBaseUrl = "http://127.0.0.1:8000"; // même domaine que l'API
 
@@ -29,7 +30,10 @@ window.addEventListener("DOMContentLoaded", () => {
     .addEventListener("click", loadSources);
   document
     .getElementById("load-indicators-btn")
-    .addEventListener("click", () => loadIndicators(0, 10));
+    .addEventListener("click", () => loadIndicators(null, 10));
+  document
+    .getElementById("next-indicators-btn")
+    .addEventListener("click", () => loadIndicators(nextIndicatorsCursor, 10));
 
   document
     .getElementById("stats-form")
@@ -188,14 +192,19 @@ async function loadSources() {
 
 // --- INDICATORS ---
 
-async function loadIndicators(skip = 0, limit = 10) {
+async function loadIndicators(cursor = null, limit = 10) {
   if (!accessToken) {
     setBasicStatus("Veuillez vous connecter d'abord.", false);
     return;
   }
 
   try {
-    const url = `${apiBaseUrl}/indicators/?skip=${skip}&limit=${limit}`;
+    // Pagination par curseur : chaque page coûte le même prix, quelle que soit sa profondeur
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) {
+      params.append("cursor", cursor);
+    }
+    const url = `${apiBaseUrl}/indicators/?` + params.toString();
     const resp = await fetch(url, {
       headers: {
         ...getAuthHeaders(),
@@ -208,6 +217,9 @@ async function loadIndicators(skip = 0, limit = 10) {
     }
 
     const indicators = await resp.json();
+    nextIndicatorsCursor = resp.headers.get("X-Next-Cursor");
+    document.getElementById("next-indicators-btn").disabled = !nextIndicatorsCursor;
+
     const tbody = document.getElementById("indicators-table-body");
     tbody.innerHTML = "";
 
@@ -243,32 +255,47 @@ async function handleStatsSubmit(event) {
     return;
   }
 
-  const indicatorType = document.getElementById("stat-indicator-type").value;
+  const indicatorTypes = splitList(document.getElementById("stat-indicator-type").value);
   const groupBy = document.getElementById("stat-group-by").value;
-  const zoneIdStr = document.getElementById("stat-zone-id").value;
+  const zoneIds = splitList(document.getElementById("stat-zone-id").value).map(Number);
   const fromDateStr = document.getElementById("stat-from-date").value;
   const toDateStr = document.getElementById("stat-to-date").value;
 
-  const params = new URLSearchParams();
-  params.append("indicator_type", indicatorType);
-  params.append("group_by", groupBy);
-
-  if (zoneIdStr) {
-    params.append("zone_id", zoneIdStr);
+  // Toutes les combinaisons (type, zone) en un seul appel /stats/batch
+  const series = [];
+  for (const indicatorType of indicatorTypes) {
+    if (zoneIds.length === 0) {
+      series.push({ indicator_type: indicatorType, zone_id: null });
+    }
+    for (const zoneId of zoneIds) {
+      series.push({ indicator_type: indicatorType, zone_id: zoneId });
+    }
   }
+
+  // Un point par pixel suffit au graphe : chaque série est réduite côté serveur
+  const chartWidth = document.getElementById("stats-chart").clientWidth || 800;
+  const body = {
+    series,
+    group_by: groupBy,
+    max_points: Math.max(chartWidth, 3),
+    downsample: "lttb",
+  };
   if (fromDateStr) {
     // datetime-local => "2025-11-21T10:00"
-    params.append("from_date", new Date(fromDateStr).toISOString());
+    body.from_date = new Date(fromDateStr).toISOString();
   }
   if (toDateStr) {
-    params.append("to_date", new Date(toDateStr).toISOString());
+    body.to_date = new Date(toDateStr).toISOString();
   }
 
   try {
-    const resp = await fetch(`${apiBaseUrl}/stats/timeseries?` + params.toString(), {
+    const resp = await fetch(`${apiBaseUrl}/stats/batch`, {
+      method: "POST",
       headers: {
+        "Content-Type": "application/json",
         ...getAuthHeaders(),
       },
+      body: JSON.stringify(body),
     });
 
     if (!resp.ok) {
@@ -281,15 +308,34 @@ async function handleStatsSubmit(event) {
     }
 
     const data = await resp.json();
-    updateChart(data.labels, data.series[0].data, data.series[0].name);
-    setStatsStatus("Série chargée", true);
+    if (data.labels.length === 0) {
+      setStatsStatus("Aucune donnée pour ces critères.", false);
+      return;
+    }
+    updateChart(
+      data.labels,
+      data.series.map((s) => ({
+        label: s.zone_id === null
+          ? `${s.indicator_type} average`
+          : `${s.indicator_type} average (zone ${s.zone_id})`,
+        data: s.data,
+      }))
+    );
+    setStatsStatus(`${data.series.length} série(s) chargée(s)`, true);
   } catch (error) {
     console.error(error);
     setStatsStatus("Erreur réseau lors de la récupération des stats", false);
   }
 }
 
-function updateChart(labels, values, labelName) {
+function splitList(value) {
+  return value
+    .split(",")
+    .map((item) => item.trim())
+    .filter((item) => item !== "");
+}
+
+function updateChart(labels, datasets) {
   const ctx = document.getElementById("stats-chart").getContext("2d");
 
   if (statsChart) {
@@ -300,14 +346,12 @@ function updateChart(labels, values, labelName) {
     type: "line",
     data: {
       labels,
-      datasets: [
-        {
-          label: labelName,
-          data: values,
-          fill: false,
-          borderWidth: 2,
-        },
-      ],
+      datasets: datasets.map((dataset) => ({
+        ...dataset,
+        fill: false,
+        borderWidth: 2,
+        spanGaps: true,
+      })),
     },
     options: {
       responsive: true,
@@ -405,7 +449,7 @@ async function handleCreateIndicator(event) {
     );
 
     // Rafraîchir la liste des indicateurs
-    loadIndicators(0, 10);
+    loadIndicators(null, 10);
   } catch (error) {
     console.error(error);
     setCreateIndicatorStatus(
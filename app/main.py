@@ -1,19 +1,50 @@
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.orm import Session
 
+from app.api.profiling import ProfilingMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, metrics_response
+from app.db.instrumentation import QueryStatsMiddleware
 from app.db.session import engine
 from app.db.base import Base
 import app.models
+from app.services.rollups import ensure_rollups
+from app.services.schema import upgrade_schema
+from app.services.stats import MissingDependency
 
-from app.api.routes import auth, users, zones, sources, indicators, stats
+from app.api.routes import auth, users, zones, sources, indicators, stats, async_reads
 from app.api.deps import oauth2_scheme
 
 app = FastAPI(title="EcoTrack API")
 
-# Création des tables
-Base.metadata.create_all(bind=engine)
+
+def prepare_database(bind) -> None:
+    """
+    Création des tables, mise à niveau d'une base existante (clé naturelle
+    des upserts, index : voir app.services.schema), puis rollups d'une base
+    remplie avant leur création : sans eux, /stats lirait des tranches vides.
+    """
+    Base.metadata.create_all(bind=bind)
+    with Session(bind=bind) as db:
+        for message in upgrade_schema(db):
+            print(f"[INFO] {message}")
+        if ensure_rollups(db):
+            print("[INFO] Rollups calculés depuis les indicateurs existants.")
+
+
+prepare_database(engine)
+
+
+@app.exception_handler(MissingDependency)
+async def missing_dependency(request: Request, exc: MissingDependency):
+    # Option non disponible sur ce serveur (paquet optionnel absent)
+    return JSONResponse({"detail": str(exc)}, status_code=501)
+
 
 # CORS : pour autoriser le front à appeler l'API
 app.add_middleware(
@@ -22,14 +53,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # pagination par curseur, requêtes conditionnelles
 )
 
+# Compression des réponses (gzip, ou brotli si installé)
+if settings.COMPRESSION_MIN_SIZE > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Profilage à la demande (en-tête X-Profile, admins) ; à l'intérieur de
+# Server-Timing : le rapport porte le nombre de requêtes SQL
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, interval_ms=settings.PROFILING_INTERVAL_MS)
+
+# Requêtes SQL par requête HTTP -> en-tête Server-Timing
+if settings.SQL_SERVER_TIMING:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Métriques : ajouté en dernier, donc le plus externe (compression comprise)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Servir les fichiers statiques du front
 # -> http://127.0.0.1:8000/frontend/index.html
 app.mount("/frontend", StaticFiles(directory="app/frontend", html=True), name="frontend")
 
 
 # Inclusion des routes API
+# Versions async des lectures : incluses en premier pour prendre la main
+# sur les routes sync de même chemin
+if settings.DB_ASYNC_READS:
+    app.include_router(async_reads.router)
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(zones.router)
@@ -49,6 +108,14 @@ def root():
     return {"message": "EcoTrack API running"}
 
 
+# Format texte Prometheus (à protéger au niveau du reverse proxy). Async :
+# lu dans la boucle d'événements, là où le middleware écrit
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return metrics_response()
+
+
 
 
 # # app/main.py
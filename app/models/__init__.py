@@ -5,5 +5,8 @@ from app.models.user import User  # noqa
 from app.models.zone import Zone  # noqa
 from app.models.source import Source  # noqa
 from app.models.indicator import Indicator  # noqa
+from app.models.rollup import IndicatorRollup, IndicatorRollupBin  # noqa
+from app.models.ingestion_state import IngestionState  # noqa
 
 
+from app.models.data_version import DataVersion  # noqa
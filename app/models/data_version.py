@@ -0,0 +1,18 @@
+# app/models/data_version.py
+from sqlalchemy import Column, Integer, String
+
+from app.db.base import Base
+
+class DataVersion(Base):
+    """
+    Version des données indicateurs par portée, incrémentée dans la
+    transaction de chaque écriture (ETag, cache des séries). En base :
+    visible de tous les processus (workers, scripts d'ingestion).
+    """
+    __tablename__ = "data_versions"
+
+    # "" = tous les types ; 0 = toutes les zones
+    type = Column(String, primary_key=True)
+    zone_id = Column(Integer, primary_key=True)
+
+    version = Column(Integer, nullable=False, default=0)
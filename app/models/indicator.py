@@ -1,5 +1,5 @@
 # app/models/indicator.py
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -21,3 +21,19 @@ class Indicator(Base):
 
     zone = relationship("Zone", back_populates="indicators")
     source = relationship("Source", back_populates="indicators")
+
+    # Index "séries temporelles" : les filtres (type, zone, source) en préfixe,
+    # puis le timestamp pour les plages de dates et le tri.
+    # SQLite ajoute implicitement le rowid (= id) en fin de chaque index.
+    __table_args__ = (
+        # Clé naturelle : une seule mesure par (type, zone, source, instant),
+        # cible des upserts de l'ingestion.
+        Index(
+            "ux_indicators_natural_key",
+            "type", "zone_id", "source_id", "timestamp",
+            unique=True,
+        ),
+        Index("ix_indicators_type_zone_timestamp", "type", "zone_id", "timestamp"),
+        Index("ix_indicators_source_timestamp", "source_id", "timestamp"),
+        Index("ix_indicators_timestamp", "timestamp"),
+    )
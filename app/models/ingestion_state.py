@@ -0,0 +1,24 @@
+# app/models/ingestion_state.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+
+from app.db.base import Base
+
+class IngestionState(Base):
+    """
+    Marque haute (high-water mark) de l'ingestion par API, par
+    (source, zone, type) : la prochaine requête ne demande que la suite.
+    """
+    __tablename__ = "ingestion_state"
+
+    id = Column(Integer, primary_key=True)
+
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    zone_id = Column(Integer, ForeignKey("zones.id"), nullable=False)
+    type = Column(String, nullable=False)
+
+    # Dernière heure observée stockée (les heures suivantes sont à demander)
+    last_observed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ux_ingestion_state_key", "source_id", "zone_id", "type", unique=True),
+    )
@@ -0,0 +1,65 @@
+# app/models/rollup.py
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
+
+from app.db.base import Base
+
+class IndicatorRollup(Base):
+    """
+    Agrégats pré-calculés des indicateurs par tranche de temps
+    (heure / jour / mois), tenus à jour à chaque écriture.
+    """
+    __tablename__ = "indicator_rollups"
+
+    id = Column(Integer, primary_key=True)
+
+    granularity = Column(String, nullable=False)  # "hour", "day", "month"
+    type = Column(String, nullable=False)
+    zone_id = Column(Integer, ForeignKey("zones.id"), nullable=False)
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # début de la tranche
+
+    value_sum = Column(Float, nullable=False)
+    # Somme des carrés (écart type) ; défaut côté base pour les INSERT SQL
+    # des migrations écrites avant cette colonne
+    value_sumsq = Column(Float, nullable=False, default=0.0, server_default="0")
+    value_count = Column(Integer, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # Clé naturelle (sert aussi pour l'upsert), bucket_start avant source_id
+        # pour les plages de dates par (type, zone).
+        Index(
+            "ux_indicator_rollups_key",
+            "granularity", "type", "zone_id", "bucket_start", "source_id",
+            unique=True,
+        ),
+    )
+
+
+class IndicatorRollupBin(Base):
+    """
+    Histogramme logarithmique (app.services.sketch) de chaque tranche de
+    rollup : une ligne par case non vide. Fusionnable par simple somme,
+    il donne les percentiles d'une période sans relire les lignes brutes.
+    """
+    __tablename__ = "indicator_rollup_bins"
+
+    id = Column(Integer, primary_key=True)
+
+    granularity = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    zone_id = Column(Integer, ForeignKey("zones.id"), nullable=False)
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    bin = Column(Integer, nullable=False)  # case (voir sketch.bin_of)
+
+    value_count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ux_indicator_rollup_bins_key",
+            "granularity", "type", "zone_id", "bucket_start", "source_id", "bin",
+            unique=True,
+        ),
+    )
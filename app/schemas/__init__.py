@@ -3,3 +3,5 @@ from app.schemas.user import UserCreate, UserRead, UserUpdate  # noqa
 from app.schemas.zone import ZoneCreate, ZoneRead, ZoneUpdate  # noqa
 from app.schemas.source import SourceCreate, SourceRead, SourceUpdate  # noqa
 from app.schemas.indicator import IndicatorCreate, IndicatorRead, IndicatorUpdate  # noqa
+from app.schemas.indicator import IndicatorBulkError, IndicatorBulkResult  # noqa
+from app.schemas.stats import StatsBatchRequest, StatsSeries  # noqa
@@ -32,3 +32,12 @@ class IndicatorRead(IndicatorBase):
         from_attributes = True
 
 
+class IndicatorBulkError(BaseModel):
+    index: int  # position de l'élément dans le lot reçu
+    detail: str
+
+class IndicatorBulkResult(BaseModel):
+    received: int
+    inserted: int
+    updated: int  # clé naturelle déjà présente, valeur modifiée
+    errors: list[IndicatorBulkError]
@@ -0,0 +1,24 @@
+# app/schemas/stats.py
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+# Regroupements et remplissages de /stats/timeseries (voir app.services.buckets)
+GroupBy = Literal["15min", "hour", "day", "week", "month"]
+Fill = Literal["none", "null", "previous", "linear"]
+Downsample = Literal["lttb", "minmax"]
+
+class StatsSeries(BaseModel):
+    indicator_type: str
+    zone_id: int | None = None  # None = toutes zones
+
+class StatsBatchRequest(BaseModel):
+    series: list[StatsSeries] = Field(min_length=1, max_length=500)
+    group_by: GroupBy = "day"
+    interval: str | None = None  # ex. "5min", "2h" ; prime sur group_by
+    fill: Fill = "none"
+    from_date: datetime | None = None
+    to_date: datetime | None = None
+    max_points: int | None = None  # réduction de chaque série pour l'affichage
+    downsample: Downsample = "lttb"
@@ -0,0 +1,290 @@
+# app/scripts/generate_dataset.py
+"""
+Base synthétique pour les tests de charge et de performance.
+
+N zones, M sources et, pour chaque (zone, type), une série régulière de
+`days` jours au pas `interval` : saisonnalité annuelle, cycle journalier,
+anomalies "météo" lissées sur plusieurs jours, bruit, mesures perdues et
+pannes de capteur. Déterministe pour une graine donnée : chaque série a
+son propre générateur, le résultat ne dépend pas de l'ordre d'écriture.
+
+Écriture rapide (SQLite) : executemany DBAPI sans typage SQLAlchemy par
+ligne, index secondaires créés après chargement si la table était vide,
+rollups recalculés en une passe à la fin. Outil hors ligne : les caches
+d'un serveur lancé ne sont pas prévenus (le redémarrer).
+
+    python -m app.scripts.generate_dataset --zones 100 --sources 5 --days 365 --interval 15min
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import inspect, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import create_db_engine
+import app.models  # noqa: F401
+from app.models.indicator import Indicator
+from app.models.source import Source
+from app.services.buckets import parse_interval
+from app.services import data_versions
+from app.services.ingestion.zones import create_zones, load_zone_map
+from app.services.rollups import rebuild_rollups
+
+_INSERT = (
+    "INSERT OR IGNORE INTO indicators (type, value, unit, timestamp, zone_id, source_id) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+@dataclass(frozen=True)
+class Profile:
+    unit: str
+    base: float
+    seasonal: float  # amplitude annuelle, maximum mi-juillet (négative : en hiver)
+    daily: float  # amplitude journalière, maximum à peak_hour
+    peak_hour: float
+    anomaly: float  # écart type des anomalies journalières (lissées)
+    noise: float
+    minimum: float | None = 0.0
+    maximum: float | None = None
+
+
+PROFILES = {
+    "temperature": Profile("°C", 12.5, 8.0, 4.5, 15, 2.5, 0.6, minimum=None),
+    "humidity": Profile("%", 72.0, -8.0, -14.0, 15, 6.0, 2.5, maximum=100.0),
+    "PM10": Profile("µg/m3", 22.0, -6.0, 5.0, 8, 6.0, 3.0),
+    "PM2.5": Profile("µg/m3", 12.0, -4.0, 3.0, 8, 4.0, 2.0),
+    "NO2": Profile("µg/m3", 28.0, -7.0, 9.0, 8, 6.0, 4.0),
+    "O3": Profile("µg/m3", 55.0, 20.0, 18.0, 15, 10.0, 6.0),
+}
+
+
+def generate_series(
+    profile: Profile,
+    start: np.datetime64,
+    points: int,
+    step_seconds: int,
+    rng: np.random.Generator,
+    gap_rate: float = 0.02,
+    outage_rate: float = 0.02,
+    max_outage_seconds: int = 12 * 3600,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(timestamps datetime64[us], valeurs) d'une série, trous compris."""
+    offsets = np.arange(points, dtype=np.int64) * step_seconds
+    ts = start.astype("datetime64[s]") + offsets.astype("timedelta64[s]")
+    days = (ts - ts.astype("datetime64[Y]")).astype(np.int64) / 86_400
+    hours = (ts - ts.astype("datetime64[D]")).astype(np.int64) / 3_600
+    elapsed_days = offsets / 86_400
+
+    # Décalage propre à la zone, anomalies journalières interpolées
+    level = profile.base + rng.normal(0, profile.anomaly)
+    anomalies = rng.normal(0, profile.anomaly, int(elapsed_days[-1]) + 2)
+    values = (
+        level
+        + profile.seasonal * np.cos(2 * np.pi * (days - 196) / 365.25)
+        + profile.daily * np.cos(2 * np.pi * (hours - profile.peak_hour) / 24)
+        + np.interp(elapsed_days, np.arange(len(anomalies)), anomalies)
+        + rng.normal(0, profile.noise, points)
+    )
+    if profile.minimum is not None or profile.maximum is not None:
+        values = np.clip(values, profile.minimum, profile.maximum)
+
+    # Mesures perdues isolées, puis pannes de quelques heures
+    keep = rng.random(points) >= gap_rate
+    max_outage = max(max_outage_seconds // step_seconds, 1)
+    for first in rng.integers(0, points, rng.poisson(outage_rate * (elapsed_days[-1] + 1))):
+        keep[first : first + rng.integers(1, max_outage + 1)] = False
+
+    return ts[keep].astype("datetime64[us]"), np.round(values[keep], 2)
+
+
+def _sqlite_datetimes(ts: np.ndarray) -> list[str]:
+    # Format de stockage du DateTime SQLAlchemy sous SQLite
+    return [text.replace("T", " ") for text in np.datetime_as_string(ts, unit="us").tolist()]
+
+
+def write_series(
+    db: Session, indicator_type: str, unit: str, zone_id: int, source_id: int,
+    ts: np.ndarray, values: np.ndarray,
+) -> int:
+    """Écrit une série ; une ligne déjà présente (même clé naturelle) est ignorée."""
+    if db.get_bind().dialect.name != "sqlite":
+        rows = [
+            {"type": indicator_type, "value": value, "unit": unit, "timestamp": timestamp,
+             "zone_id": zone_id, "source_id": source_id}
+            for timestamp, value in zip(ts.tolist(), values.tolist())
+        ]
+        db.execute(insert(Indicator), rows)
+        return len(rows)
+
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.executemany(
+            _INSERT,
+            [
+                (indicator_type, value, unit, timestamp, zone_id, source_id)
+                for timestamp, value in zip(_sqlite_datetimes(ts), values.tolist())
+            ],
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _ensure_sources(db: Session, count: int) -> list[int]:
+    names = [f"Synthetic source {j}" for j in range(1, count + 1)]
+    existing = dict(db.execute(select(Source.name, Source.id).where(Source.name.in_(names))).all())
+    missing = [name for name in names if name not in existing]
+    if missing:
+        created = db.execute(
+            insert(Source).returning(Source.name, Source.id),
+            [{"name": name, "description": "Données synthétiques", "type": "synthetic"} for name in missing],
+        )
+        existing.update(dict(created.all()))
+    return [existing[name] for name in names]
+
+
+def generate(
+    db: Session,
+    zones: int,
+    sources: int,
+    types: list[str],
+    start: datetime,
+    days: int,
+    interval: str = "15min",
+    seed: int = 0,
+    gap_rate: float = 0.02,
+    outage_rate: float = 0.02,
+    log=print,
+) -> dict:
+    """
+    Remplit la base et renvoie les compteurs / durées. Chaque série (zone,
+    type) appartient à une source : la clé naturelle reste unique.
+    """
+    step = parse_interval(interval).seconds
+    points = days * 86_400 // step
+    if points < 1:
+        raise ValueError("interval plus long que la période générée")
+    begin = time.perf_counter()
+
+    zone_keys = [(f"Synthetic zone {i:04d}", f"{i:05d}") for i in range(1, zones + 1)]
+    zone_map = load_zone_map(db)
+    create_zones(db, set(zone_keys), zone_map)
+    zone_ids = [zone_map[key] for key in zone_keys]
+    source_ids = _ensure_sources(db, sources)
+    db.commit()
+
+    # Table vide : index construits une fois à la fin plutôt qu'à chaque ligne
+    deferred = []
+    if db.execute(select(Indicator.id).limit(1)).first() is None:
+        existing = {ix["name"] for ix in inspect(db.connection()).get_indexes("indicators")}
+        deferred = [ix for ix in Indicator.__table__.indexes if ix.name in existing]
+        for index in deferred:
+            index.drop(db.connection())
+        db.commit()
+
+    written = 0
+    series = zones * len(types)
+    try:
+        for zone_index, zone_id in enumerate(zone_ids):
+            for type_index, indicator_type in enumerate(types):
+                profile = PROFILES[indicator_type]
+                rng = np.random.default_rng([seed, zone_index, type_index])
+                ts, values = generate_series(
+                    profile, np.datetime64(start), points, step, rng, gap_rate, outage_rate
+                )
+                source_id = source_ids[(zone_index + type_index) % len(source_ids)]
+                written += write_series(db, indicator_type, profile.unit, zone_id, source_id, ts, values)
+            db.commit()
+            elapsed = time.perf_counter() - begin
+            log(
+                f"[INFO] {(zone_index + 1) * len(types)}/{series} séries, {written} lignes "
+                f"({written / elapsed:.0f} lignes/s)"
+            )
+    finally:
+        db.rollback()
+        index_start = time.perf_counter()
+        for index in deferred:
+            index.create(db.connection())
+        db.commit()
+    insert_seconds = index_start - begin
+    index_seconds = time.perf_counter() - index_start
+    if deferred:
+        log(f"[INFO] Index recréés en {index_seconds:.1f} s.")
+
+    rollup_start = time.perf_counter()
+    rebuild_rollups(db)
+    # Écriture hors app.services.indicators : versions (ETag) à incrémenter ici
+    data_versions.bump(db, {(type_, zone_id) for zone_id in zone_ids for type_ in types})
+    db.commit()
+    rollup_seconds = time.perf_counter() - rollup_start
+    log(f"[INFO] Rollups recalculés en {rollup_seconds:.1f} s.")
+
+    total = time.perf_counter() - begin
+    return {
+        "rows": written,
+        "series": series,
+        "insert_seconds": round(insert_seconds, 2),
+        "index_seconds": round(index_seconds, 2),
+        "rollup_seconds": round(rollup_seconds, 2),
+        "total_seconds": round(total, 2),
+        "rows_per_s": round(written / total) if total else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--zones", type=int, default=20)
+    parser.add_argument("--sources", type=int, default=3)
+    parser.add_argument("--types", default=",".join(PROFILES), help=f"parmi {', '.join(PROFILES)}")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2024, 1, 1))
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--interval", default="15min", help="pas des mesures : 1min, 15min, 1h...")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gap-rate", type=float, default=0.02, help="part de mesures perdues")
+    parser.add_argument("--outage-rate", type=float, default=0.02, help="pannes par jour et par série")
+    args = parser.parse_args()
+
+    types = [name.strip() for name in args.types.split(",")]
+    unknown = [name for name in types if name not in PROFILES]
+    if unknown:
+        parser.error(f"types inconnus : {', '.join(unknown)}")
+    try:
+        parse_interval(args.interval)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    engine = create_db_engine(args.database_url, profile="production")
+    Base.metadata.create_all(bind=engine)
+    planned = args.zones * len(types) * (args.days * 86_400 // parse_interval(args.interval).seconds)
+    print(f"[INFO] {args.zones} zones x {len(types)} types : jusqu'à {planned} mesures (avant trous)...")
+
+    with sessionmaker(bind=engine)() as db:
+        report = generate(
+            db,
+            zones=args.zones,
+            sources=args.sources,
+            types=types,
+            start=args.start,
+            days=args.days,
+            interval=args.interval,
+            seed=args.seed,
+            gap_rate=args.gap_rate,
+            outage_rate=args.outage_rate,
+        )
+    print(
+        f"[INFO] {report['rows']} lignes en {report['total_seconds']} s "
+        f"({report['rows_per_s']} lignes/s, insertion {report['insert_seconds']} s, "
+        f"index {report['index_seconds']} s, rollups {report['rollup_seconds']} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,25 @@ import app.models  # important pour que les tables existent
 
 from app.core.security import get_password_hash
 from app.models.user import User
-from app.services.ingestion.open_meteo import ingest_open_meteo_for_city
+from app.services.ingestion.open_meteo import City, ingest_open_meteo_for_cities
 from app.services.ingestion.csv_pollution import ingest_pollution_csv
+from app.services.rollups import ensure_rollups
+from app.services.schema import upgrade_schema
+
+
+# Villes suivies par l'ingestion Open-Meteo
+CITIES = [
+    City("Paris", "75000", 48.8566, 2.3522),
+    City("Marseille", "13000", 43.2965, 5.3698),
+    City("Lyon", "69000", 45.7640, 4.8357),
+    City("Toulouse", "31000", 43.6047, 1.4442),
+    City("Nice", "06000", 43.7102, 7.2620),
+    City("Nantes", "44000", 47.2184, -1.5536),
+    City("Strasbourg", "67000", 48.5734, 7.7521),
+    City("Montpellier", "34000", 43.6108, 3.8767),
+    City("Bordeaux", "33000", 44.8378, -0.5792),
+    City("Lille", "59000", 50.6292, 3.0573),
+]
 
 
 def create_admin_if_not_exists(db: Session):
@@ -41,21 +58,23 @@ def main():
         # 1) Admin
         create_admin_if_not_exists(db)
 
-        # 2) Ingestion Open-Meteo (exemple pour Paris)
+        # Base existante créée sans Alembic : clé naturelle, index, colonnes
+        for message in upgrade_schema(db):
+            print(f"[INFO] {message}")
+
+        # Base créée avant les rollups (sans passer par Alembic) : on les calcule
+        if ensure_rollups(db):
+            print("[INFO] Rollups calculés depuis les indicateurs existants.")
+
+        # 2) Ingestion Open-Meteo (toutes les villes en parallèle)
         print("[INFO] Ingestion Open-Meteo...")
-        count_meteo = ingest_open_meteo_for_city(
-            db,
-            city_name="Paris",
-            postal_code="75000",
-            lat=48.8566,
-            lon=2.3522,
-        )
-        print(f"[INFO] {count_meteo} indicateurs météo insérés.")
+        count_meteo = ingest_open_meteo_for_cities(db, CITIES)
+        print(f"[INFO] {count_meteo} indicateurs météo insérés ou mis à jour.")
 
         # 3) Ingestion CSV pollution
         print("[INFO] Ingestion CSV pollution...")
         count_csv = ingest_pollution_csv(db)
-        print(f"[INFO] {count_csv} indicateurs pollution insérés.")
+        print(f"[INFO] {count_csv} indicateurs pollution insérés ou mis à jour.")
 
     finally:
         db.close()
@@ -0,0 +1,128 @@
+# app/services/buckets.py
+"""
+Regroupements temporels de /stats/timeseries.
+
+Largeur fixe (15min, hour, day, week, interval=...) : chaque point tombe
+dans la case entière floor((epoch - origine) / largeur), calculée en SQL
+sur l'epoch en secondes puis groupée sur un entier (pas de date formatée
+par ligne). Le mois, de longueur variable, reste calendaire : case =
+année * 12 + mois - 1. Les libellés ne sont produits qu'une fois par case.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, Integer, cast, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+EPOCH = datetime(1970, 1, 1)
+# 1970-01-05 est un lundi : les semaines commencent le lundi
+WEEK_ORIGIN = 4 * 86_400
+
+_INTERVAL = re.compile(r"^(\d+)(s|min|h|d|w)$")
+_UNITS = {"s": 1, "min": 60, "h": 3_600, "d": 86_400, "w": 604_800}
+# Granularités de rollup et leur durée (le mois n'est pas de durée fixe)
+_ROLLUP_SECONDS = (("hour", 3_600), ("day", 86_400))
+
+
+class epoch_seconds(FunctionElement):
+    """Secondes entières depuis l'epoch d'une colonne DateTime naïve (UTC)."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds, "sqlite")
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    # DateTime stocké en texte 'YYYY-MM-DD HH:MM:SS.ffffff' : fraction coupée
+    # avant lecture (SQLite arrondit à la milliseconde, 59.9999 donnerait 60)
+    (column,) = element.clauses
+    return compiler.process(
+        cast(func.strftime("%s", func.substr(column, 1, 19)), Integer), **kw
+    )
+
+
+@compiles(epoch_seconds, "postgresql")
+def _epoch_seconds_postgresql(element, compiler, **kw):
+    return compiler.process(
+        cast(func.floor(func.extract("epoch", *element.clauses)), BigInteger), **kw
+    )
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """Largeur fixe en secondes (`seconds`), ou mois calendaire (`seconds` None)."""
+
+    seconds: int | None
+    origin: int = 0
+
+    @property
+    def levels(self) -> tuple[str, ...]:
+        """Granularités de rollup dont chaque tranche tient dans une seule case."""
+        if self.seconds is None:
+            return ("hour", "day", "month")
+        return tuple(
+            granularity
+            for granularity, size in _ROLLUP_SECONDS
+            if self.seconds % size == 0 and self.origin % size == 0
+        )
+
+    def slot_expr(self, column):
+        """Numéro de case (entier) d'une colonne DateTime, en SQL."""
+        if self.seconds is None:
+            year = cast(func.strftime("%Y", column), Integer)
+            month = cast(func.strftime("%m", column), Integer)
+            return year * 12 + month - 1
+        return (epoch_seconds(column) - self.origin) // self.seconds
+
+    def slot_of(self, value: datetime) -> int:
+        """Numéro de case d'un datetime naïf (UTC)."""
+        if self.seconds is None:
+            return value.year * 12 + value.month - 1
+        return ((value - EPOCH) // timedelta(seconds=1) - self.origin) // self.seconds
+
+    @property
+    def date_labels(self) -> bool:
+        """Cases d'un nombre entier de jours : libellé 2025-11-21 au lieu de 2025-11-21T10:15:00."""
+        return self.seconds is not None and self.seconds % 86_400 == 0 and self.origin % 86_400 == 0
+
+    def label(self, slot: int) -> str:
+        if self.seconds is None:
+            return f"{slot // 12:04d}-{slot % 12 + 1:02d}"
+        start = EPOCH + timedelta(seconds=slot * self.seconds + self.origin)
+        return start.date().isoformat() if self.date_labels else start.isoformat()
+
+    def points(self, slots: list[int], sums: list[float], counts: list[int]) -> list[dict]:
+        """Points [{period, average, count}] des cases non vides, dans l'ordre reçu."""
+        return [
+            {"period": self.label(slot), "average": s / c, "count": c}
+            for slot, s, c in zip(slots, sums, counts)
+            if c
+        ]
+
+
+GROUP_BY = {
+    "15min": Bucket(900),
+    "hour": Bucket(3_600),
+    "day": Bucket(86_400),
+    "week": Bucket(604_800, origin=WEEK_ORIGIN),
+    "month": Bucket(None),
+}
+
+
+def parse_interval(interval: str) -> Bucket:
+    """'15min', '2h', '3d', '1w'... -> Bucket ; ValueError si invalide."""
+    match = _INTERVAL.match(interval.strip())
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(
+            f"interval invalide : {interval!r} (attendu : <n>s, <n>min, <n>h, <n>d ou <n>w)"
+        )
+    count, unit = int(match.group(1)), match.group(2)
+    return Bucket(count * _UNITS[unit], origin=WEEK_ORIGIN if unit == "w" else 0)
+
+
+def resolve(group_by: str, interval: str | None = None) -> Bucket:
+    """Bucket d'une requête : `interval` prime sur `group_by`."""
+    return parse_interval(interval) if interval else GROUP_BY[group_by]
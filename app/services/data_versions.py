@@ -0,0 +1,68 @@
+# app/services/data_versions.py
+"""
+Versions des données indicateurs, pour les ETag des routes de lecture.
+
+Un compteur par portée (type, zone), par type (toutes zones) et un
+compteur global, stockés dans la table data_versions et incrémentés dans
+la transaction même de chaque écriture (voir app.services.indicators).
+Toute écriture commitée, quel que soit le processus (autre worker,
+init_db, ingestion CSV / Open-Meteo, generate_dataset), change donc la
+version lue ensuite. Une requête dont la version n'a pas bougé peut
+répondre 304 sans rien recalculer.
+"""
+
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion
+
+# Clés en base des portées "tous les types" / "toutes les zones"
+ALL_TYPES = ""
+ALL_ZONES = 0
+
+
+def _scope_key(indicator_type: str | None, zone_id: int | None) -> tuple[str, int]:
+    if indicator_type is None:
+        return ALL_TYPES, ALL_ZONES
+    return indicator_type, ALL_ZONES if zone_id is None else zone_id
+
+
+def version_query(indicator_type: str | None = None, zone_id: int | None = None) -> Select:
+    """Requête de la version de la portée la plus fine couvrant le filtre (type, zone)."""
+    type_key, zone_key = _scope_key(indicator_type, zone_id)
+    return select(DataVersion.version).where(
+        DataVersion.type == type_key, DataVersion.zone_id == zone_key
+    )
+
+
+def version(db: Session, indicator_type: str | None = None, zone_id: int | None = None) -> int:
+    """Version courante (0 pour une portée jamais écrite)."""
+    return db.scalar(version_query(indicator_type, zone_id)) or 0
+
+
+def bump(db: Session, scopes: set[tuple[str, int]]) -> dict[tuple[str | None, int | None], int]:
+    """
+    Incrémente les portées touchées, leurs types (toutes zones) et la
+    version globale. Dans la transaction de l'écriture, sans commit.
+    Renvoie les nouvelles versions, clés comme les filtres de version().
+    """
+    keys = {_scope_key(type_, zone_id) for type_, zone_id in scopes}
+    keys |= {_scope_key(type_, None) for type_, _ in scopes}
+    keys.add(_scope_key(None, None))
+    stmt = (
+        sqlite_insert(DataVersion)
+        .on_conflict_do_update(
+            index_elements=["type", "zone_id"],
+            set_={"version": DataVersion.version + 1},
+        )
+        .returning(DataVersion.type, DataVersion.zone_id, DataVersion.version)
+    )
+    rows = db.execute(
+        stmt,
+        [{"type": type_, "zone_id": zone_id, "version": 1} for type_, zone_id in sorted(keys)],
+    )
+    return {
+        (type_ or None, None if zone_id == ALL_ZONES else zone_id): version
+        for type_, zone_id, version in rows
+    }
@@ -0,0 +1,80 @@
+# app/services/downsample.py
+"""
+Réduction visuelle (NumPy) des séries trop longues pour un graphe.
+
+- "lttb" (Largest-Triangle-Three-Buckets) : premier et dernier points
+  gardés, puis dans chaque case le point qui forme le plus grand triangle
+  avec le point retenu précédent et la moyenne de la case suivante. Le
+  calcul dans une case est vectorisé ; seule la boucle sur les cases
+  (max_points) est en Python.
+- "minmax" : le minimum et le maximum de chaque case, dans l'ordre du
+  temps ; aucun pic n'est perdu.
+
+Les fonctions renvoient les indices des points gardés, triés.
+"""
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    n = len(x)
+    if max_points >= n:
+        return np.arange(n)
+
+    # max_points - 2 cases sur les points 1 .. n - 2, d'au moins un point chacune
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / sizes
+    mean_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / sizes
+    # "Case suivante" de la dernière case : le dernier point
+    next_x = np.r_[mean_x[1:], x[-1]]
+    next_y = np.r_[mean_y[1:], y[-1]]
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        xs, ys = x[start:end], y[start:end]
+        # Double de l'aire du triangle (a, point, moyenne de la case suivante)
+        areas = np.abs((x[a] - next_x[i]) * (ys - y[a]) - (x[a] - xs) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+
+    # Cases de même nombre de points ; ids croissants avec l'indice
+    buckets = max_points // 2
+    ids = np.arange(n) * buckets // n
+    order = np.lexsort((y, ids))  # par case, puis par valeur
+    starts = np.searchsorted(ids, np.arange(buckets))
+    ends = np.r_[starts[1:], n]
+    return np.unique(np.r_[order[starts], order[ends - 1]])
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int, method: str = "lttb") -> np.ndarray:
+    """Indices triés d'au plus `max_points` points représentatifs."""
+    if method == "minmax":
+        return minmax(x, y, max_points)
+    return lttb(x, y, max_points)
+
+
+def downsample_points(points: list[dict], xs: list[int], max_points: int, method: str) -> list[dict]:
+    """
+    Réduit des points [{period, average, count}] d'abscisses `xs`. Les
+    périodes sans moyenne (fill=null) ne sont pas gardées une fois réduites.
+    """
+    if len(points) <= max_points:
+        return points
+    valued = [i for i, p in enumerate(points) if p["average"] is not None]
+    if len(valued) <= max_points:
+        return [points[i] for i in valued]
+
+    x = np.asarray([xs[i] for i in valued], dtype=np.float64)
+    y = np.asarray([points[i]["average"] for i in valued], dtype=np.float64)
+    return [points[valued[i]] for i in downsample(x, y, max_points, method).tolist()]
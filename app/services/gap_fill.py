@@ -0,0 +1,73 @@
+# app/services/gap_fill.py
+"""
+Remplissage vectorisé (NumPy) des cases vides d'une série temporelle.
+
+La grille complète des cases [first, last] est construite d'un bloc ;
+les cases sans mesure reçoivent :
+- "null" : None ;
+- "previous" : la dernière moyenne connue (None avant la première) ;
+- "linear" : l'interpolation linéaire entre les cases voisines connues
+  (None avant la première et après la dernière).
+Leur `count` vaut 0. numpy n'est requis que si un remplissage est demandé.
+"""
+
+import numpy as np
+
+from app.services.buckets import Bucket
+
+
+def fill_gaps(
+    slots: np.ndarray,
+    averages: np.ndarray,
+    counts: np.ndarray,
+    first: int,
+    last: int,
+    method: str,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(grille, moyennes, nombres) sur [first, last], NaN là où rien n'est déduit."""
+    size = last - first + 1
+    grid = np.arange(first, last + 1, dtype=np.int64)
+    filled = np.full(size, np.nan)
+    filled_counts = np.zeros(size, dtype=np.int64)
+    position = slots - first
+    filled[position] = averages
+    filled_counts[position] = counts
+
+    if method == "previous" and len(slots):
+        # Indice de la dernière case connue à gauche (-1 : aucune)
+        known = np.where(filled_counts > 0, np.arange(size), -1)
+        np.maximum.accumulate(known, out=known)
+        filled = np.where(known >= 0, filled[known], np.nan)
+    elif method == "linear" and len(slots):
+        filled = np.interp(grid, slots, averages, left=np.nan, right=np.nan)
+    return grid, filled, filled_counts
+
+
+def labels(bucket: Bucket, grid: np.ndarray) -> list[str]:
+    """Libellés de toutes les cases (mêmes formats que Bucket.label)."""
+    if bucket.seconds is None:
+        return np.datetime_as_string((grid - 1970 * 12).astype("datetime64[M]")).tolist()
+    starts = (grid * bucket.seconds + bucket.origin).astype("datetime64[s]")
+    return np.datetime_as_string(starts, unit="D" if bucket.date_labels else "s").tolist()
+
+
+def fill_points(
+    bucket: Bucket,
+    slots: list[int],
+    sums: list[float],
+    counts: list[int],
+    first: int,
+    last: int,
+    method: str,
+) -> list[dict]:
+    """Points [{period, average, count}] de toutes les cases de [first, last]."""
+    slots_ = np.asarray(slots, dtype=np.int64)
+    counts_ = np.asarray(counts, dtype=np.int64)
+    averages = np.asarray(sums, dtype=np.float64) / np.maximum(counts_, 1)
+    grid, filled, filled_counts = fill_gaps(slots_, averages, counts_, first, last, method)
+
+    values = np.where(np.isnan(filled), None, filled).tolist()
+    return [
+        {"period": period, "average": value, "count": count}
+        for period, value, count in zip(labels(bucket, grid), values, filled_counts.tolist())
+    ]
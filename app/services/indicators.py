@@ -0,0 +1,264 @@
+# app/services/indicators.py
+"""
+Chemin d'écriture unique des indicateurs.
+
+Routes et services d'ingestion passent par ces fonctions pour que les
+structures dérivées (rollups...) restent à jour.
+"""
+
+from typing import Callable, Literal
+
+from sqlalchemy import bindparam, delete, event, func, literal, select, tuple_, union_all, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.indicator import Indicator
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services import data_versions
+from app.services.rollups import apply_rollups, apply_value_changes, naive, refresh_buckets
+
+# Clé naturelle d'un indicateur (index unique ux_indicators_natural_key)
+NATURAL_KEY = ("type", "zone_id", "source_id", "timestamp")
+
+_indicators = Indicator.__table__
+
+# Clés par SELECT des lignes existantes (4 paramètres par clé, limite SQLite : 32766)
+_KEYS_PER_SELECT = 1_000
+
+
+# Fonctions appelées après chaque commit qui a modifié des indicateurs,
+# avec l'ensemble des portées touchées : {(type, zone_id), ...}
+_commit_listeners: list[Callable[[set[tuple[str, int]]], None]] = []
+
+
+# Variante au niveau des lignes : listener(lignes ajoutées, portées réécrites,
+# versions), les portées réécrites étant celles touchées par une modification /
+# suppression, les versions celles écrites par le commit (data_versions.bump).
+_RowListener = Callable[[list[dict], set[tuple[str, int]], dict[tuple, int]], None]
+_row_listeners: list[_RowListener] = []
+
+
+def on_indicators_committed(listener: Callable[[set[tuple[str, int]]], None]):
+    """Enregistre un listener (utilisable en décorateur)."""
+    _commit_listeners.append(listener)
+    return listener
+
+
+def on_indicator_rows_committed(listener: _RowListener):
+    """Enregistre un listener de lignes (utilisable en décorateur)."""
+    _row_listeners.append(listener)
+    return listener
+
+
+def _touch(db: Session, scopes, appended: list[dict] | None = None) -> None:
+    """
+    Note les portées touchées par la transaction. `appended` : lignes
+    ajoutées ; sans elles, les portées sont considérées comme réécrites.
+    """
+    scopes = set(scopes)
+    db.info.setdefault("indicator_scopes", set()).update(scopes)
+    if not _row_listeners:
+        return  # personne n'a besoin des lignes : on ne les garde pas
+    if appended is not None:
+        db.info.setdefault("indicator_appended", []).extend(appended)
+    else:
+        db.info.setdefault("indicator_rewritten", set()).update(scopes)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    # Dans la transaction de l'écriture : les autres processus voient
+    # la nouvelle version en même temps que les lignes.
+    scopes = session.info.get("indicator_scopes")
+    if scopes:
+        session.info["indicator_versions"] = data_versions.bump(session, scopes)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed(session: Session) -> None:
+    # Après le commit seulement : un lecteur ne peut plus recalculer
+    # (et remettre en cache) l'état d'avant l'écriture.
+    scopes = session.info.pop("indicator_scopes", None)
+    appended = session.info.pop("indicator_appended", [])
+    rewritten = session.info.pop("indicator_rewritten", set())
+    versions = session.info.pop("indicator_versions", {})
+    if scopes:
+        for listener in _commit_listeners:
+            listener(scopes)
+    if appended or rewritten:
+        for row_listener in _row_listeners:
+            row_listener(appended, rewritten, versions)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_scopes(session: Session) -> None:
+    session.info.pop("indicator_scopes", None)
+    session.info.pop("indicator_appended", None)
+    session.info.pop("indicator_rewritten", None)
+    session.info.pop("indicator_versions", None)
+
+
+def existing_zone_and_source_ids(
+    db: Session,
+    zone_ids: set[int],
+    source_ids: set[int],
+) -> tuple[set[int], set[int]]:
+    """
+    Vérifie en une seule requête quels zone_id / source_id existent.
+    """
+    if not zone_ids and not source_ids:
+        return set(), set()
+
+    stmt = union_all(
+        select(literal("zone").label("kind"), Zone.id.label("id")).where(
+            Zone.id.in_(zone_ids)
+        ),
+        select(literal("source").label("kind"), Source.id.label("id")).where(
+            Source.id.in_(source_ids)
+        ),
+    )
+
+    zones: set[int] = set()
+    sources: set[int] = set()
+    for kind, id_ in db.execute(stmt):
+        (zones if kind == "zone" else sources).add(id_)
+    return zones, sources
+
+
+def _key(indicator: Indicator) -> tuple:
+    return (indicator.type, indicator.zone_id, indicator.source_id, indicator.timestamp)
+
+
+def insert_indicators(db: Session, rows: list[dict]) -> int:
+    """
+    Insertion en masse d'indicateurs (INSERT core en executemany).
+    Chaque dict contient les colonnes d'Indicator (sans id).
+    Ne fait pas de commit : c'est à l'appelant de gérer la transaction.
+    """
+    if not rows:
+        return 0
+
+    # INSERT core sur la table : évite le passage par le bulk ORM
+    db.execute(Indicator.__table__.insert(), rows)
+    apply_rollups(db, rows)
+    _touch(db, {(row["type"], row["zone_id"]) for row in rows}, appended=rows)
+    return len(rows)
+
+
+def upsert_indicators(
+    db: Session,
+    rows: list[dict],
+    on_conflict: Literal["update", "nothing"] = "update",
+) -> tuple[int, int]:
+    """
+    Insertion en masse idempotente (INSERT ... ON CONFLICT sur la clé naturelle).
+    - "update" : une ligne existante prend les nouvelles valeurs
+      (réécrite seulement si value / unit / extra_data changent) ;
+    - "nothing" : une ligne existante est gardée telle quelle.
+    Renvoie (lignes insérées, lignes modifiées).
+    Ne fait pas de commit : c'est à l'appelant de gérer la transaction.
+    """
+    if not rows:
+        return 0, 0
+
+    # Doublons dans le lot : la dernière ligne gagne ("update"), la première sinon
+    unique: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["type"], row["zone_id"], row["source_id"], naive(row["timestamp"]))
+        if on_conflict == "update" or key not in unique:
+            unique[key] = row
+
+    # 1) Insertion des clés absentes. Première écriture de la transaction :
+    # SQLite prend ici le verrou d'écriture, aucun autre écrivain ne peut
+    # plus modifier les lignes lues ensuite. Avec DO NOTHING, RETURNING ne
+    # renvoie que les lignes réellement insérées.
+    stmt = sqlite_insert(_indicators).on_conflict_do_nothing(index_elements=list(NATURAL_KEY))
+    key_columns = [_indicators.c[col] for col in NATURAL_KEY]
+    inserted_keys = {
+        tuple(key) for key in db.execute(stmt.returning(*key_columns), list(unique.values()))
+    }
+    inserted = [row for key, row in unique.items() if key in inserted_keys]
+    apply_rollups(db, inserted)
+    _touch(db, {(row["type"], row["zone_id"]) for row in inserted}, appended=inserted)
+    if on_conflict == "nothing":
+        return len(inserted), 0
+
+    # 2) Clés existantes : anciennes valeurs lues sous le verrou, seules les
+    # lignes dont value / unit / extra_data changent sont réécrites
+    existing = [key for key in unique if key not in inserted_keys]
+    updates = []
+    changes = []
+    rewritten = set()
+    for start in range(0, len(existing), _KEYS_PER_SELECT):
+        chunk = existing[start:start + _KEYS_PER_SELECT]
+        current = db.execute(
+            select(_indicators.c.id, *key_columns, _indicators.c.value, _indicators.c.unit, _indicators.c.extra_data)
+            .where(tuple_(*key_columns).in_(chunk))
+        )
+        for id_, *key, value, unit, extra_data in current:
+            row = unique[tuple(key)]
+            new_value = float(row["value"])
+            if (new_value, row["unit"], row.get("extra_data")) == (value, unit, extra_data):
+                continue
+            updates.append(
+                {"_id": id_, "value": new_value, "unit": row["unit"], "extra_data": row.get("extra_data")}
+            )
+            rewritten.add((row["type"], row["zone_id"]))
+            if new_value != value:
+                changes.append((*key, value, new_value))
+
+    if updates:
+        db.execute(
+            update(_indicators)
+            .where(_indicators.c.id == bindparam("_id"))
+            .values(value=bindparam("value"), unit=bindparam("unit"), extra_data=bindparam("extra_data")),
+            updates,
+        )
+        apply_value_changes(db, changes)
+        _touch(db, rewritten)
+    return len(inserted), len(updates)
+
+
+def dedupe_indicators(db: Session) -> int:
+    """
+    Supprime les doublons de clé naturelle en gardant la ligne la plus
+    récente (id max). Les rollups sont à reconstruire ensuite.
+    Ne fait pas de commit. Renvoie le nombre de lignes supprimées.
+    """
+    keep = select(func.max(_indicators.c.id)).group_by(
+        *(_indicators.c[col] for col in NATURAL_KEY)
+    )
+    result = db.execute(delete(_indicators).where(_indicators.c.id.not_in(keep)))
+    return result.rowcount
+
+
+def add_indicator(db: Session, values: dict) -> Indicator:
+    """Crée un indicateur (ORM, pour renvoyer l'objet). Ne fait pas de commit."""
+    indicator = Indicator(**values)
+    db.add(indicator)
+    db.flush()
+    apply_rollups(db, [values])
+    _touch(db, [(indicator.type, indicator.zone_id)], appended=[values])
+    return indicator
+
+
+def update_indicator(db: Session, indicator: Indicator, changes: dict) -> Indicator:
+    """Applique `changes` à un indicateur existant. Ne fait pas de commit."""
+    old_key = _key(indicator)
+    for field, value in changes.items():
+        setattr(indicator, field, value)
+    db.flush()
+    new_key = _key(indicator)
+    refresh_buckets(db, [old_key, new_key])
+    _touch(db, [old_key[:2], new_key[:2]])
+    return indicator
+
+
+def delete_indicator(db: Session, indicator: Indicator) -> None:
+    """Supprime un indicateur. Ne fait pas de commit."""
+    key = _key(indicator)
+    db.delete(indicator)
+    db.flush()
+    refresh_buckets(db, [key])
+    _touch(db, [key[:2]])
@@ -1,14 +1,15 @@
 # app/services/ingestion/csv_pollution.py
 
 import csv
+import time
 from datetime import datetime
 from pathlib import Path
 
 from sqlalchemy.orm import Session
 
-from app.models.indicator import Indicator
 from app.models.source import Source
-from app.models.zone import Zone
+from app.services.indicators import upsert_indicators
+from app.services.ingestion.zones import create_zones, load_zone_map
 
 
 def get_or_create_source_csv(db: Session) -> Source:
@@ -28,9 +29,32 @@ def get_or_create_source_csv(db: Session) -> Source:
     return source
 
 
-def ingest_pollution_csv(db: Session, csv_path: str = "data/pollution.csv"):
+# Lignes insérées par transaction : borne la mémoire et la taille des commits
+CHUNK_SIZE = 10_000
+
+
+def _flush_chunk(db: Session, chunk: list[dict], zone_map: dict) -> int:
+    create_zones(db, {row["zone_id"] for row in chunk}, zone_map)
+    for row in chunk:
+        row["zone_id"] = zone_map[row["zone_id"]]
+    inserted, updated = upsert_indicators(db, chunk)
+    db.commit()
+    return inserted + updated
+
+
+def ingest_pollution_csv(
+    db: Session,
+    csv_path: str = "data/pollution.csv",
+    chunk_size: int = CHUNK_SIZE,
+):
     """
     Lit un fichier CSV et crée des Indicators.
+
+    Lecture en flux : les lignes sont insérées par paquets de
+    `chunk_size` (une transaction par paquet), la mémoire ne dépend
+    pas de la taille du fichier. Les zones sont résolues via une table
+    en mémoire chargée une fois, les nouvelles zones créées par paquet.
+    Upsert sur la clé naturelle : réimporter un fichier ne crée pas de doublons.
     """
     source = get_or_create_source_csv(db)
 
@@ -39,44 +63,37 @@ def ingest_pollution_csv(db: Session, csv_path: str = "data/pollution.csv"):
         print(f"[WARN] Fichier CSV {csv_path} introuvable, ingestion ignorée.")
         return 0
 
-    indicators: list[Indicator] = []
+    zone_map = load_zone_map(db)
+    extra_data = {"from": "csv"}
+    total = 0
+    chunk: list[dict] = []
+    start = time.perf_counter()
 
-    with file_path.open("r", encoding="utf-8") as f:
+    with file_path.open("r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            ts = datetime.fromisoformat(row["date"])
-
-            # zone
-            zone = (
-                db.query(Zone)
-                .filter(
-                    Zone.name == row["zone_name"],
-                    Zone.postal_code == row["postal_code"],
-                )
-                .first()
-            )
-            if not zone:
-                zone = Zone(
-                    name=row["zone_name"],
-                    postal_code=row["postal_code"],
+            chunk.append(
+                dict(
+                    type=row["indicator_type"],
+                    value=float(row["value"]),
+                    unit=row["unit"],
+                    timestamp=datetime.fromisoformat(row["date"]),
+                    # clé de zone, remplacée par l'id au moment du flush
+                    zone_id=(row["zone_name"], row["postal_code"]),
+                    source_id=source.id,
+                    extra_data=extra_data,
                 )
-                db.add(zone)
-                db.commit()
-                db.refresh(zone)
-
-            indicator = Indicator(
-                type=row["indicator_type"],
-                value=float(row["value"]),
-                unit=row["unit"],
-                timestamp=ts,
-                zone_id=zone.id,
-                source_id=source.id,
-                extra_data={"from": "csv"},
             )
-            indicators.append(indicator)
+            if len(chunk) >= chunk_size:
+                total += _flush_chunk(db, chunk, zone_map)
+                chunk = []
 
-    if indicators:
-        db.add_all(indicators)
-        db.commit()
+    if chunk:
+        total += _flush_chunk(db, chunk, zone_map)
 
-    return len(indicators)
+    elapsed = time.perf_counter() - start
+    print(
+        f"[INFO] CSV {csv_path} : {total} lignes en {elapsed:.1f} s "
+        f"({total / elapsed if elapsed else 0:.0f} lignes/s)"
+    )
+    return total
@@ -1,16 +1,48 @@
 # app/services/ingestion/open_meteo.py
 
-from datetime import datetime, timedelta
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
 import httpx
 from sqlalchemy.orm import Session
 
-from app.models.indicator import Indicator
+from app.core.config import settings
 from app.models.source import Source
 from app.models.zone import Zone
+from app.services.indicators import upsert_indicators
+from app.services.ingestion.state import advance_marks, load_marks
+from app.services.ingestion.zones import create_zones, load_zone_map
 
 
-OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+OPEN_METEO_URL = settings.OPEN_METEO_URL
+
+PARAMS = {
+    "hourly": "temperature_2m,windspeed_10m",
+    "timezone": "UTC",
+}
+
+# Types d'indicateurs produits par hourly_rows
+TYPES = ("temperature", "windspeed")
+
+# Fenêtre demandée : heures passées sans marque haute (1er passage),
+# plafond du rattrapage (limite de l'API : 92 jours), heures de prévision
+DEFAULT_PAST_HOURS = 24
+MAX_PAST_HOURS = 92 * 24
+FORECAST_HOURS = 24
+
+# Lignes par écriture en base pour l'ingestion multi-villes
+BATCH_SIZE = 5_000
+
+
+@dataclass(frozen=True)
+class City:
+    name: str
+    postal_code: str | None
+    lat: float
+    lon: float
 
 
 def get_or_create_source_open_meteo(db: Session) -> Source:
@@ -50,67 +82,268 @@ def get_or_create_zone(
     return zone
 
 
-def ingest_open_meteo_for_city(
-    db: Session,
-    city_name: str,
-    postal_code: str | None,
-    lat: float,
-    lon: float,
-):
-    """
-    Appelle Open-Meteo pour une ville, stocke température & vent
-    en tant qu'Indicators.
-    """
+def current_hour(now: datetime | None = None) -> datetime:
+    """Heure UTC en cours (naïve, comme les timestamps stockés)."""
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return now.replace(minute=0, second=0, microsecond=0)
 
-    source = get_or_create_source_open_meteo(db)
-    zone = get_or_create_zone(db, name=city_name, postal_code=postal_code)
 
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "hourly": "temperature_2m,windspeed_10m",
-        "past_days": 1,
-        "forecast_days": 1,
-        "timezone": "UTC",
+def city_mark(
+    marks: dict[tuple[int, str], datetime | None], zone_id: int
+) -> datetime | None:
+    """Marque d'une ville : la plus ancienne de ses types (None si l'un manque)."""
+    values = [marks.get((zone_id, type_)) for type_ in TYPES]
+    if any(value is None for value in values):
+        return None
+    return min(values)
+
+
+def request_window(mark: datetime | None, now: datetime) -> dict:
+    """
+    Paramètres de fenêtre Open-Meteo : seulement les heures après `mark`
+    (rattrapage plafonné), plus FORECAST_HOURS heures de prévision.
+    """
+    if mark is None:
+        past_hours = DEFAULT_PAST_HOURS
+    else:
+        past_hours = int((now - mark) / timedelta(hours=1))
+    return {
+        "past_hours": max(0, min(past_hours, MAX_PAST_HOURS)),
+        "forecast_hours": FORECAST_HOURS,
     }
 
-    resp = httpx.get(OPEN_METEO_URL, params=params, timeout=10.0)
-    resp.raise_for_status()
-    data = resp.json()
 
+def hourly_rows(
+    data: dict,
+    zone_id: int,
+    source_id: int,
+    since: datetime | None = None,
+    now: datetime | None = None,
+) -> list[dict]:
+    """
+    Réponse Open-Meteo -> lignes d'indicateurs (température & vent).
+    Les heures <= `since` (déjà observées) sont ignorées ; à partir de
+    l'heure `now`, les lignes sont des prévisions ("forecast": true).
+    """
     times = data["hourly"]["time"]
     temps = data["hourly"]["temperature_2m"]
     winds = data["hourly"]["windspeed_10m"]
 
-    indicators: list[Indicator] = []
+    indicators: list[dict] = []
 
     for t_str, temp, wind in zip(times, temps, winds):
         ts = datetime.fromisoformat(t_str)
+        if since is not None and ts <= since:
+            continue
+        forecast = now is not None and ts >= now
 
         indicators.append(
-            Indicator(
+            dict(
                 type="temperature",
                 value=float(temp),
                 unit="°C",
                 timestamp=ts,
-                zone_id=zone.id,
-                source_id=source.id,
-                extra_data={"from": "open-meteo"},
+                zone_id=zone_id,
+                source_id=source_id,
+                extra_data=_extra_data(forecast),
             )
         )
         indicators.append(
-            Indicator(
+            dict(
                 type="windspeed",
                 value=float(wind),
                 unit="km/h",
                 timestamp=ts,
-                zone_id=zone.id,
-                source_id=source.id,
-                extra_data={"from": "open-meteo"},
+                zone_id=zone_id,
+                source_id=source_id,
+                extra_data=_extra_data(forecast),
             )
         )
 
-    db.add_all(indicators)
+    return indicators
+
+
+def _extra_data(forecast: bool) -> dict:
+    if forecast:
+        return {"from": "open-meteo", "forecast": True}
+    return {"from": "open-meteo"}
+
+
+def ingest_open_meteo_for_city(
+    db: Session,
+    city_name: str,
+    postal_code: str | None,
+    lat: float,
+    lon: float,
+    url: str = OPEN_METEO_URL,
+    now: datetime | None = None,
+):
+    """
+    Appelle Open-Meteo pour une ville, stocke température & vent
+    en tant qu'Indicators. Seules les heures après la marque haute de la
+    ville sont demandées ; les prévisions déjà stockées sont réécrites
+    (upsert) quand elles deviennent des observations.
+    """
+
+    source = get_or_create_source_open_meteo(db)
+    zone = get_or_create_zone(db, name=city_name, postal_code=postal_code)
+    now = current_hour(now)
+    mark = city_mark(load_marks(db, source.id), zone.id)
+
+    params = {"latitude": lat, "longitude": lon, **PARAMS, **request_window(mark, now)}
+
+    resp = httpx.get(url, params=params, timeout=10.0)
+    resp.raise_for_status()
+
+    indicators = hourly_rows(resp.json(), zone.id, source.id, since=mark, now=now)
+    inserted, updated = upsert_indicators(db, indicators)
+    advance_marks(db, indicators)
+    db.commit()
+
+    return inserted + updated
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+async def fetch_city(
+    client: httpx.AsyncClient,
+    url: str,
+    city: City,
+    max_retries: int = settings.OPEN_METEO_MAX_RETRIES,
+    backoff: float = 0.5,
+    window: dict | None = None,
+) -> dict:
+    """
+    GET Open-Meteo pour une ville (`window` : voir request_window).
+    Réessaie les erreurs réseau, 429 et 5xx avec un backoff exponentiel
+    (+ jitter) ; les autres erreurs remontent.
+    """
+    window = window or request_window(None, current_hour())
+    params = {"latitude": city.lat, "longitude": city.lon, **PARAMS, **window}
+    for attempt in range(max_retries + 1):
+        try:
+            resp = await client.get(url, params=params)
+            resp.raise_for_status()
+            return resp.json()
+        except httpx.HTTPError as exc:
+            if attempt == max_retries or not _retryable(exc):
+                raise
+            await asyncio.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+
+
+def _write_batch(db: Session, rows: list[dict]) -> int:
+    inserted, updated = upsert_indicators(db, rows)
+    advance_marks(db, rows)
     db.commit()
+    return inserted + updated
+
+
+async def ingest_open_meteo_for_cities_async(
+    db: Session,
+    cities: list[City],
+    url: str = OPEN_METEO_URL,
+    concurrency: int = settings.OPEN_METEO_CONCURRENCY,
+    max_retries: int = settings.OPEN_METEO_MAX_RETRIES,
+    backoff: float = 0.5,
+    batch_size: int = BATCH_SIZE,
+    client: httpx.AsyncClient | None = None,
+    now: datetime | None = None,
+) -> int:
+    """
+    Ingestion de nombreuses villes en parallèle :
+    - un seul httpx.AsyncClient (connexions réutilisées), au plus
+      `concurrency` requêtes en vol ;
+    - chaque ville ne demande que les heures après sa marque haute ;
+    - les réponses sont regroupées en paquets de `batch_size` lignes,
+      écrits dans un thread pendant que les requêtes suivantes avancent.
+    Une ville en échec après ses essais est ignorée (avertissement).
+    Renvoie le nombre d'indicateurs insérés ou mis à jour.
+    """
+    start = time.perf_counter()
+    source = get_or_create_source_open_meteo(db)
+    zone_map = load_zone_map(db)
+    create_zones(db, {(city.name, city.postal_code) for city in cities}, zone_map)
+    db.commit()
+    now = current_hour(now)
+    marks = load_marks(db, source.id)
+
+    # Écrivain unique : la session n'est jamais utilisée par deux threads à la fois
+    queue: asyncio.Queue[list[dict] | None] = asyncio.Queue(maxsize=2)
+    written = {"rows": 0, "error": None}
+
+    async def writer():
+        while (rows := await queue.get()) is not None:
+            if written["error"] is not None:
+                continue  # on vide la file pour ne pas bloquer les requêtes
+            try:
+                written["rows"] += await asyncio.to_thread(_write_batch, db, rows)
+            except Exception as exc:
+                written["error"] = exc
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(http: httpx.AsyncClient, city: City):
+        zone_id = zone_map[(city.name, city.postal_code)]
+        mark = city_mark(marks, zone_id)
+        window = request_window(mark, now)
+        async with semaphore:
+            try:
+                data = await fetch_city(http, url, city, max_retries, backoff, window)
+            except httpx.HTTPError as exc:
+                print(f"[WARN] Open-Meteo {city.name} : {exc!r}, ville ignorée.")
+                data = None
+        return zone_id, mark, data
+
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+        )
+
+    writer_task = asyncio.create_task(writer())
+    failed = 0
+    buffer: list[dict] = []
+    try:
+        for done in asyncio.as_completed([fetch(client, city) for city in cities]):
+            zone_id, mark, data = await done
+            if data is None:
+                failed += 1
+                continue
+            buffer.extend(hourly_rows(data, zone_id, source.id, since=mark, now=now))
+            if len(buffer) >= batch_size:
+                await queue.put(buffer)
+                buffer = []
+        if buffer:
+            await queue.put(buffer)
+    finally:
+        await queue.put(None)
+        await writer_task
+        if own_client:
+            await client.aclose()
+
+    if written["error"] is not None:
+        raise written["error"]
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"[INFO] Open-Meteo : {len(cities) - failed}/{len(cities)} villes, "
+        f"{written['rows']} indicateurs en {elapsed:.1f} s"
+    )
+    return written["rows"]
+
 
-    return len(indicators)
+def ingest_open_meteo_for_cities(db: Session, cities: list[City], **kwargs) -> int:
+    """Point d'entrée sync (scripts) de ingest_open_meteo_for_cities_async."""
+    return asyncio.run(ingest_open_meteo_for_cities_async(db, cities, **kwargs))
@@ -0,0 +1,74 @@
+# app/services/ingestion/state.py
+"""
+Marques hautes de l'ingestion par API, par (source, zone, type) :
+last_observed_at, dernière heure observée stockée. Les lignes de prévision
+portent `"forecast": true` dans extra_data et n'avancent pas la marque :
+elles sont redemandées et réécrites par upsert quand l'heure devient une
+observation.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.ingestion_state import IngestionState
+
+_state = IngestionState.__table__
+
+
+def load_marks(db: Session, source_id: int) -> dict[tuple[int, str], datetime | None]:
+    """(zone_id, type) -> last_observed_at pour une source, en une requête."""
+    rows = db.execute(
+        select(_state.c.zone_id, _state.c.type, _state.c.last_observed_at).where(
+            _state.c.source_id == source_id
+        )
+    )
+    return {(zone_id, type_): mark for zone_id, type_, mark in rows}
+
+
+def is_forecast(row: dict) -> bool:
+    return bool((row.get("extra_data") or {}).get("forecast"))
+
+
+def advance_marks(db: Session, rows: list[dict]) -> None:
+    """
+    Avance les marques avec des lignes écrites (jamais en arrière).
+    Ne fait pas de commit : à appeler dans la transaction de l'écriture.
+    """
+    acc: dict[tuple[int, int, str], datetime] = {}
+    for row in rows:
+        if is_forecast(row):
+            continue
+        key = (row["source_id"], row["zone_id"], row["type"])
+        if key not in acc or row["timestamp"] > acc[key]:
+            acc[key] = row["timestamp"]
+
+    if not acc:
+        return
+
+    stmt = sqlite_insert(_state)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source_id", "zone_id", "type"],
+        set_={
+            # max() SQLite à plusieurs arguments renvoie NULL si l'un l'est
+            "last_observed_at": func.coalesce(
+                func.max(_state.c.last_observed_at, stmt.excluded.last_observed_at),
+                _state.c.last_observed_at,
+                stmt.excluded.last_observed_at,
+            ),
+        },
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "source_id": source_id,
+                "zone_id": zone_id,
+                "type": type_,
+                "last_observed_at": observed,
+            }
+            for (source_id, zone_id, type_), observed in acc.items()
+        ],
+    )
@@ -0,0 +1,34 @@
+# app/services/ingestion/zones.py
+"""
+Résolution des zones pour l'ingestion en masse : table
+(nom, code postal) -> id en mémoire, création des zones manquantes par lot.
+"""
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.zone import Zone
+
+
+def load_zone_map(db: Session) -> dict[tuple[str, str | None], int]:
+    """(nom, code postal) -> id de zone, chargé en une requête."""
+    rows = db.execute(select(Zone.id, Zone.name, Zone.postal_code))
+    return {(name, postal_code): zone_id for zone_id, name, postal_code in rows}
+
+
+def create_zones(
+    db: Session,
+    keys: set[tuple[str, str | None]],
+    zone_map: dict[tuple[str, str | None], int],
+) -> None:
+    """Crée en un INSERT les zones absentes de `zone_map` et l'enrichit."""
+    missing = [key for key in keys if key not in zone_map]
+    if not missing:
+        return
+
+    created = db.execute(
+        insert(Zone).returning(Zone.id, Zone.name, Zone.postal_code),
+        [{"name": name, "postal_code": postal_code} for name, postal_code in missing],
+    )
+    for zone_id, name, postal_code in created:
+        zone_map[(name, postal_code)] = zone_id
@@ -0,0 +1,453 @@
+# app/services/rollups.py
+"""
+Tables d'agrégats (rollups) par heure / jour / mois.
+
+Chaque écriture d'indicateurs met à jour les tranches concernées
+(somme, somme des carrés, nombre, min, max, histogramme des valeurs).
+Les statistiques lisent ensuite les tranches entièrement couvertes par la
+période demandée et ne relisent les lignes brutes que pour les bords partiels.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, delete, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.indicator import Indicator
+from app.models.rollup import IndicatorRollup, IndicatorRollupBin
+from app.services.sketch import add_values, bin_of
+
+# De la plus fine à la plus grossière
+GRANULARITIES = ("hour", "day", "month")
+
+# Format de stockage des DateTime SQLAlchemy sous SQLite, par granularité
+_SQLITE_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00.000000",
+    "day": "%Y-%m-%d 00:00:00.000000",
+    "month": "%Y-%m-01 00:00:00.000000",
+}
+
+_indicators = Indicator.__table__
+_rollups = IndicatorRollup.__table__
+_bins = IndicatorRollupBin.__table__
+
+_BUCKET_KEY = ["granularity", "type", "zone_id", "bucket_start", "source_id"]
+
+
+def naive(ts: datetime) -> datetime:
+    """
+    SQLite stocke l'heure "murale" sans fuseau : on fait pareil
+    pour que les tranches correspondent aux lignes stockées.
+    """
+    return ts.replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+def floor_bucket(ts: datetime, granularity: str) -> datetime:
+    ts = naive(ts)
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def ceil_bucket(ts: datetime, granularity: str) -> datetime:
+    start = floor_bucket(ts, granularity)
+    return start if start == naive(ts) else next_bucket(start, granularity)
+
+
+def plan_segments(
+    lo: datetime | None,
+    hi: datetime | None,
+    levels: tuple[str, ...] = GRANULARITIES,
+) -> list[tuple[str | None, datetime | None, datetime | None]]:
+    """
+    Découpe l'intervalle [lo, hi[ (None = non borné) en segments :
+    - (granularité, début, fin) : tranches de rollup entièrement couvertes ;
+    - (None, début, fin) : bords partiels à lire dans les lignes brutes.
+    On prend la granularité la plus grossière possible au centre,
+    puis de plus en plus fine vers les bords.
+    """
+    if lo is not None and hi is not None and lo >= hi:
+        return []
+    if not levels:
+        return [(None, lo, hi)]
+
+    granularity, finer = levels[-1], levels[:-1]
+    start = None if lo is None else ceil_bucket(lo, granularity)
+    end = None if hi is None else floor_bucket(hi, granularity)
+
+    if start is not None and end is not None and start >= end:
+        return plan_segments(lo, hi, finer)
+
+    head = [] if lo is None else plan_segments(lo, start, finer)
+    tail = [] if hi is None else plan_segments(end, hi, finer)
+    return head + [(granularity, start, end)] + tail
+
+
+def apply_rollups(db: Session, rows: list[dict]) -> None:
+    """
+    Ajoute des lignes nouvellement insérées aux rollups (upsert incrémental).
+    Ne fait pas de commit.
+    """
+    acc: dict[tuple, list] = {}
+    bins: dict[tuple, int] = {}
+    for row in rows:
+        value = float(row["value"])
+        ts = naive(row["timestamp"])
+        bin_ = bin_of(value)
+        for granularity in GRANULARITIES:
+            key = (
+                granularity,
+                row["type"],
+                row["zone_id"],
+                row["source_id"],
+                floor_bucket(ts, granularity),
+            )
+            agg = acc.get(key)
+            if agg is None:
+                acc[key] = [value, 1, value, value, value * value]
+            else:
+                agg[0] += value
+                agg[1] += 1
+                if value < agg[2]:
+                    agg[2] = value
+                if value > agg[3]:
+                    agg[3] = value
+                agg[4] += value * value
+            bin_key = key + (bin_,)
+            bins[bin_key] = bins.get(bin_key, 0) + 1
+
+    if not acc:
+        return
+
+    stmt = sqlite_insert(_rollups)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_BUCKET_KEY,
+        set_={
+            "value_sum": _rollups.c.value_sum + stmt.excluded.value_sum,
+            "value_sumsq": _rollups.c.value_sumsq + stmt.excluded.value_sumsq,
+            "value_count": _rollups.c.value_count + stmt.excluded.value_count,
+            "value_min": func.min(_rollups.c.value_min, stmt.excluded.value_min),
+            "value_max": func.max(_rollups.c.value_max, stmt.excluded.value_max),
+        },
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "granularity": granularity,
+                "type": type_,
+                "zone_id": zone_id,
+                "source_id": source_id,
+                "bucket_start": bucket_start,
+                "value_sum": agg[0],
+                "value_count": agg[1],
+                "value_min": agg[2],
+                "value_max": agg[3],
+                "value_sumsq": agg[4],
+            }
+            for (granularity, type_, zone_id, source_id, bucket_start), agg in acc.items()
+        ],
+    )
+
+    stmt = sqlite_insert(_bins)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[*_BUCKET_KEY, "bin"],
+        set_={"value_count": _bins.c.value_count + stmt.excluded.value_count},
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "granularity": granularity,
+                "type": type_,
+                "zone_id": zone_id,
+                "source_id": source_id,
+                "bucket_start": bucket_start,
+                "bin": bin_,
+                "value_count": count,
+            }
+            for (granularity, type_, zone_id, source_id, bucket_start, bin_), count in bins.items()
+        ],
+    )
+
+
+def apply_value_changes(
+    db: Session, changes: list[tuple[str, int, int, datetime, float, float]]
+) -> None:
+    """
+    Reporte sur les rollups des valeurs modifiées sans changement de clé
+    (upsert) : `changes` = liste de (type, zone_id, source_id, timestamp,
+    ancienne valeur, nouvelle valeur). Somme, somme des carrés et cases
+    d'histogramme sont ajustées par différence ; min / max ne sont relus
+    dans les lignes brutes que là où l'ancienne valeur était l'extremum.
+    Une requête (executemany) par étape, quel que soit le nombre de tranches.
+    Ne fait pas de commit.
+    """
+    # tranche -> [Δ somme, Δ somme des carrés, min/max des anciennes, min/max des nouvelles]
+    acc: dict[tuple, list] = {}
+    bins: dict[tuple, int] = {}
+    for type_, zone_id, source_id, ts, old, new in changes:
+        old, new = float(old), float(new)
+        ts = naive(ts)
+        old_bin, new_bin = bin_of(old), bin_of(new)
+        for granularity in GRANULARITIES:
+            key = (granularity, type_, zone_id, source_id, floor_bucket(ts, granularity))
+            agg = acc.get(key)
+            if agg is None:
+                acc[key] = [new - old, new * new - old * old, old, old, new, new]
+            else:
+                agg[0] += new - old
+                agg[1] += new * new - old * old
+                agg[2], agg[3] = min(agg[2], old), max(agg[3], old)
+                agg[4], agg[5] = min(agg[4], new), max(agg[5], new)
+            if old_bin != new_bin:
+                bins[key + (old_bin,)] = bins.get(key + (old_bin,), 0) - 1
+                bins[key + (new_bin,)] = bins.get(key + (new_bin,), 0) + 1
+
+    if not acc:
+        return
+
+    bucket_params = [
+        {
+            "k_granularity": granularity,
+            "k_type": type_,
+            "k_zone_id": zone_id,
+            "k_source_id": source_id,
+            "k_bucket_start": bucket_start,
+            "d_sum": agg[0],
+            "d_sumsq": agg[1],
+            "old_min": agg[2],
+            "old_max": agg[3],
+            "new_min": agg[4],
+            "new_max": agg[5],
+            "bucket_end": next_bucket(bucket_start, granularity),
+        }
+        for (granularity, type_, zone_id, source_id, bucket_start), agg in acc.items()
+    ]
+    bucket = (
+        _rollups.c.granularity == bindparam("k_granularity"),
+        _rollups.c.type == bindparam("k_type"),
+        _rollups.c.zone_id == bindparam("k_zone_id"),
+        _rollups.c.source_id == bindparam("k_source_id"),
+        _rollups.c.bucket_start == bindparam("k_bucket_start"),
+    )
+    db.execute(
+        update(_rollups)
+        .where(*bucket)
+        .values(
+            value_sum=_rollups.c.value_sum + bindparam("d_sum"),
+            value_sumsq=_rollups.c.value_sumsq + bindparam("d_sumsq"),
+            value_min=func.min(_rollups.c.value_min, bindparam("new_min")),
+            value_max=func.max(_rollups.c.value_max, bindparam("new_max")),
+        ),
+        bucket_params,
+    )
+
+    # Ancien extremum remplacé par une valeur moins extrême : relecture des
+    # lignes de la tranche (l'index de la clé naturelle couvre la plage)
+    raw = select(func.min(_indicators.c.value)).where(
+        _indicators.c.type == _rollups.c.type,
+        _indicators.c.zone_id == _rollups.c.zone_id,
+        _indicators.c.source_id == _rollups.c.source_id,
+        _indicators.c.timestamp >= _rollups.c.bucket_start,
+        _indicators.c.timestamp < bindparam("bucket_end"),
+    )
+    stale_min = [params for params in bucket_params if params["old_min"] < params["new_min"]]
+    if stale_min:
+        db.execute(
+            update(_rollups)
+            .where(*bucket, _rollups.c.value_min == bindparam("old_min"))
+            .values(value_min=raw.scalar_subquery()),
+            stale_min,
+        )
+    stale_max = [params for params in bucket_params if params["old_max"] > params["new_max"]]
+    if stale_max:
+        db.execute(
+            update(_rollups)
+            .where(*bucket, _rollups.c.value_max == bindparam("old_max"))
+            .values(value_max=raw.with_only_columns(func.max(_indicators.c.value)).scalar_subquery()),
+            stale_max,
+        )
+
+    deltas = [
+        {
+            "granularity": granularity,
+            "type": type_,
+            "zone_id": zone_id,
+            "source_id": source_id,
+            "bucket_start": bucket_start,
+            "bin": bin_,
+            "value_count": delta,
+        }
+        for (granularity, type_, zone_id, source_id, bucket_start, bin_), delta in bins.items()
+        if delta
+    ]
+    if not deltas:
+        return
+    stmt = sqlite_insert(_bins)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[*_BUCKET_KEY, "bin"],
+        set_={"value_count": _bins.c.value_count + stmt.excluded.value_count},
+    )
+    db.execute(stmt, deltas)
+    emptied = [params for params in deltas if params["value_count"] < 0]
+    if emptied:
+        db.execute(
+            delete(_bins).where(
+                *(_bins.c[col] == bindparam(f"k_{col}") for col in (*_BUCKET_KEY, "bin")),
+                _bins.c.value_count <= 0,
+            ),
+            [{f"k_{col}": params[col] for col in (*_BUCKET_KEY, "bin")} for params in emptied],
+        )
+
+
+def refresh_buckets(db: Session, keys: list[tuple[str, int, int, datetime]]) -> None:
+    """
+    Recalcule depuis les lignes brutes les tranches touchées par une
+    modification ou une suppression (le min/max ne se "décrémente" pas).
+    `keys` : liste de (type, zone_id, source_id, timestamp). Ne fait pas de commit.
+    """
+    buckets = {
+        (granularity, type_, zone_id, source_id, floor_bucket(ts, granularity))
+        for type_, zone_id, source_id, ts in keys
+        for granularity in GRANULARITIES
+    }
+
+    for granularity, type_, zone_id, source_id, start in buckets:
+        scope = (
+            _rollups.c.granularity == granularity,
+            _rollups.c.type == type_,
+            _rollups.c.zone_id == zone_id,
+            _rollups.c.source_id == source_id,
+            _rollups.c.bucket_start == start,
+        )
+        db.execute(delete(_rollups).where(*scope))
+        db.execute(
+            delete(_bins).where(
+                _bins.c.granularity == granularity,
+                _bins.c.type == type_,
+                _bins.c.zone_id == zone_id,
+                _bins.c.source_id == source_id,
+                _bins.c.bucket_start == start,
+            )
+        )
+
+        raw = (
+            Indicator.type == type_,
+            Indicator.zone_id == zone_id,
+            Indicator.source_id == source_id,
+            Indicator.timestamp >= start,
+            Indicator.timestamp < next_bucket(start, granularity),
+        )
+        agg = db.execute(
+            select(
+                func.sum(Indicator.value),
+                func.count(Indicator.id),
+                func.min(Indicator.value),
+                func.max(Indicator.value),
+                func.sum(Indicator.value * Indicator.value),
+            ).where(*raw)
+        ).one()
+        if agg[1]:
+            db.execute(
+                _rollups.insert().values(
+                    granularity=granularity,
+                    type=type_,
+                    zone_id=zone_id,
+                    source_id=source_id,
+                    bucket_start=start,
+                    value_sum=agg[0],
+                    value_count=agg[1],
+                    value_min=agg[2],
+                    value_max=agg[3],
+                    value_sumsq=agg[4],
+                )
+            )
+            histogram = add_values({}, db.execute(select(Indicator.value).where(*raw)).scalars())
+            db.execute(
+                _bins.insert(),
+                [
+                    {
+                        "granularity": granularity,
+                        "type": type_,
+                        "zone_id": zone_id,
+                        "source_id": source_id,
+                        "bucket_start": start,
+                        "bin": bin_,
+                        "value_count": count,
+                    }
+                    for bin_, count in histogram.items()
+                ],
+            )
+
+
+def rebuild_rollups(db: Session) -> None:
+    """
+    Reconstruit entièrement les rollups depuis la table indicators
+    (bases créées avant les rollups, imports directs en SQL...).
+    Ne fait pas de commit.
+    """
+    db.execute(delete(_rollups))
+    db.execute(delete(_bins))
+    # Case d'histogramme calculée côté SQLite par la fonction Python
+    db.connection().connection.driver_connection.create_function(
+        "sketch_bin", 1, bin_of, deterministic=True
+    )
+    for granularity, fmt in _SQLITE_BUCKET_FORMATS.items():
+        db.execute(
+            text(
+                "INSERT INTO indicator_rollups "
+                "(granularity, type, zone_id, source_id, bucket_start, "
+                " value_sum, value_count, value_min, value_max, value_sumsq) "
+                "SELECT :granularity, type, zone_id, source_id, "
+                "       strftime(:fmt, timestamp) AS bucket, "
+                "       sum(value), count(*), min(value), max(value), sum(value * value) "
+                "FROM indicators "
+                "GROUP BY type, zone_id, source_id, bucket"
+            ),
+            {"granularity": granularity, "fmt": fmt},
+        )
+        db.execute(
+            text(
+                "INSERT INTO indicator_rollup_bins "
+                "(granularity, type, zone_id, source_id, bucket_start, bin, value_count) "
+                "SELECT :granularity, type, zone_id, source_id, "
+                "       strftime(:fmt, timestamp) AS bucket, sketch_bin(value) AS bin, count(*) "
+                "FROM indicators "
+                "GROUP BY type, zone_id, source_id, bucket, bin"
+            ),
+            {"granularity": granularity, "fmt": fmt},
+        )
+
+
+def rollups_missing(db: Session) -> bool:
+    """True si des indicateurs existent mais qu'aucun rollup n'a été calculé."""
+    has_rollups = db.execute(select(_rollups.c.id).limit(1)).first() is not None
+    has_indicators = db.execute(select(Indicator.id).limit(1)).first() is not None
+    return has_indicators and not has_rollups
+
+
+def ensure_rollups(db: Session) -> bool:
+    """
+    Base remplie avant les rollups (create_all vient de créer des tables
+    vides) : les stats liraient des tranches vides, on les calcule.
+    Renvoie True si un calcul a eu lieu (commit fait).
+    """
+    if not rollups_missing(db):
+        return False
+    rebuild_rollups(db)
+    db.commit()
+    return True
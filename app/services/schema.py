@@ -0,0 +1,92 @@
+# app/services/schema.py
+"""
+Mise à niveau d'une base créée sans Alembic (create_all au démarrage de
+l'API, init_db) : create_all crée les tables manquantes mais ne touche pas
+aux tables existantes (ni colonne ni index ajoutés). Appelé par
+app.main.prepare_database et app.scripts.init_db ; sans effet sur une base
+déjà à jour (ou migrée par Alembic).
+"""
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.indicator import Indicator
+from app.services import data_versions
+from app.services.indicators import dedupe_indicators
+from app.services.rollups import rebuild_rollups
+
+NATURAL_KEY_INDEX = "ux_indicators_natural_key"
+
+
+def ensure_rollup_sketches(db: Session) -> bool:
+    """
+    Base créée avant /stats/summary : ajoute la colonne value_sumsq puis
+    recalcule les rollups (sommes des carrés + cases d'histogramme).
+    Renvoie True si la base a été modifiée (commit fait).
+    """
+    columns = {col["name"] for col in inspect(db.connection()).get_columns("indicator_rollups")}
+    if "value_sumsq" in columns:
+        return False
+
+    db.execute(text("ALTER TABLE indicator_rollups ADD COLUMN value_sumsq FLOAT NOT NULL DEFAULT 0"))
+    rebuild_rollups(db)
+    db.commit()
+    return True
+
+
+def ensure_natural_key(db: Session) -> int | None:
+    """
+    Base créée avant la clé naturelle : on dédoublonne, on crée l'index
+    unique (cible des upserts) puis on recalcule les rollups.
+    Renvoie le nombre de doublons supprimés, None si l'index existait.
+    """
+    existing = {ix["name"] for ix in inspect(db.connection()).get_indexes("indicators")}
+    if NATURAL_KEY_INDEX in existing:
+        return None
+
+    index = next(ix for ix in Indicator.__table__.indexes if ix.name == NATURAL_KEY_INDEX)
+    removed = dedupe_indicators(db)
+    if removed:
+        scopes = db.execute(select(Indicator.type, Indicator.zone_id).distinct()).all()
+        data_versions.bump(db, {tuple(scope) for scope in scopes})
+    index.create(db.connection())
+    rebuild_rollups(db)
+    db.commit()
+    return removed
+
+
+def ensure_indexes(db: Session) -> list[str]:
+    """
+    Crée les index non uniques du modèle absents des tables existantes
+    (index séries temporelles...), puis met à jour les statistiques du
+    planificateur. Renvoie les noms des index créés.
+    """
+    inspector = inspect(db.connection())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if not index.unique and index.name not in existing:
+                index.create(db.connection())
+                created.append(index.name)
+    if created:
+        db.execute(text("ANALYZE"))
+    db.commit()
+    return created
+
+
+def upgrade_schema(db: Session) -> list[str]:
+    """Toutes les mises à niveau ci-dessus ; renvoie des messages pour les logs."""
+    messages = []
+    if ensure_rollup_sketches(db):
+        messages.append("Colonne value_sumsq ajoutée, rollups recalculés.")
+    removed = ensure_natural_key(db)
+    if removed is not None:
+        messages.append(f"Clé naturelle créée ({removed} indicateurs en double supprimés).")
+    created = ensure_indexes(db)
+    if created:
+        messages.append(f"Index créés : {', '.join(created)}.")
+    return messages
@@ -0,0 +1,258 @@
+# app/services/series_cache.py
+"""
+Cache colonnaire (NumPy) des séries (type, zone) pour /stats/timeseries.
+
+Chaque série = deux tableaux contigus triés par temps : timestamps en
+microsecondes depuis l'epoch (int64) et valeurs (float64). Chargée à la
+première lecture, complétée à chaque commit qui ajoute des lignes, oubliée
+quand des lignes sont modifiées ou supprimées.
+
+Chaque série garde la version de sa portée (table data_versions) lue au
+chargement ; chaque lecture la compare à la version en base (une requête)
+et recharge la série si un autre processus a écrit entre-temps. Le regroupement (cases de
+largeur fixe ou mois, voir app.services.buckets) est un np.add.reduceat sur
+les frontières de cases.
+
+Mémoire bornée : au-delà de `max_points` points au total, les séries les
+moins récemment lues sont évincées (LRU). Utilisé seulement si
+SERIES_CACHE_MAX_POINTS > 0 : numpy n'est requis que dans ce cas.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.indicator import Indicator
+from app.services import data_versions
+from app.services.buckets import Bucket
+from app.services.indicators import on_indicator_rows_committed
+from app.services.rollups import naive
+
+_US_PER_S = 1_000_000
+_US_PER_DAY = 86_400 * _US_PER_S
+
+
+def to_epoch_us(timestamps) -> np.ndarray:
+    """datetimes naïfs ou textes ISO -> µs depuis l'epoch (int64)."""
+    return np.asarray(timestamps, dtype="datetime64[us]").astype(np.int64)
+
+
+class _Series:
+    """Tableaux à capacité doublée : un ajout ne recopie pas toute la série."""
+
+    __slots__ = ("ts", "values", "size", "sorted", "version")
+
+    def __init__(self, ts: np.ndarray, values: np.ndarray, version: int = 0):
+        order = np.argsort(ts, kind="stable")
+        self.ts = ts[order]
+        self.values = values[order]
+        self.size = len(ts)
+        self.sorted = True
+        self.version = version
+
+    def append(self, ts: np.ndarray, values: np.ndarray) -> None:
+        needed = self.size + len(ts)
+        if needed > len(self.ts):
+            capacity = max(needed, 2 * len(self.ts), 16)
+            extra = capacity - self.size
+            self.ts = np.concatenate([self.ts[: self.size], np.empty(extra, np.int64)])
+            self.values = np.concatenate([self.values[: self.size], np.empty(extra, np.float64)])
+        if self.size and ts.min() < self.ts[self.size - 1]:
+            self.sorted = False
+        self.ts[self.size : needed] = ts
+        self.values[self.size : needed] = values
+        self.size = needed
+
+    def view(self) -> tuple[np.ndarray, np.ndarray]:
+        """Tableaux triés de la taille utile (copiés si un tri est nécessaire)."""
+        if not self.sorted:
+            order = np.argsort(self.ts[: self.size], kind="stable")
+            self.ts = self.ts[: self.size][order]
+            self.values = self.values[: self.size][order]
+            self.sorted = True
+        return self.ts[: self.size], self.values[: self.size]
+
+
+def _segments(keys: np.ndarray) -> np.ndarray:
+    """Début de chaque suite de clés égales (clés triées)."""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def aggregate(
+    ts: np.ndarray,
+    values: np.ndarray,
+    bucket: Bucket,
+    lo: datetime | None = None,
+    hi: datetime | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(cases, sommes, nombres) des points de [lo, hi[ d'une série triée."""
+    start = 0 if lo is None else int(np.searchsorted(ts, to_epoch_us(lo), side="left"))
+    end = len(ts) if hi is None else int(np.searchsorted(ts, to_epoch_us(hi), side="left"))
+    if start >= end:
+        empty = np.empty(0, np.int64)
+        return empty, np.empty(0, np.float64), empty
+
+    if bucket.seconds is not None:
+        # Série triée : chaque case est un segment contigu (division entière)
+        slots = (ts[start:end] - bucket.origin * _US_PER_S) // (bucket.seconds * _US_PER_S)
+        starts = _segments(slots)
+        sums = np.add.reduceat(values[start:end], starts)
+        counts = np.diff(np.r_[starts, end - start])
+        return slots[starts], sums, counts
+
+    # Mois : jours d'abord, puis second regroupement sur quelques centaines de jours
+    days = ts[start:end] // _US_PER_DAY
+    starts = _segments(days)
+    sums = np.add.reduceat(values[start:end], starts)
+    counts = np.diff(np.r_[starts, end - start])
+    months = days[starts].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    month_starts = _segments(months)
+    return (
+        months[month_starts] + 1970 * 12,
+        np.add.reduceat(sums, month_starts),
+        np.add.reduceat(counts, month_starts),
+    )
+
+
+class SeriesCache:
+    """
+    Séries (type, zone_id) en mémoire ; zone_id None = toutes zones.
+    Thread-safe (routes sync dans le threadpool, listener après commit).
+    """
+
+    def __init__(self, max_points: int):
+        self.max_points = max_points
+        self._series: OrderedDict[tuple[str, int | None], _Series] = OrderedDict()
+        self._points = 0
+        self._lock = threading.Lock()
+        # Incrémenté à chaque commit : une série chargée pendant une
+        # écriture n'est pas gardée (elle pourrait manquer les lignes ajoutées).
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load(self, db: Session, key: tuple[str, int | None], version: int) -> _Series:
+        indicator_type, zone_id = key
+        # Timestamps lus tels que stockés (texte ISO) : numpy les analyse
+        # en bloc, sans créer un datetime Python par ligne
+        stmt = select(type_coerce(Indicator.timestamp, String), Indicator.value).where(
+            Indicator.type == indicator_type
+        )
+        if zone_id is not None:
+            stmt = stmt.where(Indicator.zone_id == zone_id)
+        rows = db.execute(stmt).all()
+        timestamps = [ts for ts, _ in rows]
+        values = [value for _, value in rows]
+        return _Series(to_epoch_us(timestamps), np.array(values, dtype=np.float64), version)
+
+    def _evict(self) -> None:
+        while self._points > self.max_points and self._series:
+            _, series = self._series.popitem(last=False)
+            self._points -= series.size
+            self.evictions += 1
+
+    def _drop(self, key: tuple[str, int | None]) -> None:
+        series = self._series.pop(key, None)
+        if series is not None:
+            self._points -= series.size
+
+    def get(self, db: Session, indicator_type: str, zone_id: int | None):
+        """(timestamps, valeurs) triés d'une série, chargée si besoin."""
+        key = (indicator_type, zone_id)
+        # Lue avant les lignes : une écriture entre les deux ne fait que
+        # recharger la série à la lecture suivante
+        version = data_versions.version(db, indicator_type, zone_id)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None and series.version == version:
+                self._series.move_to_end(key)
+                self.hits += 1
+                return series.view()
+            self._drop(key)
+            self.misses += 1
+            generation = self._generation
+
+        series = self._load(db, key, version)
+        view = series.view()
+        with self._lock:
+            if generation == self._generation and key not in self._series:
+                if series.size <= self.max_points:
+                    self._series[key] = series
+                    self._points += series.size
+                    self._evict()
+        return view
+
+    def buckets(
+        self,
+        db: Session,
+        indicator_type: str,
+        bucket: Bucket,
+        lo: datetime | None = None,
+        hi: datetime | None = None,
+        zone_id: int | None = None,
+    ) -> tuple[list[int], list[float], list[int]]:
+        """(cases, sommes, nombres) d'une série, comme les requêtes SQL de stats."""
+        ts, values = self.get(db, indicator_type, zone_id)
+        slots, sums, counts = aggregate(ts, values, bucket, lo, hi)
+        return slots.tolist(), sums.tolist(), counts.tolist()
+
+    def on_committed(
+        self,
+        appended: list[dict],
+        rewritten: set[tuple[str, int]],
+        versions: dict[tuple, int],
+    ) -> None:
+        """
+        Listener après commit : ajoute les lignes, oublie les séries
+        réécrites et celles qui ont manqué une écriture (version sautée).
+        """
+        groups: dict[tuple[str, int | None], list[dict]] = {}
+        for row in appended:
+            groups.setdefault((row["type"], row["zone_id"]), []).append(row)
+            groups.setdefault((row["type"], None), []).append(row)
+
+        with self._lock:
+            self._generation += 1
+            for type_, zone_id in rewritten:
+                self._drop((type_, zone_id))
+                self._drop((type_, None))
+            for key, rows in groups.items():
+                series = self._series.get(key)
+                version = versions.get(key)
+                if series is None or (version is not None and series.version >= version):
+                    continue  # absente, ou rechargée après ce commit
+                if version is None or series.version != version - 1:
+                    self._drop(key)  # écriture d'un autre processus manquée
+                    continue
+                series.version = version
+                series.append(
+                    to_epoch_us([naive(row["timestamp"]) for row in rows]),
+                    np.array([row["value"] for row in rows], dtype=np.float64),
+                )
+                self._points += len(rows)
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "series": len(self._series),
+                "points": self._points,
+                "max_points": self.max_points,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@lru_cache
+def get_series_cache() -> SeriesCache:
+    cache = SeriesCache(settings.SERIES_CACHE_MAX_POINTS)
+    on_indicator_rows_committed(cache.on_committed)
+    return cache
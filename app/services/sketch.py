@@ -0,0 +1,84 @@
+# app/services/sketch.py
+"""
+Histogramme logarithmique fusionnable (type DDSketch) pour les percentiles.
+
+Chaque valeur tombe dans une case entière ; la case k d'une valeur positive
+couvre ]gamma^(k-1), gamma^k], d'où une erreur relative <= RELATIVE_ACCURACY
+sur tout percentile. Un histogramme est un simple {case: nombre} : fusionner
+deux histogrammes = additionner les nombres, ce qui se fait en SQL
+(rollups indicator_rollup_bins) comme en Python.
+
+Encodage des cases : 0 pour les valeurs quasi nulles, +/-(k + BIN_OFFSET)
+selon le signe (BIN_OFFSET garde |case| > 0 pour toute valeur >= MIN_VALUE).
+"""
+
+import math
+from typing import Iterable
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+MIN_VALUE = 1e-9
+BIN_OFFSET = 2000
+
+
+def bin_of(value: float) -> int:
+    """Case de l'histogramme d'une valeur."""
+    magnitude = abs(value)
+    if magnitude < MIN_VALUE:
+        return 0
+    k = math.ceil(math.log(magnitude) / _LOG_GAMMA) + BIN_OFFSET
+    return k if value > 0 else -k
+
+
+def bin_value(bin_: int) -> float:
+    """Valeur représentative d'une case (erreur relative <= RELATIVE_ACCURACY)."""
+    if bin_ == 0:
+        return 0.0
+    k = abs(bin_) - BIN_OFFSET
+    value = 2 * GAMMA**k / (GAMMA + 1)
+    return value if bin_ > 0 else -value
+
+
+def add_values(histogram: dict[int, int], values: Iterable[float]) -> dict[int, int]:
+    """Ajoute des valeurs brutes à un histogramme (modifié et renvoyé)."""
+    for value in values:
+        bin_ = bin_of(value)
+        histogram[bin_] = histogram.get(bin_, 0) + 1
+    return histogram
+
+
+def quantiles(
+    histogram: dict[int, int],
+    qs: Iterable[float],
+    lo: float | None = None,
+    hi: float | None = None,
+) -> list[float | None]:
+    """
+    Percentiles (q entre 0 et 1) : valeur de rang q * (n - 1) dans l'ordre
+    croissant. `lo` / `hi` (min / max exacts) bornent les estimations.
+    """
+    qs = list(qs)
+    total = sum(histogram.values())
+    if total == 0:
+        return [None] * len(qs)
+
+    bins = sorted(histogram.items(), key=lambda item: bin_value(item[0]))
+    targets = sorted((q * (total - 1), i) for i, q in enumerate(qs))
+    results: list[float | None] = [None] * len(qs)
+
+    cumulative = 0
+    t = 0
+    for bin_, count in bins:
+        cumulative += count
+        while t < len(targets) and targets[t][0] < cumulative:
+            results[targets[t][1]] = bin_value(bin_)
+            t += 1
+        if t == len(targets):
+            break
+
+    if lo is not None:
+        results = [max(value, lo) for value in results]
+    if hi is not None:
+        results = [min(value, hi) for value in results]
+    return results
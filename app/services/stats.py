@@ -0,0 +1,457 @@
+# app/services/stats.py
+"""
+Calcul des statistiques à partir des rollups (tranches entièrement
+couvertes) et des lignes brutes (bords partiels de la période).
+"""
+
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import String, func, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.indicator import Indicator
+from app.models.rollup import IndicatorRollup, IndicatorRollupBin
+from app.services.buckets import Bucket, resolve
+from app.services.rollups import naive, plan_segments
+from app.services.sketch import add_values, quantiles
+
+# Cases créées au plus par un remplissage (fill) : interval=1s sur dix ans
+# produirait des centaines de millions de points
+MAX_FILLED_POINTS = 1_000_000
+# Réduction : premier point, dernier point et au moins une case entre les deux
+MIN_DOWNSAMPLE_POINTS = 3
+
+# Percentiles renvoyés par /stats/summary
+SUMMARY_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+
+
+class MissingDependency(Exception):
+    """Paquet optionnel requis par une option de la requête (réponse 501)."""
+
+
+def _numpy(feature: str):
+    """numpy, importé à la demande : seules certaines options en ont besoin."""
+    try:
+        import numpy
+    except ImportError:
+        raise MissingDependency(f"{feature} : numpy requis (pip install numpy).") from None
+    return numpy
+
+
+def _half_open(from_date: datetime | None, to_date: datetime | None):
+    """Les routes prennent to_date inclus : on passe en intervalle [lo, hi[."""
+    lo = naive(from_date) if from_date is not None else None
+    hi = naive(to_date) + timedelta(microseconds=1) if to_date is not None else None
+    return lo, hi
+
+
+def _match(column, value):
+    """Égalité, ou IN pour une liste de valeurs (requêtes multi-séries)."""
+    return column.in_(value) if isinstance(value, list) else column == value
+
+
+def _rollup_where(
+    granularity, start, end, indicator_type, zone_id, source_id, model=IndicatorRollup
+):
+    clauses = [
+        model.granularity == granularity,
+        _match(model.type, indicator_type),
+    ]
+    if start is not None:
+        clauses.append(model.bucket_start >= start)
+    if end is not None:
+        clauses.append(model.bucket_start < end)
+    if zone_id is not None:
+        clauses.append(_match(model.zone_id, zone_id))
+    if source_id is not None:
+        clauses.append(model.source_id == source_id)
+    return clauses
+
+
+def _raw_where(start, end, indicator_type, zone_id, source_id):
+    clauses = [_match(Indicator.type, indicator_type)]
+    if start is not None:
+        clauses.append(Indicator.timestamp >= start)
+    if end is not None:
+        clauses.append(Indicator.timestamp < end)
+    if zone_id is not None:
+        clauses.append(_match(Indicator.zone_id, zone_id))
+    if source_id is not None:
+        clauses.append(Indicator.source_id == source_id)
+    return clauses
+
+
+def _union(parts: list):
+    return union_all(*parts) if len(parts) > 1 else parts[0]
+
+
+def average(
+    db: Session,
+    indicator_type: str,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+) -> tuple[float | None, int]:
+    """Renvoie (moyenne, nombre de points) ; moyenne None si aucun point."""
+    lo, hi = _half_open(from_date, to_date)
+
+    parts = []
+    for granularity, start, end in plan_segments(lo, hi):
+        if granularity is None:
+            parts.append(
+                select(
+                    func.sum(Indicator.value).label("s"),
+                    func.count(Indicator.id).label("c"),
+                ).where(*_raw_where(start, end, indicator_type, zone_id, source_id))
+            )
+        else:
+            parts.append(
+                select(
+                    func.sum(IndicatorRollup.value_sum).label("s"),
+                    func.sum(IndicatorRollup.value_count).label("c"),
+                ).where(
+                    *_rollup_where(granularity, start, end, indicator_type, zone_id, source_id)
+                )
+            )
+
+    if not parts:
+        return None, 0
+
+    total, count = 0.0, 0
+    for s, c in db.execute(_union(parts)):
+        if c:
+            total += s
+            count += c
+
+    return (total / count if count else None), count
+
+
+def summary(
+    db: Session,
+    indicator_type: str,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+) -> dict:
+    """
+    Distribution des valeurs : count, average, min, max, stddev (écart-type
+    de population, exact via la somme des carrés) et percentiles p50 / p90 /
+    p95 / p99 (histogrammes des rollups fusionnés, erreur relative <= 1 %).
+    """
+    lo, hi = _half_open(from_date, to_date)
+
+    moments, bins, raw_values = [], [], []
+    for granularity, start, end in plan_segments(lo, hi):
+        if granularity is None:
+            where = _raw_where(start, end, indicator_type, zone_id, source_id)
+            moments.append(
+                select(
+                    func.sum(Indicator.value).label("s"),
+                    func.count(Indicator.id).label("c"),
+                    func.sum(Indicator.value * Indicator.value).label("sq"),
+                    func.min(Indicator.value).label("lo"),
+                    func.max(Indicator.value).label("hi"),
+                ).where(*where)
+            )
+            raw_values.append(select(Indicator.value).where(*where))
+        else:
+            moments.append(
+                select(
+                    func.sum(IndicatorRollup.value_sum).label("s"),
+                    func.sum(IndicatorRollup.value_count).label("c"),
+                    func.sum(IndicatorRollup.value_sumsq).label("sq"),
+                    func.min(IndicatorRollup.value_min).label("lo"),
+                    func.max(IndicatorRollup.value_max).label("hi"),
+                ).where(
+                    *_rollup_where(granularity, start, end, indicator_type, zone_id, source_id)
+                )
+            )
+            bins.append(
+                select(
+                    IndicatorRollupBin.bin,
+                    func.sum(IndicatorRollupBin.value_count).label("c"),
+                )
+                .where(
+                    *_rollup_where(
+                        granularity, start, end, indicator_type, zone_id, source_id,
+                        model=IndicatorRollupBin,
+                    )
+                )
+                .group_by(IndicatorRollupBin.bin)
+            )
+
+    total, count, sumsq = 0.0, 0, 0.0
+    low = high = None
+    if moments:
+        for s, c, sq, part_lo, part_hi in db.execute(_union(moments)):
+            if not c:
+                continue
+            total += s
+            count += c
+            sumsq += sq
+            low = part_lo if low is None else min(low, part_lo)
+            high = part_hi if high is None else max(high, part_hi)
+
+    result = {
+        "count": count,
+        "average": None,
+        "min": low,
+        "max": high,
+        "stddev": None,
+        "percentiles": dict.fromkeys(SUMMARY_PERCENTILES),
+    }
+    if not count:
+        return result
+
+    # Histogramme fusionné : cases des rollups + valeurs des bords bruts
+    histogram: dict[int, int] = {}
+    if bins:
+        for bin_, c in db.execute(_union(bins)):
+            histogram[bin_] = histogram.get(bin_, 0) + c
+    if raw_values:
+        add_values(histogram, db.execute(_union(raw_values)).scalars())
+
+    mean = total / count
+    result["average"] = mean
+    result["stddev"] = math.sqrt(max(sumsq / count - mean * mean, 0.0))
+    result["percentiles"] = dict(
+        zip(
+            SUMMARY_PERCENTILES,
+            quantiles(histogram, SUMMARY_PERCENTILES.values(), lo=low, hi=high),
+        )
+    )
+    return result
+
+
+def _bucket_parts(lo, hi, bucket: Bucket, indicator_type, zone_id, by_series=False) -> list:
+    """
+    Un SELECT (case, somme, nombre) par segment : tranches de rollup
+    contenues dans une case, lignes brutes pour les bords. `by_series`
+    ajoute (type, zone_id) en tête pour les requêtes multi-séries.
+    """
+    parts = []
+    for granularity, start, end in plan_segments(lo, hi, bucket.levels):
+        if granularity is None:
+            model, column = Indicator, Indicator.timestamp
+            sums = (func.sum(Indicator.value), func.count(Indicator.id))
+            where = _raw_where(start, end, indicator_type, zone_id, None)
+        else:
+            model, column = IndicatorRollup, IndicatorRollup.bucket_start
+            sums = (func.sum(IndicatorRollup.value_sum), func.sum(IndicatorRollup.value_count))
+            where = _rollup_where(granularity, start, end, indicator_type, zone_id, None)
+        keys = (model.type, model.zone_id) if by_series else ()
+        slot = bucket.slot_expr(column)
+        parts.append(
+            select(*keys, slot.label("slot"), sums[0].label("s"), sums[1].label("c"))
+            .where(*where)
+            .group_by(*keys, slot)
+        )
+    return parts
+
+
+def _check_max_points(max_points: int | None) -> None:
+    if max_points is not None and max_points < MIN_DOWNSAMPLE_POINTS:
+        raise ValueError(f"max_points doit être >= {MIN_DOWNSAMPLE_POINTS}.")
+
+
+def _points(
+    bucket: Bucket,
+    acc: dict[int, list],
+    lo,
+    hi,
+    fill: str,
+    max_points: int | None = None,
+    downsample: str = "lttb",
+) -> list[dict]:
+    """
+    Points triés par case ; avec `fill`, toutes les cases de la période ;
+    avec `max_points`, réduits (LTTB / min-max) pour l'affichage.
+    """
+    slots = sorted(slot for slot, (_, c) in acc.items() if c)
+    sums = [acc[slot][0] for slot in slots]
+    counts = [acc[slot][1] for slot in slots]
+    if fill == "none":
+        points = bucket.points(slots, sums, counts)
+    elif not slots:
+        return []
+    else:
+        points, slots = _filled(bucket, slots, sums, counts, lo, hi, fill)
+
+    if max_points is None or len(points) <= max_points:
+        return points
+
+    # Import tardif : numpy n'est requis que pour la réduction
+    _numpy("Réduction (max_points)")
+    from app.services.downsample import downsample_points
+
+    return downsample_points(points, slots, max_points, downsample)
+
+
+def _filled(bucket: Bucket, slots, sums, counts, lo, hi, fill: str):
+    """(points, cases) de toutes les cases de la période, vides comprises."""
+    first = slots[0] if lo is None else bucket.slot_of(lo)
+    last = slots[-1] if hi is None else bucket.slot_of(hi - timedelta(microseconds=1))
+    if last - first + 1 > MAX_FILLED_POINTS:
+        raise ValueError(
+            f"Trop de périodes à remplir ({last - first + 1} > {MAX_FILLED_POINTS}) : "
+            "réduire la période ou élargir l'intervalle."
+        )
+
+    # Import tardif : numpy n'est requis que pour le remplissage
+    _numpy("Remplissage (fill)")
+    from app.services.gap_fill import fill_points
+
+    return fill_points(bucket, slots, sums, counts, first, last, fill), range(first, last + 1)
+
+
+def timeseries(
+    db: Session,
+    indicator_type: str,
+    group_by: str = "day",
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    interval: str | None = None,
+    fill: str = "none",
+    max_points: int | None = None,
+    downsample: str = "lttb",
+) -> list[dict]:
+    """
+    Points [{period, average, count}] triés par période. `interval`
+    ('15min', '2h'...) prime sur `group_by` ; `fill` (null, previous,
+    linear) ajoute les périodes vides (count 0) ; `max_points` réduit la
+    série (downsample : lttb ou minmax). ValueError si un paramètre est
+    invalide ou le remplissage trop grand.
+    """
+    lo, hi = _half_open(from_date, to_date)
+    bucket = resolve(group_by, interval)
+    _check_max_points(max_points)
+
+    if settings.SERIES_CACHE_MAX_POINTS > 0:
+        # Import tardif : numpy n'est requis que si le cache est activé
+        from app.services.series_cache import get_series_cache
+
+        slots, sums, counts = get_series_cache().buckets(
+            db, indicator_type, bucket, lo, hi, zone_id
+        )
+        acc = {slot: [s, c] for slot, s, c in zip(slots, sums, counts)}
+        return _points(bucket, acc, lo, hi, fill, max_points, downsample)
+
+    parts = _bucket_parts(lo, hi, bucket, indicator_type, zone_id)
+    if not parts:
+        return []
+
+    # Une même case peut recevoir un bord brut et des tranches horaires
+    acc: dict[int, list] = {}
+    for slot, s, c in db.execute(_union(parts)):
+        agg = acc.setdefault(slot, [0.0, 0])
+        agg[0] += s
+        agg[1] += c
+
+    return _points(bucket, acc, lo, hi, fill, max_points, downsample)
+
+
+def timeseries_many(
+    db: Session,
+    series: list[tuple[str, int | None]],
+    group_by: str = "day",
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    interval: str | None = None,
+    fill: str = "none",
+    max_points: int | None = None,
+    downsample: str = "lttb",
+) -> dict[tuple[str, int | None], list[dict]]:
+    """
+    Plusieurs séries (type, zone_id) sur la même période, en une requête
+    groupée par (type, zone, case) ; zone_id None = toutes zones.
+    Renvoie {(type, zone_id): points}, points comme timeseries()
+    (chaque série réduite à `max_points`).
+    """
+    lo, hi = _half_open(from_date, to_date)
+    bucket = resolve(group_by, interval)
+    _check_max_points(max_points)
+
+    if settings.SERIES_CACHE_MAX_POINTS > 0:
+        from app.services.series_cache import get_series_cache
+
+        cache = get_series_cache()
+        result = {}
+        for indicator_type, zone_id in series:
+            slots, sums, counts = cache.buckets(db, indicator_type, bucket, lo, hi, zone_id)
+            acc = {slot: [s, c] for slot, s, c in zip(slots, sums, counts)}
+            result[(indicator_type, zone_id)] = _points(
+                bucket, acc, lo, hi, fill, max_points, downsample
+            )
+        return result
+
+    types = sorted({indicator_type for indicator_type, _ in series})
+    # Une série "toutes zones" oblige à lire toutes les zones de son type
+    zones = None if any(zone_id is None for _, zone_id in series) else sorted(
+        {zone_id for _, zone_id in series}
+    )
+
+    parts = _bucket_parts(lo, hi, bucket, types, zones, by_series=True)
+    accs: dict[tuple[str, int | None], dict[int, list]] = {key: {} for key in series}
+    if parts:
+        for type_, zone_id, slot, s, c in db.execute(_union(parts)):
+            for key in ((type_, zone_id), (type_, None)):
+                acc = accs.get(key)
+                if acc is None:
+                    continue
+                agg = acc.setdefault(slot, [0.0, 0])
+                agg[0] += s
+                agg[1] += c
+
+    return {
+        key: _points(bucket, acc, lo, hi, fill, max_points, downsample)
+        for key, acc in accs.items()
+    }
+
+
+def raw_series(
+    db: Session,
+    indicator_type: str,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    zone_id: int | None = None,
+    source_id: int | None = None,
+    max_points: int = 1000,
+    downsample: str = "lttb",
+) -> dict:
+    """
+    Mesures brutes d'une série, réduites à `max_points` points (LTTB ou
+    min-max) : {count (avant réduction), timestamps, values}. Lue dans le
+    cache de séries s'il est activé (sans filtre de source). numpy requis.
+    """
+    _check_max_points(max_points)
+    np = _numpy("Séries brutes")
+
+    from app.services import downsample as downsample_service
+    from app.services.series_cache import get_series_cache, to_epoch_us
+
+    lo, hi = _half_open(from_date, to_date)
+    if settings.SERIES_CACHE_MAX_POINTS > 0 and source_id is None:
+        ts, values = get_series_cache().get(db, indicator_type, zone_id)
+        start = 0 if lo is None else int(np.searchsorted(ts, to_epoch_us(lo)))
+        end = len(ts) if hi is None else int(np.searchsorted(ts, to_epoch_us(hi)))
+        ts, values = ts[start:end], values[start:end]
+    else:
+        rows = db.execute(
+            select(type_coerce(Indicator.timestamp, String), Indicator.value)
+            .where(*_raw_where(lo, hi, indicator_type, zone_id, source_id))
+            .order_by(Indicator.timestamp)
+        ).all()
+        ts = to_epoch_us([timestamp for timestamp, _ in rows])
+        values = np.array([value for _, value in rows], dtype=np.float64)
+
+    kept = downsample_service.downsample(ts.astype(np.float64), values, max_points, downsample)
+    return {
+        "count": len(ts),
+        "timestamps": np.datetime_as_string(ts[kept].astype("datetime64[us]"), unit="s").tolist(),
+        "values": values[kept].tolist(),
+    }
@@ -0,0 +1,123 @@
+# app/services/stats_cache.py
+"""
+Cache des résultats des routes /stats.
+
+Clé = paramètres normalisés de la requête. Une écriture sur des
+indicateurs (type, zone) invalide exactement les entrées de même type
+dont la zone vaut cette zone ou "toutes zones" (zone_id None).
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.indicators import on_indicators_committed
+from app.services.rollups import naive
+
+stats_cache = TTLCache(
+    maxsize=settings.STATS_CACHE_MAX_ENTRIES,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+)
+
+# Incrémenté à chaque invalidation : un résultat calculé avant une
+# écriture n'est pas remis en cache après celle-ci.
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return naive(value).isoformat()
+    return value
+
+
+def cache_key(kind: str, indicator_type: str, zone_id: int | None, **params) -> tuple:
+    """(kind, type, zone_id, (param, valeur)...) avec les dates normalisées."""
+    return (
+        kind,
+        indicator_type,
+        zone_id,
+        tuple(sorted((name, _normalize(value)) for name, value in params.items())),
+    )
+
+
+def get_or_compute(key: tuple, compute: Callable[[], Any]) -> Any:
+    value = stats_cache.get(key)
+    if value is not None:
+        return value
+
+    generation = _generation
+    value = compute()
+    with _generation_lock:
+        if generation == _generation:
+            stats_cache.set(key, value)
+    return value
+
+
+async def aget_or_compute(key: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Variante de get_or_compute pour les routes async."""
+    value = stats_cache.get(key)
+    if value is not None:
+        return value
+
+    generation = _generation
+    value = await compute()
+    with _generation_lock:
+        if generation == _generation:
+            stats_cache.set(key, value)
+    return value
+
+
+def _store_many(keys: list[tuple], values: list[Any], generation: int) -> None:
+    with _generation_lock:
+        if generation == _generation:
+            for key, value in zip(keys, values):
+                stats_cache.set(key, value)
+
+
+def get_or_compute_many(
+    keys: list[tuple], compute: Callable[[list[tuple]], list[Any]]
+) -> list[Any]:
+    """
+    get_or_compute pour plusieurs clés : compute(clés absentes du cache)
+    calcule en une fois les valeurs manquantes, dans le même ordre.
+    """
+    values = [stats_cache.get(key) for key in keys]
+    missing = [key for key, value in zip(keys, values) if value is None]
+    if not missing:
+        return values
+
+    generation = _generation
+    computed = compute(missing)
+    _store_many(missing, computed, generation)
+    found = dict(zip(missing, computed))
+    return [found[key] if value is None else value for key, value in zip(keys, values)]
+
+
+async def aget_or_compute_many(
+    keys: list[tuple], compute: Callable[[list[tuple]], Awaitable[list[Any]]]
+) -> list[Any]:
+    """Variante de get_or_compute_many pour les routes async."""
+    values = [stats_cache.get(key) for key in keys]
+    missing = [key for key, value in zip(keys, values) if value is None]
+    if not missing:
+        return values
+
+    generation = _generation
+    computed = await compute(missing)
+    _store_many(missing, computed, generation)
+    found = dict(zip(missing, computed))
+    return [found[key] if value is None else value for key, value in zip(keys, values)]
+
+
+@on_indicators_committed
+def invalidate(scopes: set[tuple[str, int]]) -> None:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+    stats_cache.discard_where(
+        lambda key, value: (key[1], key[2]) in scopes
+        or (key[2] is None and any(key[1] == type_ for type_, _ in scopes))
+    )
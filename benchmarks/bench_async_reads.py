@@ -0,0 +1,164 @@
+# benchmarks/bench_async_reads.py
+"""
+Routes de lecture sync (threadpool de Starlette) contre routes async
+(SQLAlchemy asyncio + aiosqlite), sous forte concurrence, cache des
+stats désactivé.
+
+    python -m benchmarks.bench_async_reads --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, make_client, summarize, temp_sqlite_url
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_async_db, get_db
+from app.api.routes import async_reads, auth, indicators, sources, stats, zones
+from app.db.async_session import create_async_db_engine
+from app.db.session import create_db_engine
+from app.main import app as sync_app
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services.indicators import upsert_indicators
+from app.services.stats_cache import stats_cache
+
+START = datetime(2025, 1, 1)
+
+
+def seed(SessionLocal, rows: int) -> None:
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        db.add_all([Zone(name=f"Zone {i}") for i in range(10)] + [Source(name="Bench")])
+        db.commit()
+        upsert_indicators(
+            db,
+            [
+                {
+                    "type": "PM10",
+                    "value": rng.uniform(0, 80),
+                    "unit": "µg/m3",
+                    "timestamp": START + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                    "zone_id": rng.randint(1, 10),
+                    "source_id": 1,
+                    "extra_data": None,
+                }
+                for _ in range(rows)
+            ],
+            on_conflict="nothing",
+        )
+        db.commit()
+
+
+def use_sync_reader(db_url: str, pool_size: int) -> None:
+    """
+    Lecteur "production" avec une connexion par requête en vol : si le
+    pool est plus petit, les threads qui attendent une connexion
+    bloquent la fermeture des sessions (elle passe aussi par le
+    threadpool) et tout s'arrête jusqu'au timeout du pool.
+    """
+    ReadSession = sessionmaker(
+        bind=create_db_engine(db_url, profile="production", read_only=True, pool_size=pool_size)
+    )
+
+    def override_get_db():
+        db = ReadSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    sync_app.dependency_overrides[get_db] = override_get_db
+
+
+def make_async_app(db_url: str) -> FastAPI:
+    AsyncSessionLocal = async_sessionmaker(
+        create_async_db_engine(db_url, profile="production"), expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(async_reads.router)
+    for router in (auth.router, zones.router, sources.router, indicators.router, stats.router):
+        app.include_router(router)
+    app.dependency_overrides[get_db] = sync_app.dependency_overrides[get_db]
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app
+
+
+def paths(n: int) -> list[str]:
+    rng = random.Random(1)
+    result = []
+    for _ in range(n):
+        from_date = START + timedelta(days=rng.randrange(300))
+        to_date = from_date + timedelta(days=30, hours=5)
+        result.append(rng.choice([
+            "/indicators/?limit=50",
+            f"/indicators/?limit=50&zone_id={rng.randint(1, 10)}",
+            "/zones/",
+            f"/stats/average?indicator_type=PM10&zone_id={rng.randint(1, 10)}"
+            f"&from_date={from_date.isoformat()}&to_date={to_date.isoformat()}",
+            f"/stats/timeseries?indicator_type=PM10&zone_id={rng.randint(1, 10)}",
+        ]))
+    return result
+
+
+async def run(app: FastAPI, headers: dict, requests: list[str], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers
+    ) as client:
+
+        async def one(path: str):
+            async with semaphore:
+                t0 = time.perf_counter()
+                resp = await client.get(path)
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in requests))
+        elapsed = time.perf_counter() - start
+
+    return {"rps": round(len(requests) / elapsed), **summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seed-rows", type=int, default=100_000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    db_url = temp_sqlite_url()
+    _, headers, SessionLocal = make_client(db_url)
+    seed(SessionLocal, args.seed_rows)
+    use_sync_reader(db_url, args.concurrency)
+
+    stats_cache.maxsize = 0  # on mesure l'accès base, pas le cache
+    requests = paths(args.requests)
+    results = {}
+    for name, app in (("sync", sync_app), ("async", make_async_app(db_url))):
+        results[name] = asyncio.run(run(app, headers, requests, args.concurrency))
+
+    dump_json(
+        {"requests": args.requests, "concurrency": args.concurrency, **results},
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
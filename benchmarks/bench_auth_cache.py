@@ -0,0 +1,57 @@
+# benchmarks/bench_auth_cache.py
+"""
+Coût de l'authentification sur GET /indicators/ avec et sans le cache
+token -> utilisateur de get_current_user.
+
+    python -m benchmarks.bench_auth_cache --requests 2000
+"""
+
+import argparse
+import time
+
+from benchmarks.common import dump_json, make_client, summarize, temp_sqlite_url
+
+from app.api.deps import principal_cache
+
+
+def run(client, headers, n: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        client.get("/indicators/?limit=10", headers=headers).raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    return {"rps": round(n / elapsed), **summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    client, headers, _ = make_client(temp_sqlite_url())
+    maxsize = principal_cache.maxsize
+
+    principal_cache.maxsize = 0  # cache désactivé
+    principal_cache.clear()
+    without_cache = run(client, headers, args.requests)
+
+    principal_cache.maxsize = maxsize
+    without_cache_hits = principal_cache.hits
+    with_cache = run(client, headers, args.requests)
+
+    dump_json(
+        {
+            "endpoint": "GET /indicators/?limit=10",
+            "without_cache": without_cache,
+            "with_cache": with_cache,
+            "cache_hits": principal_cache.hits - without_cache_hits,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
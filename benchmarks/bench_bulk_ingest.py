@@ -0,0 +1,95 @@
+# benchmarks/bench_bulk_ingest.py
+"""
+Débit d'écriture : POST /indicators/ (une ligne par requête)
+contre POST /indicators/bulk (JSON et NDJSON), puis les mêmes lignes
+renvoyées avec d'autres valeurs (upsert en mise à jour : rollups ajustés).
+
+    python -m benchmarks.bench_bulk_ingest --rows 20000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, make_client, temp_sqlite_url
+
+from app.db.instrumentation import parse_server_timing
+
+
+def make_items(n: int, zone_id: int, source_id: int, step_minutes: int = 1) -> list[dict]:
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "type": "PM10",
+            "value": float(i % 97),
+            "unit": "µg/m3",
+            "timestamp": (start + timedelta(minutes=i * step_minutes)).isoformat(),
+            "zone_id": zone_id,
+            "source_id": source_id,
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--single-rows", type=int, default=1_000,
+                        help="nombre de lignes envoyées une par une")
+    parser.add_argument("--batch", type=int, default=5_000)
+    parser.add_argument("--step-minutes", type=int, default=1,
+                        help="écart entre deux mesures (60 : une tranche horaire par ligne)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    client, headers, _ = make_client(temp_sqlite_url())
+    zone_id = client.post("/zones/", headers=headers, json={"name": "Bench"}).json()["id"]
+    source_id = client.post(
+        "/sources/", headers=headers, json={"name": "Bench", "type": "bench"}
+    ).json()["id"]
+
+    results = {}
+
+    items = make_items(args.single_rows, zone_id, source_id)
+    start = time.perf_counter()
+    for item in items:
+        client.post("/indicators/", headers=headers, json=item).raise_for_status()
+    results["single"] = round(len(items) / (time.perf_counter() - start))
+
+    items = make_items(args.rows, zone_id, source_id, args.step_minutes)
+    start = time.perf_counter()
+    for i in range(0, len(items), args.batch):
+        resp = client.post("/indicators/bulk", headers=headers, json=items[i:i + args.batch])
+        resp.raise_for_status()
+    results["bulk_json"] = round(len(items) / (time.perf_counter() - start))
+
+    ndjson_headers = {**headers, "Content-Type": "application/x-ndjson"}
+    start = time.perf_counter()
+    for i in range(0, len(items), args.batch):
+        body = "\n".join(json.dumps(item) for item in items[i:i + args.batch])
+        client.post("/indicators/bulk", headers=ndjson_headers, content=body).raise_for_status()
+    results["bulk_ndjson"] = round(len(items) / (time.perf_counter() - start))
+
+    changed = [{**item, "value": item["value"] + 0.5} for item in items]
+    queries = 0
+    start = time.perf_counter()
+    for i in range(0, len(changed), args.batch):
+        resp = client.post("/indicators/bulk", headers=headers, json=changed[i:i + args.batch])
+        resp.raise_for_status()
+        timing = parse_server_timing(resp.headers.get("server-timing"))
+        queries += timing.count if timing else 0
+    results["bulk_json_update"] = round(len(items) / (time.perf_counter() - start))
+
+    dump_json(
+        {
+            "rows_per_s": results,
+            "batch": args.batch,
+            "update_queries_per_batch": queries / max(1, -(-len(changed) // args.batch)),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_csv_ingest.py
+"""
+Ingestion CSV en flux (ingest_pollution_csv) sur un gros fichier
+généré : débit en lignes/s et pic mémoire du processus.
+
+    python -m benchmarks.bench_csv_ingest --rows 5000000 --zones 500
+"""
+
+import argparse
+import csv
+import os
+import random
+import resource
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, temp_sqlite_url
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.services.ingestion.csv_pollution import CHUNK_SIZE, ingest_pollution_csv
+
+START = datetime(2024, 1, 1)
+TYPES = ["PM10", "PM2_5", "NO2", "O3"]
+
+
+def write_csv(path: str, rows: int, zones: int) -> None:
+    rng = random.Random(0)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "zone_name", "postal_code", "indicator_type", "value", "unit"])
+        for i in range(rows):
+            zone = rng.randrange(zones)
+            writer.writerow([
+                (START + timedelta(minutes=i)).isoformat(),
+                f"Zone {zone}",
+                f"{zone:05d}",
+                TYPES[i % len(TYPES)],
+                f"{rng.uniform(0, 80):.2f}",
+                "µg/m3",
+            ])
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss est en kilo-octets sous Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--zones", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--profile", default="production")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    url = temp_sqlite_url("csv.db")
+    csv_path = os.path.join(os.path.dirname(url[len("sqlite:///"):]), "pollution.csv")
+    write_csv(csv_path, args.rows, args.zones)
+
+    engine = create_db_engine(url, profile=args.profile)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        inserted = ingest_pollution_csv(db, csv_path, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    dump_json(
+        {
+            "rows": inserted,
+            "zones": args.zones,
+            "chunk_size": args.chunk_size,
+            "profile": args.profile,
+            "csv_mb": round(os.path.getsize(csv_path) / 2**20, 1),
+            "seconds": round(elapsed, 1),
+            "rows_per_s": round(inserted / elapsed),
+            "max_rss_mb_before": rss_before,
+            "max_rss_mb_after": max_rss_mb(),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
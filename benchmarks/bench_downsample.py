@@ -0,0 +1,79 @@
+# benchmarks/bench_downsample.py
+"""
+Un an de mesures à la minute : GET /stats/series complet contre réduit à
+`max_points` points (LTTB, min-max), en temps de calcul et en taille de
+réponse JSON ; puis la réduction seule sur les tableaux NumPy.
+
+    python -m benchmarks.bench_downsample --days 365 --max-points 1000
+"""
+
+import argparse
+import json
+from datetime import timedelta
+
+from benchmarks.bench_timeseries_buckets import START, seed
+from benchmarks.common import dump_json, temp_sqlite_url, time_calls
+
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.services import stats as stats_service
+from app.services.downsample import downsample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--max-points", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    engine = create_db_engine(temp_sqlite_url("downsample.db"))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    print(f"[INFO] {args.days} jours de mesures à la minute...")
+    rows = seed(SessionLocal, args.days)
+    to_date = START + timedelta(days=args.days)
+    results = {"rows": rows}
+
+    with SessionLocal() as db:
+        for label, max_points, method in (
+            ("full", rows, "lttb"),
+            ("lttb", args.max_points, "lttb"),
+            ("minmax", args.max_points, "minmax"),
+        ):
+            def run():
+                return stats_service.raw_series(
+                    db, "PM10", from_date=START, to_date=to_date, zone_id=1,
+                    max_points=max_points, downsample=method,
+                )
+
+            result = run()
+            results[label] = {
+                "points": len(result["values"]),
+                "json_bytes": len(json.dumps(result)),
+                **time_calls(run, args.repeat, warmup=1),
+            }
+
+        # Réduction seule, sur les tableaux déjà chargés
+        full = stats_service.raw_series(
+            db, "PM10", from_date=START, to_date=to_date, zone_id=1, max_points=rows
+        )
+        x = np.asarray(full["timestamps"], dtype="datetime64[s]").astype(np.float64)
+        y = np.asarray(full["values"], dtype=np.float64)
+        results["arrays_only"] = {
+            method: time_calls(
+                lambda: downsample(x, y, args.max_points, method), args.repeat, warmup=1
+            )
+            for method in ("lttb", "minmax")
+        }
+
+    dump_json(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_http_conditional.py
+"""
+Polling du front : requête complète (cache /stats vidé, donc recalcul et
+sérialisation) contre requête conditionnelle If-None-Match -> 304 ; et
+octets transférés pour une page de /indicators/ et une série /stats,
+sans compression puis en gzip (et brotli si installé).
+
+    python -m benchmarks.bench_http_conditional --rows 200000
+"""
+
+import argparse
+
+from benchmarks.bench_list_serialization import seed
+from benchmarks.common import dump_json, make_client, temp_sqlite_url, time_calls
+
+from app.core import compression
+from app.services.stats_cache import stats_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    client, headers, SessionLocal = make_client(temp_sqlite_url("conditional.db"))
+    print(f"[INFO] Insertion de {args.rows} lignes...")
+    seed(SessionLocal, args.rows)
+
+    paths = {
+        "indicators_page": "/indicators/?indicator_type=PM10&zone_id=1&limit=1000",
+        "timeseries_hour": "/stats/timeseries?indicator_type=PM10&zone_id=1&group_by=hour",
+        "summary": "/stats/summary?indicator_type=PM10&zone_id=1",
+    }
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+    results = {"rows": args.rows}
+
+    for label, path in paths.items():
+        etag = client.get(path, headers=headers).headers["etag"]
+
+        def full():
+            stats_cache.clear()
+            client.get(path, headers=headers).raise_for_status()
+
+        def conditional():
+            resp = client.get(path, headers={**headers, "If-None-Match": etag})
+            assert resp.status_code == 304
+
+        sizes = {}
+        for encoding in encodings:
+            resp = client.get(path, headers={**headers, "Accept-Encoding": encoding})
+            sizes[encoding] = resp.num_bytes_downloaded  # octets reçus, avant décompression
+
+        results[label] = {
+            "bytes": sizes,
+            "full_200": time_calls(full, args.repeat),
+            "conditional_304": time_calls(conditional, args.repeat),
+        }
+
+    dump_json(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# benchmarks/bench_indicator_indexes.py
+"""
+Plans de requête et latences des requêtes "séries temporelles"
+avant / après les index composites de la table indicators.
+
+    python -m benchmarks.bench_indicator_indexes --rows 10000000
+
+La base est créée dans un fichier temporaire (jamais ecotrack.db).
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, time_calls
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.models.indicator import Indicator
+from app.models.source import Source
+from app.models.zone import Zone
+
+TYPES = ["temperature", "windspeed", "PM10", "PM2.5", "NO2", "CO2"]
+NEW_INDEXES = [
+    "ix_indicators_type_zone_timestamp",
+    "ix_indicators_source_timestamp",
+    "ix_indicators_timestamp",
+]
+START = datetime(2024, 1, 1)
+
+
+def populate(engine, rows: int, zones: int, sources: int, batch: int = 50_000) -> float:
+    """Insère `rows` indicateurs aléatoires, renvoie le débit (lignes/s)."""
+    with engine.begin() as conn:
+        conn.execute(insert(Zone), [{"name": f"Zone {i}", "postal_code": None} for i in range(zones)])
+        conn.execute(insert(Source), [{"name": f"Source {i}", "type": "bench"} for i in range(sources)])
+
+    rng = random.Random(42)
+    span = 2 * 365 * 24 * 3600
+    start = time.perf_counter()
+    done = 0
+    while done < rows:
+        n = min(batch, rows - done)
+        payload = [
+            {
+                "type": rng.choice(TYPES),
+                "value": rng.uniform(0, 100),
+                "unit": "u",
+                "timestamp": START + timedelta(seconds=rng.randrange(span)),
+                "zone_id": rng.randint(1, zones),
+                "source_id": rng.randint(1, sources),
+                "extra_data": None,
+            }
+            for _ in range(n)
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(Indicator), payload)
+        done += n
+    return rows / (time.perf_counter() - start)
+
+
+def hot_queries(zones: int):
+    """Les requêtes des routes /indicators et /stats, avec des paramètres fixes."""
+    zone_id = zones // 2
+    from_date = START + timedelta(days=200)
+    to_date = from_date + timedelta(days=30)
+
+    return {
+        "list_indicators": (
+            select(Indicator)
+            .where(Indicator.type == "PM10", Indicator.zone_id == zone_id)
+            .order_by(Indicator.timestamp.desc())
+            .limit(100)
+        ),
+        "stats_average": (
+            select(func.avg(Indicator.value), func.count(Indicator.id))
+            .where(
+                Indicator.type == "PM10",
+                Indicator.zone_id == zone_id,
+                Indicator.timestamp >= from_date,
+                Indicator.timestamp <= to_date,
+            )
+        ),
+        "stats_timeseries": (
+            select(
+                func.date(Indicator.timestamp).label("period"),
+                func.avg(Indicator.value),
+                func.count(Indicator.id),
+            )
+            .where(
+                Indicator.type == "PM10",
+                Indicator.zone_id == zone_id,
+                Indicator.timestamp >= from_date,
+                Indicator.timestamp <= to_date,
+            )
+            .group_by("period")
+            .order_by("period")
+        ),
+        "by_source_range": (
+            select(Indicator)
+            .where(
+                Indicator.source_id == 1,
+                Indicator.timestamp >= from_date,
+                Indicator.timestamp <= from_date + timedelta(days=1),
+            )
+            .order_by(Indicator.timestamp.desc())
+            .limit(100)
+        ),
+        "date_range_only": (
+            select(Indicator)
+            .where(Indicator.timestamp >= from_date, Indicator.timestamp <= to_date)
+            .order_by(Indicator.timestamp.desc())
+            .limit(100)
+        ),
+    }
+
+
+def measure(engine, queries: dict, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+            timing = time_calls(lambda: conn.execute(stmt).fetchall(), repeat=repeat)
+            results[name] = {"plan": [row[-1] for row in plan], **timing}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--zones", type=int, default=200)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="fichier JSON de sortie")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="ecotrack-bench-")
+    db_path = os.path.join(tmpdir, "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Disposition "avant" : seul l'index sur id existe. La clé naturelle
+        # unique n'est pas mesurée ici (tirages aléatoires : doublons possibles).
+        for name in (*NEW_INDEXES, "ux_indicators_natural_key"):
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    print(f"[INFO] Insertion de {args.rows} lignes dans {db_path}...")
+    rows_per_s = populate(engine, args.rows, args.zones, args.sources)
+    queries = hot_queries(args.zones)
+
+    print("[INFO] Mesures sans index composites...")
+    before = measure(engine, queries, args.repeat)
+
+    print("[INFO] Création des index composites...")
+    start = time.perf_counter()
+    for index in Indicator.__table__.indexes:
+        if index.name in NEW_INDEXES:
+            index.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE indicators"))
+    index_build_s = time.perf_counter() - start
+
+    print("[INFO] Mesures avec index composites...")
+    after = measure(engine, queries, args.repeat)
+
+    dump_json(
+        {
+            "rows": args.rows,
+            "insert_rows_per_s": round(rows_per_s),
+            "index_build_s": round(index_build_s, 2),
+            "before": before,
+            "after": after,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
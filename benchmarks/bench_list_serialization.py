@@ -0,0 +1,110 @@
+# benchmarks/bench_list_serialization.py
+"""
+Pages de 1000 indicateurs : ancien chemin (instances ORM, validation
+IndicatorRead from_attributes, encodage json) contre le chemin rapide de
+GET /indicators/ (select() de colonnes, RowsResponse encodée avec orjson,
+ou json en repli), en lignes par seconde ; plus la route complète via HTTP.
+
+    python -m benchmarks.bench_list_serialization --rows 100000 --limit 1000
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, make_client, temp_sqlite_url, time_calls
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+
+from app.api import responses
+from app.api.responses import RowsResponse, rows_as_dicts
+from app.api.routes.indicators import READ_COLUMNS, paginate
+from app.models.indicator import Indicator
+from app.models.source import Source
+from app.models.zone import Zone
+from app.schemas.indicator import IndicatorRead
+from app.services.indicators import insert_indicators
+
+START = datetime(2024, 1, 1)
+
+
+def seed(SessionLocal, rows: int) -> None:
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        db.execute(insert(Zone), [{"name": "Zone 1"}])
+        db.execute(insert(Source), [{"name": "Bench"}])
+        for offset in range(0, rows, 50_000):
+            insert_indicators(
+                db,
+                [
+                    {
+                        "type": "PM10",
+                        "value": rng.uniform(0, 80),
+                        "unit": "µg/m3",
+                        "timestamp": START + timedelta(minutes=i),
+                        "zone_id": 1,
+                        "source_id": 1,
+                        "extra_data": {"station": f"S{i % 40}", "quality": rng.choice("ABC")},
+                    }
+                    for i in range(offset, min(offset + 50_000, rows))
+                ],
+            )
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    client, headers, SessionLocal = make_client(temp_sqlite_url("list.db"))
+    print(f"[INFO] Insertion de {args.rows} lignes...")
+    seed(SessionLocal, args.rows)
+    page = {"skip": 0, "limit": args.limit, "cursor": None}
+    adapter = TypeAdapter(list[IndicatorRead])
+
+    with SessionLocal() as db:
+        def legacy() -> bytes:
+            # Ce que faisait FastAPI avec response_model=list[IndicatorRead]
+            # (session neuve par requête : identity map vidée)
+            db.expunge_all()
+            indicators = paginate(db.query(Indicator), **page).all()
+            validated = adapter.validate_python(indicators, from_attributes=True)
+            return json.dumps(
+                adapter.dump_python(validated, mode="json"),
+                ensure_ascii=False, separators=(",", ":"),
+            ).encode("utf-8")
+
+        def fast() -> bytes:
+            rows = db.execute(paginate(select(*READ_COLUMNS), **page)).all()
+            return RowsResponse(rows_as_dicts(rows, READ_COLUMNS)).body
+
+        assert json.loads(legacy()) == json.loads(fast())
+        results = {"rows": args.rows, "page": args.limit}
+        results["orm_pydantic_json"] = time_calls(legacy, args.repeat)
+        results["columns_orjson"] = time_calls(fast, args.repeat)
+        orjson = responses.orjson
+        responses.orjson = None
+        try:
+            results["columns_json"] = time_calls(fast, args.repeat)
+        finally:
+            responses.orjson = orjson
+
+    results["http_get_indicators"] = time_calls(
+        lambda: client.get(
+            "/indicators/", headers=headers, params={"skip": page["skip"], "limit": args.limit}
+        ).raise_for_status(),
+        args.repeat,
+    )
+    for label in ("orm_pydantic_json", "columns_orjson", "columns_json", "http_get_indicators"):
+        results[label]["rows_per_s"] = round(args.limit / results[label]["mean_ms"] * 1000)
+    dump_json(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# benchmarks/bench_load.py
+"""
+Test de charge HTTP : des utilisateurs virtuels (asyncio + httpx) jouent
+un mélange réaliste d'actions (login, liste, pagination par curseur,
+séries temporelles, résumé, création) pendant --duration secondes.
+Résultats en JSON : requêtes / s, erreurs, p50 / p95 / p99 par action et
+au total (comparables avec python -m benchmarks.compare).
+
+Cibles :
+- par défaut, un uvicorn local lancé sur une base temporaire remplie
+  (uvicorn requis ; DB_ENGINE_PROFILE, DB_ASYNC_READS... sont transmis) ;
+- --url http://hôte:port : serveur déjà lancé (--email / --password) ;
+- --url asgi : l'application dans le processus (httpx.ASGITransport),
+  sans réseau, pour un essai rapide.
+
+    python -m benchmarks.bench_load --users 50 --duration 30 --rows 200000
+    python -m benchmarks.bench_load --mix list=50,timeseries=50 --output load.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from benchmarks.bench_routes import START, TYPES, seed
+from benchmarks.common import (
+    BENCH_EMAIL,
+    BENCH_PASSWORD,
+    ROOT_DIR,
+    create_admin,
+    dump_json,
+    make_client,
+    run_info,
+    summarize,
+    temp_sqlite_url,
+)
+
+import httpx
+
+ACTIONS = ("login", "list", "paginate", "timeseries", "summary", "create")
+DEFAULT_MIX = "login=5,list=30,paginate=15,timeseries=25,summary=15,create=10"
+ZONES = 10
+
+
+class Recorder:
+    """Latences et erreurs par action."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    async def request(self, client, action: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[action] += 1
+            return None
+        self.latencies[action].append(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            self.errors[action] += 1
+            return None
+        return resp
+
+
+class VirtualUser:
+    def __init__(self, client, recorder: Recorder, rng: random.Random, created, credentials):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.created = created  # compteur partagé : horodatages uniques
+        self.credentials = credentials
+        self.headers = {}
+
+    async def login(self):
+        resp = await self.recorder.request(
+            self.client, "login", "POST", "/auth/login",
+            data={"username": self.credentials[0], "password": self.credentials[1]},
+        )
+        if resp is not None:
+            self.headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    def _window(self) -> dict:
+        from_date = START + timedelta(days=self.rng.randrange(330), minutes=self.rng.randrange(1440))
+        return {
+            "from_date": from_date.isoformat(),
+            "to_date": (from_date + timedelta(days=self.rng.choice((1, 7, 30)))).isoformat(),
+        }
+
+    async def list(self):
+        params = {"limit": 100}
+        if self.rng.random() < 0.5:
+            params.update(indicator_type=self.rng.choice(TYPES), zone_id=self.rng.randint(1, ZONES))
+        await self.recorder.request(
+            self.client, "list", "GET", "/indicators/", params=params, headers=self.headers
+        )
+
+    async def paginate(self):
+        params = {"limit": 50, "indicator_type": self.rng.choice(TYPES)}
+        for _ in range(self.rng.randint(2, 5)):
+            resp = await self.recorder.request(
+                self.client, "paginate", "GET", "/indicators/", params=params, headers=self.headers
+            )
+            cursor = resp.headers.get("X-Next-Cursor") if resp is not None else None
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+    async def timeseries(self):
+        params = {
+            "indicator_type": self.rng.choice(TYPES),
+            "zone_id": self.rng.randint(1, ZONES),
+            "group_by": self.rng.choice(("hour", "day", "week")),
+            **self._window(),
+        }
+        await self.recorder.request(
+            self.client, "timeseries", "GET", "/stats/timeseries", params=params, headers=self.headers
+        )
+
+    async def summary(self):
+        params = {"indicator_type": self.rng.choice(TYPES), "zone_id": self.rng.randint(1, ZONES), **self._window()}
+        await self.recorder.request(
+            self.client, "summary", "GET", "/stats/summary", params=params, headers=self.headers
+        )
+
+    async def create(self):
+        n = next(self.created)
+        await self.recorder.request(
+            self.client, "create", "POST", "/indicators/",
+            json={
+                "type": "load-create",
+                "value": self.rng.uniform(0, 80),
+                "unit": "u",
+                "timestamp": (START + timedelta(seconds=n)).isoformat(),
+                "zone_id": self.rng.randint(1, ZONES),
+                "source_id": 1,
+            },
+            headers=self.headers,
+        )
+
+    async def run(self, mix: dict[str, float], deadline: float, think: float):
+        await self.login()
+        actions, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(actions, weights)[0])()
+            if think:
+                await asyncio.sleep(self.rng.uniform(0, 2 * think))
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f"action inconnue : {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_load(client, users: int, duration: float, mix: dict, think: float, credentials) -> dict:
+    recorder = Recorder()
+    created = itertools.count()
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            VirtualUser(client, recorder, random.Random(i), created, credentials).run(mix, deadline, think)
+            for i in range(users)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    def stats(latencies: list[float], errors: int) -> dict:
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": round(len(latencies) / elapsed, 1),
+            **summarize(latencies),
+        }
+
+    everything = [x for latencies in recorder.latencies.values() for x in latencies]
+    return {
+        "total": stats(everything, sum(recorder.errors.values())),
+        "actions": {
+            action: stats(recorder.latencies[action], recorder.errors[action])
+            for action in sorted(recorder.latencies.keys() | recorder.errors.keys())
+        },
+    }
+
+
+def prepare_database(rows: int) -> str:
+    """Base temporaire remplie, avec l'admin de benchmark ; renvoie son URL."""
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.base import Base
+    import app.models  # noqa: F401
+    from app.db.session import create_db_engine
+
+    db_url = temp_sqlite_url("load.db")
+    engine = create_db_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    seed(SessionLocal, rows, zones=ZONES)
+    create_admin(SessionLocal)
+    engine.dispose()
+    return db_url
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(db_url: str, workers: int):
+    """uvicorn sur la base `db_url` ; rend l'URL une fois le serveur prêt."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=ROOT_DIR,
+        env={**os.environ, "DATABASE_URL": db_url},
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn s'est arrêté au démarrage")
+            try:
+                if httpx.get(f"{url}/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn ne répond pas")
+            time.sleep(0.2)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="serveur existant, ou 'asgi' (dans le processus)")
+    parser.add_argument("--email", default=BENCH_EMAIL)
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--rows", type=int, default=200_000, help="lignes de la base temporaire")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--think", type=float, default=0.0, help="pause moyenne entre deux actions (s)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="poids des actions : nom=poids,...")
+    parser.add_argument("--workers", type=int, default=1, help="workers uvicorn (serveur local)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    credentials = (args.email, args.password)
+
+    async def against(transport=None, base_url=None) -> dict:
+        limits = httpx.Limits(max_connections=args.users)
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, limits=limits, timeout=60
+        ) as client:
+            return await run_load(client, args.users, args.duration, mix, args.think, credentials)
+
+    if args.url == "asgi":
+        from app.main import app
+
+        print(f"[INFO] Insertion de {args.rows} lignes...")
+        _, _, SessionLocal = make_client(temp_sqlite_url("load.db"))
+        seed(SessionLocal, args.rows, zones=ZONES)
+        credentials = (BENCH_EMAIL, BENCH_PASSWORD)
+        result = asyncio.run(against(httpx.ASGITransport(app=app), "http://bench"))
+        target = "asgi"
+    elif args.url:
+        result = asyncio.run(against(base_url=args.url))
+        target = args.url
+    else:
+        print(f"[INFO] Insertion de {args.rows} lignes...")
+        db_url = prepare_database(args.rows)
+        credentials = (BENCH_EMAIL, BENCH_PASSWORD)
+        with local_server(db_url, args.workers) as url:
+            result = asyncio.run(against(base_url=url))
+        target = "uvicorn"
+
+    dump_json(
+        {
+            "info": run_info(
+                target=target, users=args.users, duration=args.duration, think=args.think,
+                mix=mix, rows=args.rows, workers=args.workers,
+            ),
+            **result,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_metrics.py
+"""
+Coût de l'instrumentation /metrics :
+- observe() seul (par requête) et rendu du texte Prometheus ;
+- routes réelles avec puis sans middleware (metrics.enabled), en
+  alternant les deux pour lisser le bruit ; écart de latence médiane.
+
+    python -m benchmarks.bench_metrics --rows 20000 --repeat 2000
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_routes import seed
+from benchmarks.common import dump_json, make_client, run_info, summarize, temp_sqlite_url
+
+from app.core.metrics import Metrics, metrics
+from app.services.stats_cache import stats_cache
+
+
+def time_observe(n: int) -> float:
+    """ns par observe(), sur quelques séries déjà créées."""
+    registry = Metrics()
+    routes = [f"/route/{i}" for i in range(20)]
+    start = time.perf_counter()
+    for i in range(n):
+        registry.observe("GET", routes[i % 20], 200, 0.0123, 4567)
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def time_render(series: int, repeat: int = 50) -> dict:
+    registry = Metrics()
+    for i in range(series):
+        registry.observe("GET", f"/route/{i // 3}", (200, 304, 404)[i % 3], 0.01, 1000)
+    text = registry.render()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        registry.render()
+    return {
+        "series": series,
+        "bytes": len(text),
+        "ms": round((time.perf_counter() - start) / repeat * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    client, headers, SessionLocal = make_client(temp_sqlite_url("metrics.db"))
+    print(f"[INFO] Insertion de {args.rows} lignes...")
+    seed(SessionLocal, args.rows)
+    stats_cache.maxsize = 0
+
+    paths = {
+        "root": "/",
+        "zones": "/zones/",
+        "list_page": "/indicators/?limit=100",
+        "summary": "/stats/summary?indicator_type=PM10&zone_id=1",
+    }
+    routes = {}
+    for name, path in paths.items():
+        timings = {True: [], False: []}
+        for i in range(args.repeat + 20):
+            enabled = i % 2 == 0
+            metrics.enabled = enabled
+            start = time.perf_counter()
+            client.get(path, headers=headers).raise_for_status()
+            if i >= 20:  # échauffement
+                timings[enabled].append(time.perf_counter() - start)
+        on, off = summarize(timings[True]), summarize(timings[False])
+        routes[name] = {
+            "with_metrics": on,
+            "without_metrics": off,
+            "overhead_p50_us": round((on["p50_ms"] - off["p50_ms"]) * 1000, 1),
+        }
+        print(f"[INFO] {name:10s} surcoût p50 {routes[name]['overhead_p50_us']:+7.1f} µs")
+    metrics.enabled = True
+
+    dump_json(
+        {
+            "info": run_info(rows=args.rows, repeat=args.repeat),
+            "observe_ns": round(time_observe(200_000)),
+            "render": [time_render(n) for n in (30, 300, 3000)],
+            "routes": routes,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_open_meteo.py
+"""
+Ingestion Open-Meteo de nombreuses villes contre un faux serveur local
+(latence simulée) : boucle séquentielle ingest_open_meteo_for_city
+contre ingest_open_meteo_for_cities (client async partagé, requêtes
+concurrentes, écritures par paquets).
+
+    python -m benchmarks.bench_open_meteo --cities 500 --latency-ms 100
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.common import dump_json, temp_sqlite_url
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.services.ingestion.open_meteo import (
+    City,
+    ingest_open_meteo_for_cities,
+    ingest_open_meteo_for_city,
+)
+
+START = datetime(2025, 1, 1)
+
+
+def start_stub(latency_s: float) -> ThreadingHTTPServer:
+    """Faux Open-Meteo : 48 heures par ville après `latency_s` secondes."""
+    body = json.dumps({
+        "hourly": {
+            "time": [(START + timedelta(hours=h)).isoformat() for h in range(48)],
+            "temperature_2m": [15.0 + h % 10 for h in range(48)],
+            "windspeed_10m": [5.0 + h % 7 for h in range(48)],
+        }
+    }).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, comme l'API réelle
+
+        def do_GET(self):
+            time.sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def new_session():
+    engine = create_db_engine(temp_sqlite_url("meteo.db"))
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    server = start_stub(args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_port}/v1/forecast"
+    cities = [City(f"City {i}", f"{i:05d}", 40 + i / 100, 2 + i / 100) for i in range(args.cities)]
+    results = {}
+
+    with new_session() as db:
+        start = time.perf_counter()
+        rows = sum(
+            ingest_open_meteo_for_city(db, c.name, c.postal_code, c.lat, c.lon, url=url)
+            for c in cities
+        )
+        elapsed = time.perf_counter() - start
+        results["sequential"] = {
+            "seconds": round(elapsed, 2),
+            "rows": rows,
+            "cities_per_s": round(len(cities) / elapsed, 1),
+        }
+
+    with new_session() as db:
+        start = time.perf_counter()
+        rows = ingest_open_meteo_for_cities(db, cities, url=url, concurrency=args.concurrency)
+        elapsed = time.perf_counter() - start
+        results["concurrent"] = {
+            "seconds": round(elapsed, 2),
+            "rows": rows,
+            "cities_per_s": round(len(cities) / elapsed, 1),
+        }
+
+    server.shutdown()
+    dump_json(
+        {
+            "cities": args.cities,
+            "latency_ms": args.latency_ms,
+            "concurrency": args.concurrency,
+            **results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
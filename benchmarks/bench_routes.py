@@ -0,0 +1,157 @@
+# benchmarks/bench_routes.py
+"""
+Micro-benchmarks des routes chaudes, dans le processus (TestClient) :
+latences p50 / p95 / p99 et requêtes par seconde par route, en JSON
+comparable d'un run à l'autre (python -m benchmarks.compare).
+
+Le cache /stats est vidé par défaut (--stats-cache pour le garder) :
+on mesure le calcul, pas le cache.
+
+    python -m benchmarks.bench_routes --rows 200000 --output before.json
+    python -m benchmarks.bench_routes --rows 200000 --only list_page,timeseries_day
+"""
+
+import argparse
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, make_client, run_info, temp_sqlite_url, time_calls
+
+from sqlalchemy import insert
+
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services.indicators import insert_indicators
+from app.services.stats_cache import stats_cache
+
+START = datetime(2024, 1, 1)
+TYPES = ("PM10", "NO2", "temperature")
+
+
+def seed(SessionLocal, rows: int, zones: int = 10) -> None:
+    """
+    `rows` mesures réparties sur TYPES x zones, sur un an, à pas régulier
+    par série (clé naturelle unique), rollups tenus à jour.
+    """
+    rng = random.Random(0)
+    per_series = max(rows // (len(TYPES) * zones), 1)
+    step = timedelta(minutes=max(365 * 24 * 60 // per_series, 1))
+    with SessionLocal() as db:
+        db.execute(insert(Zone), [{"name": f"Zone {i}"} for i in range(1, zones + 1)])
+        db.execute(insert(Source), [{"name": "Bench"}])
+        for indicator_type in TYPES:
+            for zone_id in range(1, zones + 1):
+                for offset in range(0, per_series, 50_000):
+                    insert_indicators(
+                        db,
+                        [
+                            {
+                                "type": indicator_type,
+                                "value": rng.uniform(0, 80),
+                                "unit": "u",
+                                "timestamp": START + i * step,
+                                "zone_id": zone_id,
+                                "source_id": 1,
+                                "extra_data": None,
+                            }
+                            for i in range(offset, min(offset + 50_000, per_series))
+                        ],
+                    )
+        db.commit()
+
+
+def cases(client, headers: dict) -> dict:
+    """Nom -> appel d'une route (réponse vérifiée)."""
+
+    def get(path: str):
+        def call():
+            client.get(path, headers=headers).raise_for_status()
+
+        return call
+
+    # Bornes hors tranches de rollup : rollups + bords bruts, comme depuis le front
+    window = "&from_date=2024-03-03T10:17:00&to_date=2024-09-20T16:43:00"
+    cursor = client.get("/indicators/?limit=100", headers=headers).headers["X-Next-Cursor"]
+    created = itertools.count()
+
+    def create():
+        n = next(created)
+        client.post(
+            "/indicators/",
+            headers=headers,
+            json={
+                "type": "bench-create",
+                "value": n,
+                "unit": "u",
+                "timestamp": (START + timedelta(seconds=n)).isoformat(),
+                "zone_id": 1,
+                "source_id": 1,
+            },
+        ).raise_for_status()
+
+    batch = {
+        "series": [{"indicator_type": t, "zone_id": z} for t in TYPES for z in range(1, 11)],
+        "group_by": "day",
+    }
+
+    return {
+        "list_page": get("/indicators/?limit=100"),
+        "list_filtered": get("/indicators/?indicator_type=PM10&zone_id=1&limit=100"),
+        "list_cursor": get(f"/indicators/?limit=100&cursor={cursor}"),
+        "list_page_1000": get("/indicators/?limit=1000"),
+        "get_indicator": get("/indicators/1"),
+        "zones": get("/zones/"),
+        "average": get(f"/stats/average?indicator_type=PM10&zone_id=1{window}"),
+        "timeseries_day": get(f"/stats/timeseries?indicator_type=PM10&zone_id=1{window}"),
+        "timeseries_hour": get(f"/stats/timeseries?indicator_type=PM10&zone_id=1&group_by=hour{window}"),
+        "timeseries_all_zones": get(f"/stats/timeseries?indicator_type=PM10{window}"),
+        "summary": get(f"/stats/summary?indicator_type=PM10&zone_id=1{window}"),
+        "series_lttb": get(f"/stats/series?indicator_type=PM10&zone_id=1&max_points=500{window}"),
+        "batch_30_series": lambda: client.post(
+            "/stats/batch", headers=headers, json=batch
+        ).raise_for_status(),
+        "create_indicator": create,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--only", default=None, help="routes à mesurer, séparées par des virgules")
+    parser.add_argument("--stats-cache", action="store_true", help="garder le cache /stats")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    client, headers, SessionLocal = make_client(temp_sqlite_url("routes.db"))
+    print(f"[INFO] Insertion de {args.rows} lignes...")
+    seed(SessionLocal, args.rows)
+    if not args.stats_cache:
+        stats_cache.maxsize = 0
+
+    selected = cases(client, headers)
+    if args.only:
+        names = args.only.split(",")
+        unknown = set(names) - selected.keys()
+        if unknown:
+            parser.error(f"routes inconnues : {', '.join(sorted(unknown))}")
+        selected = {name: selected[name] for name in names}
+
+    routes = {}
+    for name, call in selected.items():
+        summary = time_calls(call, args.repeat)
+        routes[name] = {**summary, "rps": round(1000 / summary["mean_ms"], 1)}
+        print(f"[INFO] {name:22s} p50 {summary['p50_ms']:8.2f} ms  p95 {summary['p95_ms']:8.2f} ms")
+
+    dump_json(
+        {
+            "info": run_info(rows=args.rows, repeat=args.repeat, stats_cache=args.stats_cache),
+            "routes": routes,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_series_cache.py
+"""
+Calcul de /stats/timeseries pour une série (type, zone) chaude :
+chemin SQL (rollups + bords bruts, GROUP BY sur date / strftime) contre
+le cache colonnaire NumPy (SeriesCache), résultats vérifiés identiques.
+
+    python -m benchmarks.bench_series_cache --rows 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, temp_sqlite_url, time_calls
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services import stats as stats_service
+from app.services.indicators import insert_indicators
+from app.services.rollups import naive
+from app.services.buckets import GROUP_BY
+from app.services.series_cache import SeriesCache
+
+START = datetime(2024, 1, 1)
+
+
+def seed(SessionLocal, rows: int) -> None:
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        db.execute(insert(Zone), [{"name": "Zone 1"}])
+        db.execute(insert(Source), [{"name": "Bench"}])
+        for offset in range(0, rows, 50_000):
+            insert_indicators(
+                db,
+                [
+                    {
+                        "type": "PM10",
+                        "value": rng.uniform(0, 80),
+                        "unit": "µg/m3",
+                        # une mesure par minute : clé naturelle unique
+                        "timestamp": START + timedelta(minutes=i),
+                        "zone_id": 1,
+                        "source_id": 1,
+                        "extra_data": None,
+                    }
+                    for i in range(offset, min(offset + 50_000, rows))
+                ],
+            )
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    engine = create_db_engine(temp_sqlite_url("series.db"))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    print(f"[INFO] Insertion de {args.rows} lignes...")
+    seed(SessionLocal, args.rows)
+
+    end = START + timedelta(minutes=args.rows)
+    # Bornes hors tranches : le chemin SQL relit aussi des lignes brutes
+    from_date = START + timedelta(days=3, minutes=17)
+    to_date = end - timedelta(days=2, minutes=43)
+    cache = SeriesCache(max_points=args.rows)
+    results = {"rows": args.rows}
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        cache.get(db, "PM10", 1)
+        results["cache_load_s"] = round(time.perf_counter() - start, 3)
+
+        for group_by in ("day", "month"):
+            def sql():
+                return stats_service.timeseries(
+                    db, "PM10", group_by=group_by,
+                    from_date=from_date, to_date=to_date, zone_id=1,
+                )
+
+            def cached():
+                # Même chemin que stats.timeseries avec le cache activé
+                bucket = GROUP_BY[group_by]
+                return bucket.points(*cache.buckets(
+                    db, "PM10", bucket,
+                    naive(from_date), naive(to_date) + timedelta(microseconds=1), 1,
+                ))
+
+            expected, points = sql(), cached()
+            assert [p["period"] for p in points] == [p["period"] for p in expected]
+            assert [p["count"] for p in points] == [p["count"] for p in expected]
+
+            results[group_by] = {
+                "periods": len(points),
+                "sql": time_calls(sql, args.repeat),
+                "series_cache": time_calls(cached, args.repeat),
+            }
+
+    dump_json(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
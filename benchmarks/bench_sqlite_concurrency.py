@@ -0,0 +1,135 @@
+# benchmarks/bench_sqlite_concurrency.py
+"""
+Débit de lecture pendant des écritures concurrentes, profil "default"
+(journal rollback, un seul moteur) contre profil "production"
+(WAL + pragmas, moteurs lecture / écriture séparés).
+
+    python -m benchmarks.bench_sqlite_concurrency --seconds 10 --readers 8 --writers 2
+"""
+
+import argparse
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, summarize, temp_sqlite_url
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services import stats as stats_service
+from app.services.indicators import upsert_indicators
+
+START = datetime(2025, 1, 1)
+
+
+def make_rows(rng: random.Random, n: int) -> list[dict]:
+    return [
+        {
+            "type": "PM10",
+            "value": rng.uniform(0, 80),
+            "unit": "µg/m3",
+            "timestamp": START + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+            "zone_id": rng.randint(1, 10),
+            "source_id": 1,
+            "extra_data": None,
+        }
+        for _ in range(n)
+    ]
+
+
+def run_profile(profile: str, args) -> dict:
+    url = temp_sqlite_url(f"{profile}.db")
+    writer = create_db_engine(url, profile=profile, pool_size=args.writers)
+    reader = (
+        create_db_engine(url, profile=profile, read_only=True, pool_size=args.readers)
+        if profile == "production"
+        else writer
+    )
+    WriteSession = sessionmaker(bind=writer)
+    ReadSession = sessionmaker(bind=reader)
+
+    Base.metadata.create_all(bind=writer)
+    with WriteSession() as db:
+        db.add_all([Zone(name=f"Zone {i}") for i in range(10)] + [Source(name="Bench")])
+        db.commit()
+        upsert_indicators(db, make_rows(random.Random(0), args.seed_rows), on_conflict="nothing")
+        db.commit()
+
+    stop = time.perf_counter() + args.seconds
+    read_latencies: list[float] = []
+    counters = {"writes": 0, "read_errors": 0, "write_errors": 0}
+    lock = threading.Lock()
+
+    def read_loop(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            try:
+                with ReadSession() as db:
+                    from_date = START + timedelta(days=rng.randrange(300))
+                    stats_service.average(
+                        db, "PM10",
+                        from_date=from_date,
+                        to_date=from_date + timedelta(days=30, hours=5),
+                        zone_id=rng.randint(1, 10),
+                    )
+                with lock:
+                    read_latencies.append(time.perf_counter() - t0)
+            except OperationalError:
+                with lock:
+                    counters["read_errors"] += 1
+
+    def write_loop(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            try:
+                with WriteSession() as db:
+                    upsert_indicators(db, make_rows(rng, args.write_batch), on_conflict="nothing")
+                    db.commit()
+                with lock:
+                    counters["writes"] += args.write_batch
+            except OperationalError:
+                with lock:
+                    counters["write_errors"] += 1
+
+    threads = [threading.Thread(target=read_loop, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=write_loop, args=(100 + i,)) for i in range(args.writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return {
+        "reads_per_s": round(len(read_latencies) / args.seconds),
+        "rows_written_per_s": round(counters["writes"] / args.seconds),
+        "read_errors": counters["read_errors"],
+        "write_errors": counters["write_errors"],
+        "read_latency": summarize(read_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seed-rows", type=int, default=200_000)
+    parser.add_argument("--write-batch", type=int, default=500)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    dump_json(
+        {profile: run_profile(profile, args) for profile in ("default", "production")},
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
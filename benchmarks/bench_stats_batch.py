@@ -0,0 +1,105 @@
+# benchmarks/bench_stats_batch.py
+"""
+Tableau de bord types x zones : un appel stats.timeseries par série
+(ce que faisait le front) contre une seule requête groupée
+(stats.timeseries_many, utilisée par POST /stats/batch).
+
+    python -m benchmarks.bench_stats_batch --types 6 --zones 20 --days 90
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, temp_sqlite_url, time_calls
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services import stats as stats_service
+from app.services.indicators import insert_indicators
+
+START = datetime(2024, 1, 1)
+
+
+def seed(SessionLocal, types: list[str], zones: int, days: int) -> int:
+    """Une mesure horaire par (type, zone) ; renvoie le nombre de lignes."""
+    rng = random.Random(0)
+    rows = 0
+    with SessionLocal() as db:
+        db.execute(insert(Zone), [{"name": f"Zone {i}"} for i in range(zones)])
+        db.execute(insert(Source), [{"name": "Bench"}])
+        for indicator_type in types:
+            for zone_id in range(1, zones + 1):
+                batch = [
+                    {
+                        "type": indicator_type,
+                        "value": rng.uniform(0, 80),
+                        "unit": "u",
+                        "timestamp": START + timedelta(hours=h),
+                        "zone_id": zone_id,
+                        "source_id": 1,
+                        "extra_data": None,
+                    }
+                    for h in range(days * 24)
+                ]
+                insert_indicators(db, batch)
+                rows += len(batch)
+        db.commit()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--types", type=int, default=6)
+    parser.add_argument("--zones", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    types = [f"type-{i}" for i in range(args.types)]
+    engine = create_db_engine(temp_sqlite_url("batch.db"))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    print(f"[INFO] {args.types} types x {args.zones} zones x {args.days} jours...")
+    rows = seed(SessionLocal, types, args.zones, args.days)
+
+    series = [(t, z) for t in types for z in range(1, args.zones + 1)]
+    # Bornes hors tranches : rollups + bords bruts, comme depuis le front
+    from_date = START + timedelta(days=1, minutes=30)
+    to_date = START + timedelta(days=args.days - 1, hours=5, minutes=10)
+
+    with SessionLocal() as db:
+        def one_by_one():
+            return {
+                (t, z): stats_service.timeseries(
+                    db, t, group_by="day", from_date=from_date, to_date=to_date, zone_id=z
+                )
+                for t, z in series
+            }
+
+        def batched():
+            return stats_service.timeseries_many(
+                db, series, group_by="day", from_date=from_date, to_date=to_date
+            )
+
+        assert one_by_one() == batched()
+        dump_json(
+            {
+                "rows": rows,
+                "series": len(series),
+                "one_query_per_series": time_calls(one_by_one, args.repeat),
+                "grouped_query": time_calls(batched, args.repeat),
+            },
+            args.output,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_stats_summary.py
+"""
+/stats/summary sur une série (type, zone) : histogrammes des rollups
+fusionnés (stats.summary) contre la lecture de toutes les lignes brutes
+triées en Python, avec l'erreur relative mesurée sur chaque percentile.
+
+    python -m benchmarks.bench_stats_summary --rows 1000000
+"""
+
+import argparse
+import math
+from datetime import timedelta
+
+from benchmarks.bench_series_cache import START, seed
+from benchmarks.common import dump_json, temp_sqlite_url, time_calls
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.models.indicator import Indicator
+from app.services import stats as stats_service
+
+
+def exact_summary(db, from_date, to_date) -> dict:
+    """Même résultat que stats.summary, calculé sur les lignes brutes."""
+    values = sorted(
+        db.execute(
+            select(Indicator.value).where(
+                Indicator.type == "PM10",
+                Indicator.zone_id == 1,
+                Indicator.timestamp >= from_date,
+                Indicator.timestamp <= to_date,
+            )
+        ).scalars()
+    )
+    n = len(values)
+    mean = sum(values) / n
+    return {
+        "count": n,
+        "average": mean,
+        "min": values[0],
+        "max": values[-1],
+        "stddev": math.sqrt(sum((v - mean) ** 2 for v in values) / n),
+        "percentiles": {
+            name: values[int(q * (n - 1))]
+            for name, q in stats_service.SUMMARY_PERCENTILES.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    engine = create_db_engine(temp_sqlite_url("summary.db"))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    print(f"[INFO] Insertion de {args.rows} lignes...")
+    seed(SessionLocal, args.rows)
+
+    end = START + timedelta(minutes=args.rows)
+    # Bornes hors tranches : des bords bruts s'ajoutent aux rollups
+    from_date = START + timedelta(days=3, minutes=17)
+    to_date = end - timedelta(days=2, minutes=43)
+
+    with SessionLocal() as db:
+        def sketch():
+            return stats_service.summary(
+                db, "PM10", from_date=from_date, to_date=to_date, zone_id=1
+            )
+
+        def exact():
+            return exact_summary(db, from_date, to_date)
+
+        approx, expected = sketch(), exact()
+        assert approx["count"] == expected["count"]
+        errors = {
+            name: abs(approx["percentiles"][name] - value) / abs(value)
+            for name, value in expected["percentiles"].items()
+        }
+
+        dump_json(
+            {
+                "rows": args.rows,
+                "count": expected["count"],
+                "percentile_relative_error": errors,
+                "stddev_relative_error": abs(approx["stddev"] - expected["stddev"])
+                / expected["stddev"],
+                "rollup_sketches": time_calls(sketch, args.repeat),
+                "raw_sort": time_calls(exact, args.repeat),
+            },
+            args.output,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/bench_timeseries_buckets.py
+"""
+Un an de mesures à la minute (avec trous) : /stats/timeseries par cases de
+largeur fixe (15min, hour, week, interval=1min) calculées en entiers, et
+remplissage des cases vides vectorisé (NumPy) contre une boucle Python.
+
+    python -m benchmarks.bench_timeseries_buckets --days 365
+"""
+
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import dump_json, temp_sqlite_url, time_calls
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.db.session import create_db_engine
+from app.models.indicator import Indicator
+from app.models.source import Source
+from app.models.zone import Zone
+from app.services import stats as stats_service
+from app.services.buckets import parse_interval
+from app.services.gap_fill import fill_gaps, fill_points
+from app.services.rollups import rebuild_rollups
+
+START = datetime(2024, 1, 1)
+
+
+def seed(SessionLocal, days: int) -> int:
+    """Une mesure par minute, 5 % de minutes perdues et une panne de 6 h par semaine."""
+    rng = random.Random(0)
+    minutes = [
+        m for m in range(days * 24 * 60)
+        if rng.random() > 0.05 and (m // 60) % (7 * 24) >= 6
+    ]
+    with SessionLocal() as db:
+        db.execute(insert(Zone), [{"name": "Zone 1"}])
+        db.execute(insert(Source), [{"name": "Bench"}])
+        for offset in range(0, len(minutes), 50_000):
+            db.execute(
+                insert(Indicator),
+                [
+                    {
+                        "type": "PM10",
+                        "value": rng.uniform(0, 80),
+                        "unit": "µg/m3",
+                        "timestamp": START + timedelta(minutes=m),
+                        "zone_id": 1,
+                        "source_id": 1,
+                    }
+                    for m in minutes[offset : offset + 50_000]
+                ],
+            )
+        db.commit()
+    return len(minutes)
+
+
+def python_fill(slots, sums, counts, first, last):
+    """Remplissage "previous" case par case, pour comparaison."""
+    known = {slot: s / c for slot, s, c in zip(slots, sums, counts)}
+    points, previous = [], None
+    for slot in range(first, last + 1):
+        if slot in known:
+            previous = known[slot]
+        points.append(previous)
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    engine = create_db_engine(temp_sqlite_url("buckets.db"))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    print(f"[INFO] {args.days} jours de mesures à la minute...")
+    rows = seed(SessionLocal, args.days)
+    with SessionLocal() as db:
+        # Insertion directe (sans rollups) : on les calcule d'un bloc
+        rebuild_rollups(db)
+        db.commit()
+
+    from_date = START + timedelta(minutes=17)
+    to_date = START + timedelta(days=args.days) - timedelta(minutes=43)
+    results = {"rows": rows}
+
+    with SessionLocal() as db:
+        for label, params in (
+            ("15min", {"group_by": "15min"}),
+            ("hour", {"group_by": "hour"}),
+            ("week", {"group_by": "week"}),
+            ("1min_fill_previous", {"interval": "1min", "fill": "previous"}),
+        ):
+            def run():
+                return stats_service.timeseries(
+                    db, "PM10", from_date=from_date, to_date=to_date, zone_id=1, **params
+                )
+
+            results[label] = {"points": len(run()), **time_calls(run, args.repeat, warmup=1)}
+
+        # Remplissage seul, à partir des cases déjà agrégées
+        bucket = parse_interval("1min")
+        points = stats_service.timeseries(
+            db, "PM10", interval="1min", from_date=from_date, to_date=to_date, zone_id=1
+        )
+        slots = [bucket.slot_of(datetime.fromisoformat(p["period"])) for p in points]
+        sums = [p["average"] * p["count"] for p in points]
+        counts = [p["count"] for p in points]
+        first, last = bucket.slot_of(from_date), bucket.slot_of(to_date)
+
+        slots_ = np.asarray(slots, dtype=np.int64)
+        counts_ = np.asarray(counts, dtype=np.int64)
+        averages = np.asarray(sums) / counts_
+
+        def numpy_fill():
+            return fill_gaps(slots_, averages, counts_, first, last, "previous")[1]
+
+        filled = [None if math.isnan(v) else v for v in numpy_fill().tolist()]
+        assert filled == python_fill(slots, sums, counts, first, last)
+        results["fill_only"] = {
+            "slots": last - first + 1,
+            "numpy_fill_gaps": time_calls(numpy_fill, args.repeat, warmup=1),
+            "python_loop": time_calls(
+                lambda: python_fill(slots, sums, counts, first, last), args.repeat, warmup=1
+            ),
+            # avec libellés et dicts de la réponse JSON
+            "numpy_fill_points": time_calls(
+                lambda: fill_points(bucket, slots, sums, counts, first, last, "previous"),
+                args.repeat, warmup=1,
+            ),
+        }
+
+    dump_json(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
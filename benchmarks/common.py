@@ -0,0 +1,158 @@
+# benchmarks/common.py
+"""
+Petits utilitaires partagés par les scripts de benchmark.
+
+Les scripts se lancent depuis la racine du projet :
+
+    python -m benchmarks.bench_indicator_indexes --rows 1000000
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+
+# Rendre le package "app" importable quand on lance un script directement
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Percentile par interpolation linéaire (q entre 0 et 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize(latencies_s: list[float]) -> dict:
+    """Résumé des latences (en millisecondes)."""
+    ms = [x * 1000 for x in latencies_s]
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def time_calls(fn, repeat: int = 20, warmup: int = 2) -> dict:
+    """Appelle fn() `repeat` fois et renvoie le résumé des latences."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def run_info(**params) -> dict:
+    """Contexte d'un run (commit, Python, machine, paramètres), joint aux résultats JSON."""
+    import platform
+    import subprocess
+    from datetime import datetime, timezone
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": params,
+    }
+
+
+def dump_json(result: dict, path: str | None) -> None:
+    """Écrit le résultat en JSON (fichier ou stdout)."""
+    text = json.dumps(result, indent=2, default=str)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"[INFO] Résultats écrits dans {path}")
+    else:
+        print(text)
+
+
+def temp_sqlite_url(name: str = "bench.db") -> str:
+    """URL d'une base SQLite dans un dossier temporaire."""
+    import tempfile
+
+    tmpdir = tempfile.mkdtemp(prefix="ecotrack-bench-")
+    return f"sqlite:///{os.path.join(tmpdir, name)}"
+
+
+BENCH_EMAIL = "bench@ecotrack.local"
+BENCH_PASSWORD = "bench123"
+
+
+def create_admin(SessionLocal) -> None:
+    """Admin BENCH_EMAIL / BENCH_PASSWORD utilisé par les scripts."""
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        db.add(
+            User(
+                email=BENCH_EMAIL,
+                hashed_password=get_password_hash(BENCH_PASSWORD),
+                role="admin",
+                is_active=True,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_client(db_url: str):
+    """
+    TestClient sur l'application, branché sur la base `db_url`,
+    avec un admin déjà connecté. Renvoie (client, headers, SessionLocal).
+    """
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.deps import get_db
+    from app.db.base import Base
+    from app.main import app
+
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    create_admin(SessionLocal)
+
+    client = TestClient(app)
+    resp = client.post(
+        "/auth/login",
+        data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD},
+    )
+    resp.raise_for_status()
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    return client, headers, SessionLocal
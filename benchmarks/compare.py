@@ -0,0 +1,74 @@
+# benchmarks/compare.py
+"""
+Compare deux résultats JSON de benchmark (bench_routes, bench_load...) :
+pour chaque mesure présente dans les deux (un objet avec p95_ms), écarts
+de p50 / p95 / p99 et de requêtes par seconde. Code de sortie 1 si un
+p95 se dégrade de plus de --threshold %.
+
+    python -m benchmarks.compare before.json after.json --threshold 15
+"""
+
+import argparse
+import json
+import sys
+
+
+def measures(result: dict, prefix: str = "") -> dict[str, dict]:
+    """Chemin ("routes.list_page") -> mesure, pour tous les objets avec p95_ms."""
+    found = {}
+    for key, value in result.items():
+        if not isinstance(value, dict) or key == "info":
+            continue
+        path = f"{prefix}{key}"
+        if "p95_ms" in value:
+            found[path] = value
+        else:
+            found.update(measures(value, prefix=f"{path}."))
+    return found
+
+
+def delta(before: float | None, after: float | None) -> float | None:
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def _fmt(value: float | None) -> str:
+    return "    n/a" if value is None else f"{value:+6.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="dégradation p95 tolérée (%%)")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = measures(json.load(f))
+    with open(args.after, encoding="utf-8") as f:
+        after = measures(json.load(f))
+
+    regressions = []
+    print(f"{'mesure':40s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'rps':>8s}   p95 (ms)")
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        p95 = delta(old["p95_ms"], new["p95_ms"])
+        print(
+            f"{path:40s} {_fmt(delta(old['p50_ms'], new['p50_ms']))} {_fmt(p95)} "
+            f"{_fmt(delta(old['p99_ms'], new['p99_ms']))} {_fmt(delta(old.get('rps'), new.get('rps')))}"
+            f"   {old['p95_ms']:.2f} -> {new['p95_ms']:.2f}"
+        )
+        if p95 is not None and p95 > args.threshold:
+            regressions.append(path)
+
+    for path in sorted(before.keys() ^ after.keys()):
+        print(f"{path:40s} (présent dans un seul fichier)")
+
+    if regressions:
+        print(f"\n[WARN] p95 dégradé de plus de {args.threshold:g} % : {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
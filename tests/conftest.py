@@ -48,3 +48,57 @@ app.dependency_overrides[get_db] = override_get_db
 @pytest.fixture
 def client():
     return TestClient(app)
+
+
+@pytest.fixture
+def admin_headers(client):
+    """En-têtes Authorization d'un admin créé directement en base de test."""
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    email = "admin-fixture@test.local"
+    db = TestingSessionLocal()
+    try:
+        if not db.query(User).filter(User.email == email).first():
+            db.add(
+                User(
+                    email=email,
+                    hashed_password=get_password_hash("admin123"),
+                    role="admin",
+                    is_active=True,
+                )
+            )
+            db.commit()
+    finally:
+        db.close()
+
+    resp = client.post(
+        "/auth/login",
+        data={"username": email, "password": "admin123"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest.fixture
+def zone_and_source(client, admin_headers):
+    """Crée une zone et une source via l'API, renvoie leurs ids."""
+    resp = client.post("/zones/", headers=admin_headers, json={"name": "FixtureCity"})
+    assert resp.status_code == 201
+    zone_id = resp.json()["id"]
+
+    resp = client.post(
+        "/sources/", headers=admin_headers, json={"name": "FixtureSource", "type": "test"}
+    )
+    assert resp.status_code == 201
+    return zone_id, resp.json()["id"]
+
+
+def assert_max_queries(resp, limit: int) -> None:
+    """Échoue si la réponse a coûté plus de `limit` requêtes SQL (en-tête Server-Timing)."""
+    from app.db.instrumentation import parse_server_timing
+
+    stats = parse_server_timing(resp.headers.get("server-timing"))
+    assert stats is not None, "pas d'en-tête Server-Timing (SQL_SERVER_TIMING désactivé ?)"
+    assert stats.count <= limit, f"{resp.request.method} {resp.request.url.path} : {stats.count} requêtes SQL (max {limit})"
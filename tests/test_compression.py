@@ -0,0 +1,36 @@
+# tests/test_compression.py
+
+from app.core.compression import _accepts
+
+
+def test_large_responses_are_compressed(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    items = [
+        {
+            "type": "gzip-test", "value": i, "unit": "u",
+            "timestamp": f"2025-05-01T{i // 60:02d}:{i % 60:02d}:00",
+            "zone_id": zone_id, "source_id": source_id,
+        }
+        for i in range(200)
+    ]
+    assert client.post("/indicators/bulk", headers=admin_headers, json=items).json()["inserted"] == 200
+
+    resp = client.get(
+        "/indicators/?indicator_type=gzip-test&limit=200",
+        headers={**admin_headers, "Accept-Encoding": "gzip"},
+    )
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert len(resp.json()) == 200  # décompressé par le client
+
+    # Sous le seuil : envoyé tel quel
+    small = client.get(
+        "/indicators/?indicator_type=gzip-test&limit=1",
+        headers={**admin_headers, "Accept-Encoding": "gzip"},
+    )
+    assert "content-encoding" not in small.headers
+
+    assert _accepts("gzip, deflate, br", "br")
+    assert _accepts("br;q=0.8, gzip", "br")
+    assert not _accepts("gzip, br;q=0", "br")
+    assert not _accepts("gzip", "br")
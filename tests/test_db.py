@@ -0,0 +1,148 @@
+# tests/test_db.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.deps import get_async_db, get_db
+from app.api.routes import async_reads, auth, indicators, stats
+from app.db.async_session import create_async_db_engine
+from app.db.instrumentation import count_queries, parse_server_timing
+from app.db.session import create_db_engine
+from app.models.indicator import Indicator
+from app.services.stats_cache import stats_cache
+from tests.conftest import TEST_DATABASE_URL, TestingSessionLocal, assert_max_queries, override_get_db
+
+
+def test_production_profile_enables_wal_and_read_only_reader(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    writer = create_db_engine(url, profile="production", pool_size=2)
+    reader = create_db_engine(url, profile="production", read_only=True, pool_size=2)
+
+    with writer.begin() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+
+
+def test_async_read_routes_match_sync_routes(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    for i, value in enumerate([10.0, 20.0, 60.0]):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "ASYNC",
+                "value": value,
+                "unit": "u",
+                "timestamp": f"2025-03-0{i + 1}T12:00:00",
+                "zone_id": zone_id,
+                "source_id": source_id,
+            },
+        )
+        assert resp.status_code == 201
+
+    AsyncTestingSession = async_sessionmaker(
+        create_async_db_engine(TEST_DATABASE_URL), expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(async_reads.router)
+    for router in (auth.router, indicators.router, stats.router):
+        async_app.include_router(router)
+    async_app.dependency_overrides[get_db] = override_get_db
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    async_client = TestClient(async_app)
+    for path in (
+        "/indicators/?indicator_type=ASYNC&limit=2",
+        "/zones/",
+        "/sources/",
+        "/stats/average?indicator_type=ASYNC",
+        "/stats/summary?indicator_type=ASYNC",
+        "/stats/series?indicator_type=ASYNC&max_points=3",
+        f"/stats/timeseries?indicator_type=ASYNC&zone_id={zone_id}",
+    ):
+        stats_cache.clear()
+        expected = client.get(path, headers=admin_headers)
+        stats_cache.clear()
+        got = async_client.get(path, headers=admin_headers)
+        assert got.status_code == expected.status_code == 200, path
+        assert got.json() == expected.json(), path
+        assert got.headers.get("X-Next-Cursor") == expected.headers.get("X-Next-Cursor")
+
+    body = {"series": [{"indicator_type": "ASYNC", "zone_id": zone_id}, {"indicator_type": "ASYNC"}]}
+    stats_cache.clear()
+    expected = client.post("/stats/batch", headers=admin_headers, json=body)
+    stats_cache.clear()
+    assert async_client.post("/stats/batch", headers=admin_headers, json=body).json() == expected.json()
+
+    indicator_id = client.get("/indicators/?indicator_type=ASYNC", headers=admin_headers).json()[0]["id"]
+    assert (
+        async_client.get(f"/indicators/{indicator_id}", headers=admin_headers).json()
+        == client.get(f"/indicators/{indicator_id}", headers=admin_headers).json()
+    )
+    assert async_client.get("/indicators/999999", headers=admin_headers).status_code == 404
+    assert async_client.get("/stats/average?indicator_type=NOPE", headers=admin_headers).status_code == 404
+    # la route sync d'export reste atteignable
+    assert async_client.get("/indicators/export?indicator_type=ASYNC", headers=admin_headers).status_code == 200
+
+
+def test_query_counts_per_endpoint(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    item = {
+        "type": "QCOUNT", "value": 1.0, "unit": "u", "timestamp": "2025-03-01T00:00:00",
+        "zone_id": zone_id, "source_id": source_id,
+    }
+    resp = client.post("/indicators/", headers=admin_headers, json=item)
+    assert resp.status_code == 201
+    # existence zone + source, insert, rollups (2), versions (ETag), relecture
+    assert_max_queries(resp, 6)
+    assert client.post(
+        "/indicators/", headers=admin_headers, json={**item, "zone_id": 999999}
+    ).status_code == 400
+
+    stats_cache.clear()
+    # +1 sur les routes à ETag : lecture de la version en base
+    for path, limit in (
+        ("/indicators/?indicator_type=QCOUNT&limit=50", 2),
+        (f"/indicators/{resp.json()['id']}", 1),
+        ("/zones/", 1),
+        ("/stats/average?indicator_type=QCOUNT", 2),
+        (f"/stats/timeseries?indicator_type=QCOUNT&zone_id={zone_id}", 2),
+        ("/stats/summary?indicator_type=QCOUNT", 3),
+    ):
+        got = client.get(path, headers=admin_headers)
+        assert got.status_code == 200, path
+        assert_max_queries(got, limit)
+
+    # timing cohérent, et compteur utilisable hors HTTP
+    stats = parse_server_timing(got.headers["server-timing"])
+    assert stats.count >= 1 and stats.seconds >= 0
+    with TestingSessionLocal() as db, count_queries() as counted:
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 2"))
+    assert counted.count == 2 and counted.statements == ["SELECT 1", "SELECT 2"]
+
+
+def test_slow_queries_logged_with_plan(monkeypatch, caplog):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level("WARNING", logger="ecotrack.sql"), TestingSessionLocal() as db:
+        db.execute(select(Indicator.id).where(Indicator.type == "PM10", Indicator.zone_id == 1)).all()
+    record = next(r for r in caplog.records if "FROM indicators" in r.getMessage())
+    assert "Requête lente" in record.getMessage()
+    assert "USING COVERING INDEX" in record.getMessage() or "USING INDEX" in record.getMessage()
@@ -0,0 +1,42 @@
+# tests/test_generate_dataset.py
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import create_db_engine
+from app.models.indicator import Indicator
+from app.models.rollup import IndicatorRollup
+from app.scripts.generate_dataset import generate
+
+
+def test_generate_dataset_is_deterministic(tmp_path):
+    def run(name: str, seed: int):
+        engine = create_db_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            report = generate(
+                db, zones=2, sources=2, types=["temperature", "humidity"],
+                start=datetime(2024, 1, 1), days=20, interval="1h", seed=seed, log=lambda _: None,
+            )
+            rows = db.execute(
+                select(Indicator.type, Indicator.zone_id, Indicator.source_id, Indicator.timestamp, Indicator.value)
+                .order_by(Indicator.id)
+            ).all()
+            rollup_count = db.execute(
+                select(func.sum(IndicatorRollup.value_count)).where(IndicatorRollup.granularity == "month")
+            ).scalar()
+        engine.dispose()
+        return report, rows, rollup_count
+
+    report, rows, rollup_count = run("a.db", seed=1)
+    assert report["rows"] == len(rows) == rollup_count
+    assert 0 < len(rows) < 2 * 2 * 20 * 24  # mesures perdues et pannes
+    assert isinstance(rows[0].timestamp, datetime)
+    assert all(0 <= row.value <= 100 for row in rows if row.type == "humidity")
+    # une source par série : clé naturelle unique
+    assert len({(r.type, r.zone_id, r.source_id) for r in rows}) == 4
+
+    assert run("b.db", seed=1)[1] == rows
+    assert run("c.db", seed=2)[1] != rows
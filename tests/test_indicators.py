@@ -0,0 +1,390 @@
+# tests/test_indicators.py
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+TEST_DATABASE_URL = "sqlite:///./test_ecotrack.db"
+
+engine = create_engine(
+    TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def explain(sql: str) -> str:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_timeseries_queries_use_composite_indexes():
+    plan = explain(
+        "SELECT avg(value) FROM indicators "
+        "WHERE type = 'PM10' AND zone_id = 1 "
+        "AND timestamp >= '2025-01-01' AND timestamp <= '2025-02-01'"
+    )
+    assert "ix_indicators_type_zone_timestamp" in plan
+
+    plan = explain(
+        "SELECT * FROM indicators "
+        "WHERE source_id = 1 AND timestamp >= '2025-01-01' "
+        "ORDER BY timestamp DESC LIMIT 100"
+    )
+    assert "ix_indicators_source_timestamp" in plan
+
+
+def test_cursor_pagination_walks_all_pages(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    other_source_id = client.post(
+        "/sources/", headers=admin_headers, json={"name": "CursorSource", "type": "test"}
+    ).json()["id"]
+    # Timestamps dupliqués volontairement (sur deux sources, la clé naturelle
+    # reste unique) : l'id départage les égalités
+    for i in range(7):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "cursor-test",
+                "value": i,
+                "unit": "u",
+                "timestamp": f"2025-03-0{1 + i // 2}T10:00:00",
+                "zone_id": zone_id,
+                "source_id": (source_id, other_source_id)[i % 2],
+            },
+        )
+        assert resp.status_code == 201
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"indicator_type": "cursor-test", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/indicators/", headers=admin_headers, params=params)
+        assert resp.status_code == 200
+        seen.extend(ind["id"] for ind in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+    # L'ancien mode skip reste disponible et suit le même ordre
+    resp = client.get(
+        "/indicators/",
+        headers=admin_headers,
+        params={"indicator_type": "cursor-test", "skip": 3, "limit": 3},
+    )
+    assert [ind["id"] for ind in resp.json()] == seen[3:6]
+
+    resp = client.get("/indicators/?cursor=not-a-cursor", headers=admin_headers)
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+def test_list_routes_match_pydantic_serialization(
+    client, admin_headers, zone_and_source, monkeypatch, encoder
+):
+    from app.api import responses
+    from app.models.indicator import Indicator
+    from app.models.source import Source
+    from app.models.zone import Zone
+    from app.schemas.indicator import IndicatorRead
+    from app.schemas.source import SourceRead
+    from app.schemas.zone import ZoneRead
+
+    if encoder == "json":
+        monkeypatch.setattr(responses, "orjson", None)
+    zone_id, source_id = zone_and_source
+    for i, extra in enumerate(({"station": "é-1", "raw": [1, 2.5]}, None)):
+        client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "fast-list",
+                "value": 10 + i / 3,
+                "unit": "µg/m3",
+                "timestamp": f"2025-04-0{1 + i}T10:00:00.123456",
+                "zone_id": zone_id,
+                "source_id": source_id,
+                "extra_data": extra,
+            },
+        )
+
+    # Référence : instances ORM validées par le schéma, comme avant
+    db = TestingSessionLocal()
+    try:
+        expected = {
+            "/indicators/?indicator_type=fast-list": [
+                IndicatorRead.model_validate(row).model_dump(mode="json")
+                for row in db.query(Indicator)
+                .filter(Indicator.type == "fast-list")
+                .order_by(Indicator.timestamp.desc(), Indicator.id.desc())
+            ],
+            "/zones/": [ZoneRead.model_validate(row).model_dump(mode="json") for row in db.query(Zone)],
+            "/sources/": [
+                SourceRead.model_validate(row).model_dump(mode="json") for row in db.query(Source)
+            ],
+        }
+    finally:
+        db.close()
+
+    for path, rows in expected.items():
+        resp = client.get(path, headers=admin_headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == rows, path
+
+    resp = client.get("/indicators/?indicator_type=fast-list&limit=1", headers=admin_headers)
+    assert len(resp.json()) == 1 and resp.headers.get("X-Next-Cursor")
+
+
+def test_export_streams_ndjson_and_csv(client, admin_headers, zone_and_source):
+    import csv
+    import json
+
+    zone_id, source_id = zone_and_source
+    for i in range(3):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "export-test",
+                "value": 1.5 * i,
+                "unit": "u",
+                "timestamp": f"2025-04-0{i + 1}T00:00:00",
+                "zone_id": zone_id,
+                "source_id": source_id,
+                "extra_data": {"i": i},
+            },
+        )
+        assert resp.status_code == 201
+
+    resp = client.get(
+        "/indicators/export?indicator_type=export-test", headers=admin_headers
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["value"] for row in rows] == [0.0, 1.5, 3.0]
+    assert rows[2]["extra_data"] == {"i": 2}
+
+    resp = client.get(
+        "/indicators/export?indicator_type=export-test&format=csv",
+        headers=admin_headers,
+    )
+    assert resp.status_code == 200
+    lines = list(csv.reader(resp.text.splitlines()))
+    assert lines[0] == [
+        "id", "type", "value", "unit", "timestamp", "zone_id", "source_id", "extra_data"
+    ]
+    assert len(lines) == 4
+    assert lines[1][4] == "2025-04-01T00:00:00"
+
+
+def test_bulk_create_reports_row_errors(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    item = {
+        "type": "bulk-test",
+        "value": 1.0,
+        "unit": "u",
+        "timestamp": "2025-05-01T00:00:00",
+        "zone_id": zone_id,
+        "source_id": source_id,
+    }
+    payload = [
+        item,
+        {**item, "value": 2.0, "timestamp": "2025-05-02T00:00:00"},
+        {**item, "zone_id": 999_999},
+        {**item, "value": "pas un nombre"},
+        {**item, "source_id": 999_999},
+    ]
+
+    resp = client.post("/indicators/bulk", headers=admin_headers, json=payload)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["received"] == 5
+    assert (data["inserted"], data["updated"]) == (2, 0)
+    assert [err["index"] for err in data["errors"]] == [2, 3, 4]
+    assert data["errors"][0]["detail"] == "Zone invalide"
+
+    # Variante NDJSON, avec une ligne illisible
+    import json
+
+    body = json.dumps({**item, "value": 3.0, "timestamp": "2025-05-03T00:00:00"}) + "\n{pas du json\n"
+    resp = client.post(
+        "/indicators/bulk",
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        content=body,
+    )
+    assert resp.status_code == 200
+    assert resp.json()["inserted"] == 1
+    assert resp.json()["errors"] == [{"index": 1, "detail": "Ligne NDJSON invalide"}]
+
+    resp = client.get("/indicators/?indicator_type=bulk-test", headers=admin_headers)
+    assert sorted(ind["value"] for ind in resp.json()) == [1.0, 2.0, 3.0]
+
+
+def test_bulk_rejects_anonymous_and_undecodable_payloads(client, admin_headers):
+    # Authentification avant lecture du corps : 401, pas 400 / 413
+    assert client.post("/indicators/bulk", content=b"{pas du json").status_code == 401
+    too_many = "[" + ",".join(["{}"] * 50_001) + "]"
+    assert client.post("/indicators/bulk", content=too_many).status_code == 401
+
+    resp = client.post(
+        "/indicators/bulk",
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        content=b'{"type": "x"}\n\xff\xfe\n',
+    )
+    assert resp.status_code == 400
+    assert "UTF-8" in resp.json()["detail"]
+
+
+def test_bulk_upserts_on_natural_key(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    item = {
+        "type": "upsert-test",
+        "value": 1.0,
+        "unit": "u",
+        "timestamp": "2025-06-01T00:00:00",
+        "zone_id": zone_id,
+        "source_id": source_id,
+    }
+
+    def post(items):
+        resp = client.post("/indicators/bulk", headers=admin_headers, json=items)
+        assert resp.status_code == 200
+        return resp.json()["inserted"], resp.json()["updated"]
+
+    # Doublon dans le lot : la dernière valeur gagne
+    assert post([item, {**item, "value": 2.0}]) == (1, 0)
+    # Renvoi identique : rien n'est réécrit
+    assert post([{**item, "value": 2.0}]) == (0, 0)
+    # Valeur corrigée : mise à jour de la ligne existante, comptée à part
+    assert post([{**item, "value": 5.0}, {**item, "timestamp": "2025-06-02T00:00:00"}]) == (1, 1)
+
+    resp = client.get("/indicators/?indicator_type=upsert-test", headers=admin_headers)
+    assert [ind["value"] for ind in resp.json()] == [1.0, 5.0]
+
+    stats = client.get(
+        "/stats/average",
+        headers=admin_headers,
+        params={"indicator_type": "upsert-test", "zone_id": zone_id},
+    ).json()
+    assert (stats["average"], stats["count"]) == (3.0, 2)
+
+    # Création unitaire d'un doublon : conflit
+    resp = client.post("/indicators/", headers=admin_headers, json=item)
+    assert resp.status_code == 409
+
+
+def rollups_of(indicator_type: str) -> tuple[dict, dict]:
+    """(tranches, cases) stockées pour un type, et les mêmes recalculées depuis les lignes brutes."""
+    from app.models.indicator import Indicator
+    from app.models.rollup import IndicatorRollup, IndicatorRollupBin
+    from app.services.rollups import GRANULARITIES, floor_bucket
+    from app.services.sketch import bin_of
+
+    with TestingSessionLocal() as db:
+        stored = {
+            (r.granularity, r.zone_id, r.source_id, r.bucket_start): (
+                pytest.approx(r.value_sum), pytest.approx(r.value_sumsq), r.value_count, r.value_min, r.value_max
+            )
+            for r in db.query(IndicatorRollup).filter(IndicatorRollup.type == indicator_type)
+        }
+        stored_bins = {
+            (b.granularity, b.zone_id, b.source_id, b.bucket_start, b.bin): b.value_count
+            for b in db.query(IndicatorRollupBin).filter(IndicatorRollupBin.type == indicator_type)
+        }
+        values: dict[tuple, list[float]] = {}
+        bins: dict[tuple, int] = {}
+        for row in db.query(Indicator).filter(Indicator.type == indicator_type):
+            for granularity in GRANULARITIES:
+                key = (granularity, row.zone_id, row.source_id, floor_bucket(row.timestamp, granularity))
+                values.setdefault(key, []).append(row.value)
+                bin_key = key + (bin_of(row.value),)
+                bins[bin_key] = bins.get(bin_key, 0) + 1
+    expected = {
+        key: (sum(vs), sum(v * v for v in vs), len(vs), min(vs), max(vs)) for key, vs in values.items()
+    }
+    assert stored == expected
+    assert stored_bins == bins
+    return stored, stored_bins
+
+
+def test_bulk_update_adjusts_rollups_in_a_few_queries(client, admin_headers, zone_and_source):
+    from tests.conftest import assert_max_queries
+
+    zone_id, source_id = zone_and_source
+    items = [
+        {
+            "type": "upsert-delta", "value": float(10 + h % 7), "unit": "u",
+            "timestamp": f"2025-07-{1 + h // 24:02d}T{h % 24:02d}:00:00",
+            "zone_id": zone_id, "source_id": source_id,
+        }
+        for h in range(72)
+    ]
+    assert client.post("/indicators/bulk", headers=admin_headers, json=items).status_code == 200
+    rollups_of("upsert-delta")
+
+    # Anciens min (10) et max (16) remplacés, nouvelles valeurs extrêmes,
+    # valeurs inchangées et unité seule modifiée
+    changed = [
+        {**item, "value": {10.0: 13.0, 16.0: 12.0, 11.0: -4.0, 15.0: 99.0}.get(item["value"], item["value"])}
+        for item in items
+    ]
+    changed[3] = {**changed[3], "unit": "v"}
+    resp = client.post("/indicators/bulk", headers=admin_headers, json=changed)
+    assert resp.status_code == 200
+    assert_max_queries(resp, 16)
+    rollups_of("upsert-delta")
+
+    # Retour aux valeurs d'origine : les cases vidées disparaissent
+    assert client.post("/indicators/bulk", headers=admin_headers, json=items).status_code == 200
+    _, bins = rollups_of("upsert-delta")
+    assert all(count > 0 for count in bins.values())
+
+
+def test_upsert_split_with_a_concurrent_writer(zone_and_source):
+    from datetime import datetime
+
+    from sqlalchemy import event
+
+    from app.services.indicators import insert_indicators, upsert_indicators
+
+    zone_id, source_id = zone_and_source
+
+    def row(hour: int, value: float) -> dict:
+        return {
+            "type": "upsert-race", "value": value, "unit": "u", "timestamp": datetime(2025, 8, 1, hour),
+            "zone_id": zone_id, "source_id": source_id, "extra_data": None,
+        }
+
+    ours = TestingSessionLocal()
+    fired = []
+
+    def concurrent_write(conn, cursor, statement, parameters, context, executemany):
+        # Un autre écrivain valide juste avant l'INSERT du lot (même clé + une autre ligne)
+        if fired or not statement.startswith("INSERT INTO indicators"):
+            return
+        fired.append(True)
+        with TestingSessionLocal() as other:
+            insert_indicators(other, [row(0, 1.0), row(5, 7.0)])
+            other.commit()
+
+    event.listen(ours.get_bind(), "before_cursor_execute", concurrent_write)
+    try:
+        # heure 0 : déjà écrite par l'autre écrivain -> mise à jour ; heure 1 : insertion
+        assert upsert_indicators(ours, [row(0, 3.0), row(1, 4.0)]) == (1, 1)
+        ours.commit()
+    finally:
+        event.remove(ours.get_bind(), "before_cursor_execute", concurrent_write)
+        ours.close()
+    assert fired
+
+    stored, _ = rollups_of("upsert-race")
+    month = stored[("month", zone_id, source_id, datetime(2025, 8, 1))]
+    assert month[2:] == (3, 3.0, 7.0)
@@ -0,0 +1,260 @@
+# tests/test_ingestion.py
+
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.indicator import Indicator
+from app.models.ingestion_state import IngestionState
+from app.models.rollup import IndicatorRollup
+from app.models.zone import Zone
+from app.models.source import Source
+from app.services.indicators import dedupe_indicators
+from app.services.ingestion.csv_pollution import ingest_pollution_csv
+from app.services.ingestion.open_meteo import City, ingest_open_meteo_for_cities
+from tests.conftest import TestingSessionLocal
+
+
+def test_csv_ingestion_streams_chunks_and_resolves_zones(tmp_path):
+    csv_path = tmp_path / "pollution.csv"
+    lines = ["date,zone_name,postal_code,indicator_type,value,unit"]
+    for i in range(7):
+        zone = ["CsvLyon", "CsvNice", "CsvLille"][i % 3]
+        lines.append(f"2025-04-0{i + 1}T08:00:00,{zone},{i % 3}0000,CSV_NO2,{10 * (i + 1)},µg/m3")
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    db = TestingSessionLocal()
+    try:
+        db.add(Zone(name="CsvLyon", postal_code="00000"))
+        db.commit()
+
+        # chunk de 3 : plusieurs transactions, zones créées au fil des paquets
+        assert ingest_pollution_csv(db, str(csv_path), chunk_size=3) == 7
+
+        zones = db.execute(
+            select(Zone.name, func.count()).where(Zone.name.like("Csv%")).group_by(Zone.name)
+        ).all()
+        assert sorted(zones) == [("CsvLille", 1), ("CsvLyon", 1), ("CsvNice", 1)]
+
+        count, total = db.execute(
+            select(func.count(), func.sum(Indicator.value)).where(Indicator.type == "CSV_NO2")
+        ).one()
+        assert (count, total) == (7, 280)
+
+        rollup_count = db.execute(
+            select(func.sum(IndicatorRollup.value_count)).where(
+                IndicatorRollup.type == "CSV_NO2", IndicatorRollup.granularity == "day"
+            )
+        ).scalar()
+        assert rollup_count == 7
+
+        # Réimport du même fichier : aucune ligne en plus
+        assert ingest_pollution_csv(db, str(csv_path), chunk_size=3) == 0
+        count = db.execute(
+            select(func.count()).where(Indicator.type == "CSV_NO2")
+        ).scalar()
+        assert count == 7
+    finally:
+        db.close()
+
+
+def test_dedupe_keeps_latest_row_per_natural_key(tmp_path):
+    # Base "d'avant" la clé naturelle : table sans l'index unique
+    engine = create_engine(f"sqlite:///{tmp_path / 'dedupe.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ux_indicators_natural_key"))
+
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add_all([Zone(name="DedupeCity"), Source(name="DedupeSource")])
+        db.flush()
+        for value, hour in ((1.0, 0), (2.0, 0), (3.0, 1)):
+            db.add(
+                Indicator(
+                    type="PM10",
+                    value=value,
+                    unit="u",
+                    timestamp=datetime(2025, 1, 1, hour),
+                    zone_id=1,
+                    source_id=1,
+                )
+            )
+        db.commit()
+
+        assert dedupe_indicators(db) == 1
+        db.commit()
+        values = db.execute(select(Indicator.value).order_by(Indicator.timestamp)).scalars()
+        assert list(values) == [2.0, 3.0]
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def open_meteo_stub():
+    """
+    Faux Open-Meteo local : 3 heures par ville. Latitude 1 -> 503 au
+    premier appel (réessayé), latitude 2 -> 404 (ville ignorée).
+    """
+    calls = Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            lat = float(parse_qs(urlparse(self.path).query)["latitude"][0])
+            calls[lat] += 1
+            if lat == 2 or (lat == 1 and calls[lat] == 1):
+                self.send_response(404 if lat == 2 else 503)
+                self.end_headers()
+                return
+            body = json.dumps({
+                "hourly": {
+                    "time": [f"2025-05-01T0{h}:00" for h in range(3)],
+                    "temperature_2m": [lat + h for h in range(3)],
+                    "windspeed_10m": [10.0] * 3,
+                }
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/forecast", calls
+    server.shutdown()
+
+
+def test_open_meteo_cities_fetched_concurrently_with_retries(open_meteo_stub):
+    url, calls = open_meteo_stub
+    cities = [City(f"MeteoCity{i}", f"9900{i}", float(i), 2.0) for i in range(6)]
+
+    db = TestingSessionLocal()
+    try:
+        inserted = ingest_open_meteo_for_cities(
+            db, cities, url=url, concurrency=3, backoff=0.01, batch_size=7
+        )
+        # 5 villes (la 404 est ignorée) x 3 heures x 2 indicateurs
+        assert inserted == 30
+        assert calls[1.0] == 2 and calls[2.0] == 1
+
+        per_zone = dict(
+            db.execute(
+                select(Zone.name, func.count(Indicator.id))
+                .join(Indicator, Indicator.zone_id == Zone.id)
+                .where(Zone.name.like("MeteoCity%"))
+                .group_by(Zone.name)
+            ).all()
+        )
+        assert per_zone == {f"MeteoCity{i}": 6 for i in (0, 1, 3, 4, 5)}
+
+        # Nouveau passage, mêmes heures et mêmes valeurs : rien n'est réécrit
+        assert ingest_open_meteo_for_cities(db, cities, url=url, backoff=0.01) == 0
+        count = db.execute(
+            select(func.count())
+            .select_from(Indicator)
+            .join(Zone, Indicator.zone_id == Zone.id)
+            .where(Zone.name.like("MeteoCity%"))
+        ).scalar()
+        assert count == 30
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def open_meteo_window_stub():
+    """
+    Faux Open-Meteo qui respecte past_hours / forecast_hours autour de
+    state["now"] ; les valeurs dépendent de state["version"].
+    """
+    state = {"now": None, "version": 0, "params": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            state["params"].append(query)
+            first = state["now"] - timedelta(hours=int(query["past_hours"]))
+            hours = [
+                first + timedelta(hours=h)
+                for h in range(int(query["past_hours"]) + int(query["forecast_hours"]))
+            ]
+            body = json.dumps({
+                "hourly": {
+                    "time": [h.isoformat(timespec="minutes") for h in hours],
+                    "temperature_2m": [h.hour + state["version"] for h in hours],
+                    "windspeed_10m": [5.0] * len(hours),
+                }
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/forecast", state
+    server.shutdown()
+
+
+def test_open_meteo_fetches_after_high_water_mark(open_meteo_window_stub):
+    url, state = open_meteo_window_stub
+    cities = [City("MarkCity", "98000", 45.0, 2.0)]
+
+    db = TestingSessionLocal()
+    try:
+        # 1er passage : fenêtre par défaut (24 h passées + 24 h de prévision)
+        state["now"] = datetime(2025, 6, 1, 10)
+        assert ingest_open_meteo_for_cities(db, cities, url=url, now=state["now"]) == 96
+        assert state["params"][-1]["past_hours"] == "24"
+
+        zone_id = db.execute(select(Zone.id).where(Zone.name == "MarkCity")).scalar()
+        marks = db.execute(
+            select(IngestionState.type, IngestionState.last_observed_at)
+            .where(IngestionState.zone_id == zone_id)
+            .order_by(IngestionState.type)
+        ).all()
+        assert marks == [
+            ("temperature", datetime(2025, 6, 1, 9)),
+            ("windspeed", datetime(2025, 6, 1, 9)),
+        ]
+
+        # 3 h plus tard, prévisions révisées : seules les heures après la
+        # marque sont demandées ; 10 h-12 h passent de prévision à observation
+        state["now"] = datetime(2025, 6, 1, 13)
+        state["version"] = 1
+        written = ingest_open_meteo_for_cities(db, cities, url=url, now=state["now"])
+        assert state["params"][-1]["past_hours"] == "4"
+        # température : 24 heures réécrites (valeurs changées) + 3 nouvelles ;
+        # vent : 3 heures devenues observations + 3 nouvelles
+        assert written == 27 + 6
+
+        rows = db.execute(
+            select(Indicator.timestamp, Indicator.value, Indicator.extra_data)
+            .where(Indicator.zone_id == zone_id, Indicator.type == "temperature")
+            .order_by(Indicator.timestamp)
+        ).all()
+        assert len(rows) == 51
+        observed = [row for row in rows if not row.extra_data.get("forecast")]
+        assert observed[-1].timestamp == datetime(2025, 6, 1, 12)
+        assert observed[-1].value == 12 + 1
+        assert rows[-1].timestamp == datetime(2025, 6, 2, 12)
+    finally:
+        db.close()
@@ -0,0 +1,35 @@
+# tests/test_metrics.py
+
+from app.core.metrics import metrics
+
+
+def test_metrics_endpoint_exposes_route_histograms(client, admin_headers, zone_and_source):
+    metrics.clear()
+    zone_id, _ = zone_and_source
+    client.get(f"/zones/{zone_id}", headers=admin_headers)
+    client.get(f"/zones/{zone_id}", headers=admin_headers)
+    client.get("/zones/999999", headers=admin_headers)
+    client.get("/does-not-exist")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = resp.text.splitlines()
+
+    # gabarit de route, pas le chemin : une seule série pour toutes les zones
+    ok = 'method="GET",route="/zones/{zone_id}",status="200"'
+    assert f"ecotrack_http_request_duration_seconds_count{{{ok}}} 2" in lines
+    assert f'ecotrack_http_request_duration_seconds_bucket{{{ok},le="+Inf"}} 2' in lines
+    assert 'ecotrack_http_request_duration_seconds_count{method="GET",route="/zones/{zone_id}",status="404"} 1' in lines
+    assert 'ecotrack_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in lines
+    size_sum = next(line for line in lines if line.startswith(f"ecotrack_http_response_size_bytes_sum{{{ok}}}"))
+    assert float(size_sum.split()[-1]) > 0
+    # la requête /metrics en cours est comptée
+    assert "ecotrack_http_requests_in_flight 1" in lines
+
+    # buckets cumulés et croissants
+    buckets = [
+        int(line.split()[-1]) for line in lines
+        if line.startswith(f"ecotrack_http_request_duration_seconds_bucket{{{ok},")
+    ]
+    assert buckets == sorted(buckets) and buckets[-1] == 2
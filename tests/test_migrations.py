@@ -0,0 +1,152 @@
+# tests/test_migrations.py
+import os
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from app.db.base import Base
+import app.models  # noqa: F401
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config(url: str) -> Config:
+    # Sans alembic.ini : env.py ne reconfigure pas le logging des autres tests
+    cfg = Config()
+    cfg.set_main_option("script_location", os.path.join(ROOT_DIR, "alembic"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    return cfg
+
+
+def test_upgrade_head_on_empty_database_matches_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+    cfg = alembic_config(url)
+    command.upgrade(cfg, "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+
+    # Aller-retour complet
+    command.downgrade(cfg, "base")
+    with engine.connect() as conn:
+        assert MigrationContext.configure(conn).get_current_revision() is None
+    command.upgrade(cfg, "head")
+    engine.dispose()
+
+
+def test_upgrade_head_after_api_startup(tmp_path):
+    """Base à la révision initiale, démarrée par l'API (create_all) avant la migration."""
+    from app.main import prepare_database
+
+    url = f"sqlite:///{tmp_path / 'started.db'}"
+    cfg = alembic_config(url)
+    command.upgrade(cfg, "5ec696f3174c")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO zones (id, name) VALUES (1, 'Z')"))
+        conn.execute(text("INSERT INTO sources (id, name) VALUES (1, 'S')"))
+        conn.execute(
+            text(
+                "INSERT INTO indicators (type, value, unit, timestamp, zone_id, source_id) "
+                "VALUES ('PM10', :value, 'u', :ts, 1, 1)"
+            ),
+            [{"value": v, "ts": f"2025-01-0{v} 10:00:00.000000"} for v in (1, 2, 3)],
+        )
+    prepare_database(engine)
+
+    def month_totals():
+        with engine.connect() as conn:
+            return tuple(
+                conn.execute(
+                    text(
+                        "SELECT sum(value_sum), sum(value_sumsq), sum(value_count) "
+                        "FROM indicator_rollups WHERE granularity = 'month'"
+                    )
+                ).one()
+            )
+
+    # La migration des rollups recalcule toutes les colonnes du modèle courant
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM indicator_rollups"))
+    command.upgrade(cfg, "c4e8a1f0b6d2")
+    assert month_totals() == (6.0, 14.0, 3)
+
+    command.upgrade(cfg, "head")
+    assert month_totals() == (6.0, 14.0, 3)
+    with engine.connect() as conn:
+        bins = conn.execute(
+            text("SELECT sum(value_count) FROM indicator_rollup_bins WHERE granularity = 'day'")
+        ).scalar()
+        assert bins == 3
+    engine.dispose()
+
+
+def test_api_startup_upgrades_database_created_without_alembic(tmp_path, client, admin_headers):
+    """Base au schéma de départ (sans clé naturelle ni index) servie directement par l'API."""
+    from sqlalchemy import inspect
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.deps import get_db, principal_cache
+    from app.core.security import get_password_hash
+    from app.main import app, prepare_database
+    from app.services.stats_cache import stats_cache
+
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    command.upgrade(alembic_config(url), "5ec696f3174c")
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (email, hashed_password, role, is_active) "
+                "VALUES ('admin-fixture@test.local', :password, 'admin', 1)"
+            ),
+            {"password": get_password_hash("admin123")},
+        )
+        conn.execute(text("INSERT INTO zones (id, name) VALUES (1, 'Z')"))
+        conn.execute(text("INSERT INTO sources (id, name) VALUES (1, 'S')"))
+        # Doublon de clé naturelle : la ligne la plus récente est gardée
+        conn.execute(
+            text(
+                "INSERT INTO indicators (type, value, unit, timestamp, zone_id, source_id) "
+                "VALUES ('legacy', :value, 'u', '2025-01-01 10:00:00.000000', 1, 1)"
+            ),
+            [{"value": 1.0}, {"value": 2.0}],
+        )
+
+    prepare_database(engine)
+    indexes = {ix["name"] for ix in inspect(engine).get_indexes("indicators")}
+    assert {
+        "ux_indicators_natural_key",
+        "ix_indicators_type_zone_timestamp",
+        "ix_indicators_source_timestamp",
+        "ix_indicators_timestamp",
+    } <= indexes
+
+    LegacySession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def legacy_db():
+        with LegacySession() as db:
+            yield db
+
+    previous = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = legacy_db
+    stats_cache.clear()
+    principal_cache.clear()
+    try:
+        item = {"type": "legacy", "value": 5.0, "unit": "u", "timestamp": "2025-01-02T10:00:00",
+                "zone_id": 1, "source_id": 1}
+        assert client.post("/indicators/", headers=admin_headers, json=item).status_code == 201
+        assert client.post("/indicators/", headers=admin_headers, json=item).status_code == 409
+        bulk = client.post("/indicators/bulk", headers=admin_headers, json=[{**item, "value": 6.0}])
+        assert bulk.status_code == 200
+        average = client.get("/stats/average?indicator_type=legacy", headers=admin_headers).json()
+    finally:
+        app.dependency_overrides[get_db] = previous
+        stats_cache.clear()
+        principal_cache.clear()
+    assert (average["count"], average["average"]) == (2, 4.0)
+    engine.dispose()
@@ -0,0 +1,100 @@
+# tests/test_profiling.py
+
+import time
+
+from app.api.deps import principal_cache
+
+
+def test_request_profiling_is_admin_only(client, admin_headers):
+    client.post(
+        "/auth/register",
+        json={"email": "profiled@example.com", "password": "password123", "role": "user", "is_active": True},
+    )
+    token = client.post(
+        "/auth/login", data={"username": "profiled@example.com", "password": "password123"}
+    ).json()["access_token"]
+    user_headers = {"Authorization": f"Bearer {token}"}
+    # Cache de tokens vide : le contrôle admin lit la base de test (get_db surchargé)
+    principal_cache.clear()
+
+    assert client.get("/zones/", headers={"X-Profile": "tree"}).status_code == 401
+    assert client.get("/zones/", headers={**user_headers, "X-Profile": "tree"}).status_code == 403
+    assert client.get("/zones/", headers={**admin_headers, "X-Profile": "svg"}).status_code == 400
+
+    resp = client.get("/zones/", headers={**admin_headers, "X-Profile": "tree"})
+    assert resp.status_code == 200
+    assert resp.headers["x-profile-status"] == "200"
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert resp.text.startswith("Durée ")
+    assert "server-timing" in resp.headers  # nombre de requêtes SQL de la requête profilée
+
+    resp = client.get("/zones/999999", headers={**admin_headers, "X-Profile": "folded"})
+    assert resp.headers["x-profile-status"] == "404"
+
+
+def run_profiled_workload() -> "RequestSampler":
+    """Requête simulée (boucle + threadpool) pendant qu'un autre thread travaille."""
+    import asyncio
+    import sys
+    import threading
+
+    import anyio.to_thread
+
+    from app.api.profiling import RequestSampler, _session
+
+    def spin(seconds: float) -> None:
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def request_work() -> None:
+        spin(0.05)
+
+    def other_traffic(stop: threading.Event) -> None:
+        while not stop.is_set():
+            spin(0.001)
+
+    async def handler() -> RequestSampler:
+        sampler = RequestSampler(0.001)
+        _session.set(sampler)
+        sampler.start(sys._getframe())
+        try:
+            spin(0.03)  # dans la boucle d'événements
+            await anyio.to_thread.run_sync(request_work)  # dans le threadpool
+            await asyncio.sleep(0.02)  # attente : pas d'échantillon
+        finally:
+            sampler.stop()
+        return sampler
+
+    stop = threading.Event()
+    other = threading.Thread(target=other_traffic, args=(stop,))
+    other.start()
+    try:
+        sampler = asyncio.run(handler())
+    finally:
+        stop.set()
+        other.join()
+    return sampler
+
+
+def test_request_sampler_keeps_only_the_profiled_request():
+    sampler = run_profiled_workload()
+    folded = sampler.folded()
+    assert "other_traffic" not in folded
+    roots = {stack[0] for stack in sampler.stacks}
+    assert roots == {"[boucle d'événements]", "[threadpool]"}
+    assert any("request_work" in label for stack in sampler.stacks for label in stack)
+    sampled = sum(sampler.stacks.values())
+    assert 0 < sampled < sampler.ticks
+    assert "request_work" in sampler.tree()
+
+
+def test_request_sampler_without_anyio_worker_internals(monkeypatch):
+    # anyio renomme sa variable locale : plus de piles du threadpool, pas d'erreur
+    from app.api import profiling
+
+    monkeypatch.setattr(profiling, "_WORKER_CONTEXT_LOCAL", "renamed_in_a_future_anyio")
+    sampler = run_profiled_workload()
+    assert {stack[0] for stack in sampler.stacks} == {"[boucle d'événements]"}
+    assert "request_work" not in sampler.folded()
+    assert "other_traffic" not in sampler.folded()
@@ -0,0 +1,952 @@
+# tests/test_stats.py
+
+import math
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models.indicator import Indicator
+
+TEST_DATABASE_URL = "sqlite:///./test_ecotrack.db"
+
+engine = create_engine(
+    TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine
+)
+
+TYPE = "rollup-test"
+
+
+def raw_average(zone_id, from_date=None, to_date=None):
+    db = TestingSessionLocal()
+    try:
+        query = db.query(func.avg(Indicator.value), func.count(Indicator.id)).filter(
+            Indicator.type == TYPE, Indicator.zone_id == zone_id
+        )
+        if from_date is not None:
+            query = query.filter(Indicator.timestamp >= from_date)
+        if to_date is not None:
+            query = query.filter(Indicator.timestamp <= to_date)
+        return query.one()
+    finally:
+        db.close()
+
+
+def raw_timeseries(zone_id, group_by, from_date=None, to_date=None, indicator_type=TYPE):
+    db = TestingSessionLocal()
+    try:
+        if group_by == "day":
+            period = func.date(Indicator.timestamp)
+        else:
+            period = func.strftime("%Y-%m", Indicator.timestamp)
+        query = db.query(
+            period.label("period"), func.avg(Indicator.value), func.count(Indicator.id)
+        ).filter(Indicator.type == indicator_type, Indicator.zone_id == zone_id)
+        if from_date is not None:
+            query = query.filter(Indicator.timestamp >= from_date)
+        if to_date is not None:
+            query = query.filter(Indicator.timestamp <= to_date)
+        return [tuple(row) for row in query.group_by("period").order_by("period")]
+    finally:
+        db.close()
+
+
+def raw_buckets(zone_id, seconds, origin=0, from_date=None, to_date=None):
+    """Référence Python des cases de largeur fixe : [(libellé, moyenne, nombre)]."""
+    db = TestingSessionLocal()
+    try:
+        query = db.query(Indicator.timestamp, Indicator.value).filter(
+            Indicator.type == TYPE, Indicator.zone_id == zone_id
+        )
+        if from_date is not None:
+            query = query.filter(Indicator.timestamp >= from_date)
+        if to_date is not None:
+            query = query.filter(Indicator.timestamp <= to_date)
+        acc = {}
+        for timestamp, value in query:
+            seconds_since_epoch = int((timestamp - datetime(1970, 1, 1)).total_seconds())
+            start = (seconds_since_epoch - origin) // seconds * seconds + origin
+            acc.setdefault(start, []).append(value)
+    finally:
+        db.close()
+
+    points = []
+    for start, values in sorted(acc.items()):
+        label = datetime(1970, 1, 1) + timedelta(seconds=start)
+        label = label.date().isoformat() if seconds % 86400 == 0 else label.isoformat()
+        points.append((label, sum(values) / len(values), len(values)))
+    return points
+
+
+def raw_values(zone_id, from_date=None, to_date=None):
+    db = TestingSessionLocal()
+    try:
+        query = db.query(Indicator.value).filter(
+            Indicator.type == TYPE, Indicator.zone_id == zone_id
+        )
+        if from_date is not None:
+            query = query.filter(Indicator.timestamp >= from_date)
+        if to_date is not None:
+            query = query.filter(Indicator.timestamp <= to_date)
+        return sorted(value for (value,) in query)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def rollup_data(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    rng = random.Random(7)
+    start = datetime(2025, 1, 20)
+    items = [
+        {
+            "type": TYPE,
+            "value": round(rng.uniform(-5, 30), 2),
+            "unit": "u",
+            "timestamp": (start + timedelta(minutes=minute)).isoformat(),
+            "zone_id": zone_id,
+            "source_id": source_id,
+        }
+        # Minutes distinctes : une seule mesure par instant (clé naturelle)
+        for minute in rng.sample(range(90 * 24 * 60), 800)
+    ]
+    resp = client.post("/indicators/bulk", headers=admin_headers, json=items)
+    assert resp.json()["inserted"] == 800
+    return zone_id
+
+
+RANGES = [
+    (None, None),
+    ("2025-02-03T13:27:00", None),
+    (None, "2025-03-15T08:10:30"),
+    ("2025-02-03T13:27:00", "2025-03-15T08:10:30"),
+    ("2025-02-01T00:00:00", "2025-03-01T00:00:00"),
+    ("2025-02-10T10:15:00", "2025-02-10T10:45:00"),
+]
+
+
+@pytest.mark.parametrize("from_date,to_date", RANGES)
+def test_rollup_stats_match_raw_rows(client, admin_headers, rollup_data, from_date, to_date):
+    zone_id = rollup_data
+    params = {"indicator_type": TYPE, "zone_id": zone_id}
+    if from_date:
+        params["from_date"] = from_date
+    if to_date:
+        params["to_date"] = to_date
+
+    from_dt = datetime.fromisoformat(from_date) if from_date else None
+    to_dt = datetime.fromisoformat(to_date) if to_date else None
+
+    expected_avg, expected_count = raw_average(zone_id, from_dt, to_dt)
+    resp = client.get("/stats/average", headers=admin_headers, params=params)
+    if expected_count == 0:
+        assert resp.status_code == 404
+        return
+    assert resp.json()["count"] == expected_count
+    assert resp.json()["average"] == pytest.approx(expected_avg)
+
+    for group_by in ("day", "month"):
+        resp = client.get(
+            "/stats/timeseries", headers=admin_headers, params={**params, "group_by": group_by}
+        )
+        expected = raw_timeseries(zone_id, group_by, from_dt, to_dt)
+        points = resp.json()["raw_points"]
+        assert [p["period"] for p in points] == [row[0] for row in expected]
+        assert [p["count"] for p in points] == [row[2] for row in expected]
+        assert [p["average"] for p in points] == pytest.approx([row[1] for row in expected])
+
+
+# (group_by, interval, largeur en s, origine en s) ; semaines alignées sur le lundi
+BUCKETS = [
+    ("15min", None, 900, 0),
+    ("hour", None, 3600, 0),
+    ("week", None, 7 * 86400, 4 * 86400),
+    ("day", "90min", 5400, 0),
+    ("day", "2h", 7200, 0),
+    ("day", "3d", 3 * 86400, 0),
+]
+
+
+@pytest.mark.parametrize("group_by,interval,seconds,origin", BUCKETS)
+@pytest.mark.parametrize("from_date,to_date", RANGES[:4])
+def test_bucketed_timeseries_match_raw_rows(
+    client, admin_headers, rollup_data, group_by, interval, seconds, origin, from_date, to_date
+):
+    zone_id = rollup_data
+    params = {"indicator_type": TYPE, "zone_id": zone_id, "group_by": group_by}
+    if interval:
+        params["interval"] = interval
+    if from_date:
+        params["from_date"] = from_date
+    if to_date:
+        params["to_date"] = to_date
+
+    resp = client.get("/stats/timeseries", headers=admin_headers, params=params)
+    assert resp.status_code == 200
+    points = [(p["period"], p["average"], p["count"]) for p in resp.json()["raw_points"]]
+    assert_same_points(
+        points,
+        raw_buckets(
+            zone_id, seconds, origin,
+            datetime.fromisoformat(from_date) if from_date else None,
+            datetime.fromisoformat(to_date) if to_date else None,
+        ),
+    )
+
+
+def test_timeseries_gap_filling(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    for hour, value in ((1, 10.0), (2, 20.0), (5, 50.0)):
+        client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "gap-fill",
+                "value": value,
+                "unit": "u",
+                "timestamp": f"2025-09-01T{hour:02d}:30:00",
+                "zone_id": zone_id,
+                "source_id": source_id,
+            },
+        )
+
+    def series(fill, **params):
+        resp = client.get(
+            "/stats/timeseries",
+            headers=admin_headers,
+            params={
+                "indicator_type": "gap-fill", "zone_id": zone_id, "group_by": "hour",
+                "from_date": "2025-09-01T00:00:00", "to_date": "2025-09-01T06:59:59",
+                "fill": fill, **params,
+            },
+        )
+        assert resp.status_code == 200
+        return resp.json()
+
+    data = series("null")
+    assert data["labels"] == [f"2025-09-01T{h:02d}:00:00" for h in range(7)]
+    assert data["series"][0]["data"] == [None, 10.0, 20.0, None, None, 50.0, None]
+    assert [p["count"] for p in data["raw_points"]] == [0, 1, 1, 0, 0, 1, 0]
+    assert series("previous")["series"][0]["data"] == [None, 10.0, 20.0, 20.0, 20.0, 50.0, 50.0]
+    assert series("linear")["series"][0]["data"] == pytest.approx(
+        [None, 10.0, 20.0, 30.0, 40.0, 50.0, None]
+    )
+    assert series("none")["labels"] == [f"2025-09-01T{h:02d}:00:00" for h in (1, 2, 5)]
+    # Même remplissage avec un intervalle quelconque
+    assert series("null", interval="2h")["series"][0]["data"] == [10.0, 20.0, 50.0, None]
+
+    bad = client.get(
+        "/stats/timeseries",
+        headers=admin_headers,
+        params={"indicator_type": "gap-fill", "interval": "15 minutes"},
+    )
+    assert bad.status_code == 400
+    too_many = client.get(
+        "/stats/timeseries",
+        headers=admin_headers,
+        params={
+            "indicator_type": "gap-fill", "interval": "1s", "fill": "null",
+            "from_date": "2000-01-01T00:00:00", "to_date": "2025-09-02T00:00:00",
+        },
+    )
+    assert too_many.status_code == 400
+
+
+def test_timeseries_and_series_downsampling(client, admin_headers, rollup_data):
+    zone_id = rollup_data
+    base = {"indicator_type": TYPE, "zone_id": zone_id}
+    full = client.get(
+        "/stats/timeseries", headers=admin_headers, params={**base, "group_by": "hour"}
+    ).json()["raw_points"]
+    assert len(full) > 50
+
+    for method in ("lttb", "minmax"):
+        resp = client.get(
+            "/stats/timeseries",
+            headers=admin_headers,
+            params={**base, "group_by": "hour", "max_points": 50, "downsample": method},
+        )
+        assert resp.status_code == 200
+        points = resp.json()["raw_points"]
+        assert 2 < len(points) <= 50
+        # Sous-ensemble ordonné des points d'origine
+        assert [p for p in full if p in points] == points
+        if method == "lttb":
+            assert points[0] == full[0] and points[-1] == full[-1]
+        else:
+            averages = [p["average"] for p in points]
+            assert min(averages) == min(p["average"] for p in full)
+            assert max(averages) == max(p["average"] for p in full)
+
+    # POST /stats/batch : même réduction, série par série
+    reduce = {"group_by": "hour", "max_points": 50, "downsample": "minmax"}
+    body = {"series": [base, {"indicator_type": TYPE}], **reduce}
+    batch = client.post("/stats/batch", headers=admin_headers, json=body).json()
+    assert len(batch["labels"]) < len(full)
+    for item, params in zip(batch["series"], body["series"]):
+        expected = client.get(
+            "/stats/timeseries", headers=admin_headers, params={**params, **reduce}
+        ).json()["raw_points"]
+        got = [(label, value) for label, value in zip(batch["labels"], item["data"]) if value is not None]
+        assert got == [(p["period"], p["average"]) for p in expected]
+    assert client.post(
+        "/stats/batch", headers=admin_headers, json={**body, "max_points": 2}
+    ).status_code == 400
+
+    resp = client.get(
+        "/stats/series", headers=admin_headers, params={**base, "max_points": 100}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["count"] == 800 and data["returned"] == 100
+    assert len(data["timestamps"]) == len(data["values"]) == 100
+    assert data["timestamps"] == sorted(data["timestamps"])
+    everything = client.get(
+        "/stats/series", headers=admin_headers, params={**base, "max_points": 1000}
+    ).json()
+    assert everything["returned"] == 800
+    assert everything["timestamps"][0] == data["timestamps"][0]
+    assert everything["timestamps"][-1] == data["timestamps"][-1]
+
+    for path in ("/stats/timeseries", "/stats/series"):
+        bad = client.get(path, headers=admin_headers, params={**base, "max_points": 2})
+        assert bad.status_code == 400, path
+    missing = client.get("/stats/series", headers=admin_headers, params={"indicator_type": "absent"})
+    assert missing.status_code == 404
+
+
+def test_numpy_options_without_numpy(client, admin_headers, rollup_data, monkeypatch):
+    import sys
+
+    from app.services.stats_cache import stats_cache
+
+    # numpy absent : 501 explicite pour les options qui en dépendent, le reste répond
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    stats_cache.clear()
+    base = {"indicator_type": TYPE, "zone_id": rollup_data}
+    for path, params in (
+        ("/stats/series", {}),
+        ("/stats/timeseries", {"group_by": "hour", "max_points": 50}),
+        ("/stats/timeseries", {"group_by": "hour", "fill": "null"}),
+    ):
+        resp = client.get(path, headers=admin_headers, params={**base, **params})
+        assert resp.status_code == 501, (path, params)
+        assert "numpy" in resp.json()["detail"]
+    plain = client.get("/stats/timeseries", headers=admin_headers, params={**base, "group_by": "hour"})
+    assert plain.status_code == 200
+
+
+def test_rollups_follow_updates_and_deletes(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    created = []
+    for minute, value in enumerate((10.0, 20.0, 30.0)):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "rollup-crud",
+                "value": value,
+                "unit": "u",
+                "timestamp": f"2025-06-01T12:0{minute}:00",
+                "zone_id": zone_id,
+                "source_id": source_id,
+            },
+        )
+        created.append(resp.json()["id"])
+
+    url = f"/stats/average?indicator_type=rollup-crud&zone_id={zone_id}"
+    assert client.get(url, headers=admin_headers).json()["average"] == 20.0
+
+    client.patch(f"/indicators/{created[0]}", headers=admin_headers, json={"value": 40.0})
+    assert client.get(url, headers=admin_headers).json()["average"] == 30.0
+
+    client.delete(f"/indicators/{created[2]}", headers=admin_headers)
+    data = client.get(url, headers=admin_headers).json()
+    assert (data["average"], data["count"]) == (30.0, 2)
+
+    # Changement de type : la valeur quitte les rollups de l'ancien type
+    client.patch(f"/indicators/{created[1]}", headers=admin_headers, json={"type": "rollup-other"})
+    data = client.get(url, headers=admin_headers).json()
+    assert (data["average"], data["count"]) == (40.0, 1)
+
+
+@pytest.mark.parametrize("from_date,to_date", RANGES)
+def test_summary_matches_raw_rows(client, admin_headers, rollup_data, from_date, to_date):
+    zone_id = rollup_data
+    params = {"indicator_type": TYPE, "zone_id": zone_id}
+    if from_date:
+        params["from_date"] = from_date
+    if to_date:
+        params["to_date"] = to_date
+
+    values = raw_values(
+        zone_id,
+        datetime.fromisoformat(from_date) if from_date else None,
+        datetime.fromisoformat(to_date) if to_date else None,
+    )
+    resp = client.get("/stats/summary", headers=admin_headers, params=params)
+    if not values:
+        assert resp.status_code == 404
+        return
+
+    data = resp.json()
+    n = len(values)
+    mean = sum(values) / n
+    assert data["count"] == n
+    assert data["average"] == pytest.approx(mean)
+    assert (data["min"], data["max"]) == (values[0], values[-1])
+    assert data["stddev"] == pytest.approx(
+        math.sqrt(sum((v - mean) ** 2 for v in values) / n), rel=1e-6, abs=1e-9
+    )
+    for name, q in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99)):
+        # Erreur relative de l'histogramme : 1 % (marge pour les valeurs proches de 0)
+        assert data["percentiles"][name] == pytest.approx(values[int(q * (n - 1))], rel=0.011, abs=0.01)
+
+
+def test_summary_follows_updates_and_deletes(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    created = []
+    for minute, value in enumerate((10.0, 20.0, 30.0, 40.0)):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "summary-crud",
+                "value": value,
+                "unit": "u",
+                "timestamp": f"2025-06-01T12:0{minute}:00",
+                "zone_id": zone_id,
+                "source_id": source_id,
+            },
+        )
+        created.append(resp.json()["id"])
+
+    url = f"/stats/summary?indicator_type=summary-crud&zone_id={zone_id}"
+    data = client.get(url, headers=admin_headers).json()
+    assert (data["count"], data["min"], data["max"]) == (4, 10.0, 40.0)
+    assert data["percentiles"]["p99"] == pytest.approx(30.0, rel=0.01)
+
+    client.patch(f"/indicators/{created[0]}", headers=admin_headers, json={"value": 100.0})
+    client.delete(f"/indicators/{created[3]}", headers=admin_headers)
+    data = client.get(url, headers=admin_headers).json()
+    assert (data["count"], data["min"], data["max"]) == (3, 20.0, 100.0)
+    assert data["stddev"] == pytest.approx(math.sqrt(((20 - 50) ** 2 + (30 - 50) ** 2 + 50**2) / 3))
+    assert data["percentiles"]["p50"] == pytest.approx(30.0, rel=0.01)
+    assert data["percentiles"]["p99"] == pytest.approx(30.0, rel=0.01)
+
+
+@pytest.mark.parametrize("from_date,to_date", RANGES[:4])
+def test_stats_batch_matches_timeseries(client, admin_headers, rollup_data, from_date, to_date):
+    zone_id = rollup_data
+    body = {
+        "series": [
+            {"indicator_type": TYPE, "zone_id": zone_id},
+            {"indicator_type": TYPE},
+            {"indicator_type": "batch-missing", "zone_id": zone_id},
+        ],
+        "group_by": "day",
+        "from_date": from_date,
+        "to_date": to_date,
+    }
+    resp = client.post("/stats/batch", headers=admin_headers, json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+
+    params = {"indicator_type": TYPE, "group_by": "day"}
+    if from_date:
+        params["from_date"] = from_date
+    if to_date:
+        params["to_date"] = to_date
+    for item in data["series"][:2]:
+        single = client.get(
+            "/stats/timeseries",
+            headers=admin_headers,
+            params={**params, **({"zone_id": item["zone_id"]} if item["zone_id"] else {})},
+        ).json()
+        # Tableaux alignés sur les labels communs, None là où il n'y a rien
+        points = {p["period"]: p for p in single["raw_points"]}
+        assert len(item["data"]) == len(data["labels"])
+        assert [label for label in data["labels"] if label in points] == single["labels"]
+        assert item["data"] == pytest.approx(
+            [points[label]["average"] if label in points else None for label in data["labels"]]
+        )
+        assert item["counts"] == [
+            points[label]["count"] if label in points else 0 for label in data["labels"]
+        ]
+
+    assert data["series"][2]["data"] == [None] * len(data["labels"])
+
+
+def test_stats_batch_shares_timeseries_cache(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    client.post(
+        "/indicators/",
+        headers=admin_headers,
+        json={
+            "type": "batch-cache",
+            "value": 5.0,
+            "unit": "u",
+            "timestamp": "2025-08-01T10:00:00",
+            "zone_id": zone_id,
+            "source_id": source_id,
+        },
+    )
+    body = {"series": [{"indicator_type": "batch-cache", "zone_id": zone_id}]}
+
+    before = client.get("/stats/cache", headers=admin_headers).json()
+    assert client.post("/stats/batch", headers=admin_headers, json=body).json()["series"][0]["data"] == [5.0]
+    resp = client.get(
+        "/stats/timeseries",
+        headers=admin_headers,
+        params={"indicator_type": "batch-cache", "zone_id": zone_id},
+    )
+    assert resp.json()["labels"] == ["2025-08-01"]
+    after = client.get("/stats/cache", headers=admin_headers).json()
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (1, 1)
+
+    # Une écriture invalide la série, qu'elle vienne du batch ou de /timeseries
+    client.post(
+        "/indicators/",
+        headers=admin_headers,
+        json={
+            "type": "batch-cache",
+            "value": 15.0,
+            "unit": "u",
+            "timestamp": "2025-08-01T11:00:00",
+            "zone_id": zone_id,
+            "source_id": source_id,
+        },
+    )
+    assert client.post("/stats/batch", headers=admin_headers, json=body).json()["series"][0]["data"] == [10.0]
+
+
+def test_conditional_get_with_etags(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    other_zone = client.post("/zones/", headers=admin_headers, json={"name": "ETagZone"}).json()["id"]
+
+    def add(zone, value, hour):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "etag-test", "value": value, "unit": "u",
+                "timestamp": f"2025-10-01T{hour:02d}:00:00",
+                "zone_id": zone, "source_id": source_id,
+            },
+        )
+        assert resp.status_code == 201
+
+    add(zone_id, 1.0, 0)
+    paths = [
+        f"/stats/average?indicator_type=etag-test&zone_id={zone_id}",
+        f"/stats/timeseries?indicator_type=etag-test&zone_id={zone_id}",
+        f"/stats/summary?indicator_type=etag-test&zone_id={zone_id}",
+        f"/indicators/?indicator_type=etag-test&zone_id={zone_id}",
+    ]
+    etags = {}
+    for path in paths:
+        resp = client.get(path, headers=admin_headers)
+        assert resp.status_code == 200
+        etags[path] = resp.headers["etag"]
+    assert len(set(etags.values())) == len(paths)  # une empreinte par URL
+
+    # Rien n'a changé : 304 sans corps, sans passer par le calcul (ni le cache)
+    before = client.get("/stats/cache", headers=admin_headers).json()
+    for path in paths:
+        resp = client.get(path, headers={**admin_headers, "If-None-Match": etags[path]})
+        assert resp.status_code == 304, path
+        assert resp.content == b"" and resp.headers["etag"] == etags[path]
+    after = client.get("/stats/cache", headers=admin_headers).json()
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+
+    # Sans authentification, toujours 401
+    assert client.get(paths[0], headers={"If-None-Match": etags[paths[0]]}).status_code == 401
+
+    # Écriture dans une autre zone : la portée (type, zone) ne bouge pas,
+    # la portée "toutes zones" du type si
+    all_zones = "/stats/average?indicator_type=etag-test"
+    all_etag = client.get(all_zones, headers=admin_headers).headers["etag"]
+    add(other_zone, 3.0, 1)
+    assert client.get(paths[0], headers={**admin_headers, "If-None-Match": etags[paths[0]]}).status_code == 304
+    resp = client.get(all_zones, headers={**admin_headers, "If-None-Match": all_etag})
+    assert resp.status_code == 200 and resp.json()["average"] == 2.0
+
+    add(zone_id, 5.0, 2)
+    resp = client.get(paths[0], headers={**admin_headers, "If-None-Match": etags[paths[0]]})
+    assert resp.status_code == 200
+    assert resp.json()["average"] == 3.0 and resp.headers["etag"] != etags[paths[0]]
+
+
+def test_etag_changes_after_a_write_from_another_process(client, admin_headers, zone_and_source):
+    zone_id, source_id = zone_and_source
+    path = f"/indicators/?indicator_type=etag-process&zone_id={zone_id}"
+    etag = client.get(path, headers=admin_headers).headers["etag"]
+
+    # Autre processus (ingestion, autre worker) : aucun listener de celui-ci n'est prévenu
+    script = (
+        "from datetime import datetime\n"
+        "from app.db.session import SessionLocal\n"
+        "from app.services.indicators import insert_indicators\n"
+        "with SessionLocal() as db:\n"
+        f"    insert_indicators(db, [dict(type='etag-process', value=2.0, unit='u', "
+        f"timestamp=datetime(2025, 10, 2), zone_id={zone_id}, source_id={source_id})])\n"
+        "    db.commit()\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        env={**os.environ, "DATABASE_URL": TEST_DATABASE_URL},
+    )
+
+    resp = client.get(path, headers={**admin_headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert [row["value"] for row in resp.json()] == [2.0] and resp.headers["etag"] != etag
+
+
+def test_ttl_cache_lru_and_expiry():
+    from app.core.cache import TTLCache
+
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" devient le plus récent
+    cache.set("c", 3)  # évince "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_stats_cache_hits_and_scoped_invalidation(client, admin_headers):
+    zones = []
+    for name in ("CacheA", "CacheB"):
+        zones.append(client.post("/zones/", headers=admin_headers, json={"name": name}).json()["id"])
+    source_id = client.post(
+        "/sources/", headers=admin_headers, json={"name": "CacheSource"}
+    ).json()["id"]
+
+    def add(zone_id, value):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "cache-test",
+                "value": value,
+                "unit": "u",
+                "timestamp": (datetime(2025, 7, 1, 10) + timedelta(minutes=value)).isoformat(),
+                "zone_id": zone_id,
+                "source_id": source_id,
+            },
+        )
+        assert resp.status_code == 201
+
+    def average(zone_id=None):
+        params = {"indicator_type": "cache-test"}
+        if zone_id is not None:
+            params["zone_id"] = zone_id
+        return client.get("/stats/average", headers=admin_headers, params=params).json()
+
+    add(zones[0], 10.0)
+    add(zones[1], 20.0)
+
+    before = client.get("/stats/cache", headers=admin_headers).json()
+    assert average(zones[0])["average"] == 10.0
+    assert average(zones[0])["average"] == 10.0
+    assert average()["average"] == 15.0
+    after = client.get("/stats/cache", headers=admin_headers).json()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+
+    # Écriture dans la zone B : l'entrée de la zone A reste valide,
+    # l'entrée "toutes zones" est invalidée.
+    add(zones[1], 30.0)
+    assert average(zones[0])["average"] == 10.0
+    assert average()["average"] == 20.0
+    final = client.get("/stats/cache", headers=admin_headers).json()
+    assert final["hits"] - after["hits"] == 1
+
+
+@pytest.fixture
+def series_cache(monkeypatch):
+    """Cache de séries activé pour le test, branché sur les commits."""
+    from app.core.config import settings
+    from app.services import indicators as indicator_service
+    from app.services import series_cache as series_cache_module
+
+    cache = series_cache_module.SeriesCache(max_points=10_000)
+    monkeypatch.setattr(settings, "SERIES_CACHE_MAX_POINTS", cache.max_points)
+    monkeypatch.setattr(series_cache_module, "get_series_cache", lambda: cache)
+    monkeypatch.setattr(indicator_service, "_row_listeners", [cache.on_committed])
+    return cache
+
+
+def cached_timeseries(
+    zone_id, group_by, from_date=None, to_date=None, indicator_type=TYPE, interval=None
+):
+    from app.services import stats as stats_service
+
+    db = TestingSessionLocal()
+    try:
+        points = stats_service.timeseries(
+            db, indicator_type, group_by=group_by,
+            from_date=from_date, to_date=to_date, zone_id=zone_id, interval=interval,
+        )
+        return [(p["period"], p["average"], p["count"]) for p in points]
+    finally:
+        db.close()
+
+
+def assert_same_points(points, expected):
+    assert [p[0] for p in points] == [row[0] for row in expected]
+    assert [p[2] for p in points] == [row[2] for row in expected]
+    assert [p[1] for p in points] == pytest.approx([row[1] for row in expected])
+
+
+@pytest.mark.parametrize("from_date,to_date", RANGES)
+def test_series_cache_matches_sql(rollup_data, series_cache, from_date, to_date):
+    zone_id = rollup_data
+    from_dt = datetime.fromisoformat(from_date) if from_date else None
+    to_dt = datetime.fromisoformat(to_date) if to_date else None
+
+    for group_by in ("day", "month"):
+        assert_same_points(
+            cached_timeseries(zone_id, group_by, from_dt, to_dt),
+            raw_timeseries(zone_id, group_by, from_dt, to_dt),
+        )
+    for group_by, interval, seconds, origin in BUCKETS:
+        assert_same_points(
+            cached_timeseries(zone_id, group_by, from_dt, to_dt, interval=interval),
+            raw_buckets(zone_id, seconds, origin, from_dt, to_dt),
+        )
+    # Série brute réduite : même résultat que la lecture SQL (filtre source)
+    from app.services import stats as stats_service
+
+    db = TestingSessionLocal()
+    try:
+        source_id = (
+            db.query(Indicator.source_id)
+            .filter(Indicator.type == TYPE, Indicator.zone_id == zone_id)
+            .first()[0]
+        )
+        for method in ("lttb", "minmax"):
+            params = dict(from_date=from_dt, to_date=to_dt, zone_id=zone_id, max_points=40, downsample=method)
+            assert stats_service.raw_series(db, TYPE, **params) == stats_service.raw_series(
+                db, TYPE, source_id=source_id, **params
+            )
+    finally:
+        db.close()
+    # Une seule lecture en base pour tous les regroupements
+    assert (series_cache.misses, series_cache.hits) == (1, 3 + len(BUCKETS))
+
+
+def test_series_cache_appends_on_write(client, admin_headers, zone_and_source, series_cache):
+    zone_id, source_id = zone_and_source
+
+    def add(timestamp, value):
+        resp = client.post(
+            "/indicators/",
+            headers=admin_headers,
+            json={
+                "type": "series-test",
+                "value": value,
+                "unit": "u",
+                "timestamp": timestamp,
+                "zone_id": zone_id,
+                "source_id": source_id,
+            },
+        )
+        assert resp.status_code == 201
+        return resp.json()["id"]
+
+    def check():
+        assert_same_points(
+            cached_timeseries(zone_id, "day", indicator_type="series-test"),
+            raw_timeseries(zone_id, "day", indicator_type="series-test"),
+        )
+
+    add("2025-08-02T10:00:00", 10.0)
+    add("2025-08-03T10:00:00", 20.0)
+    check()
+    assert series_cache.stats()["points"] == 2
+
+    # Ajouts (dont un point plus ancien) : complétés en mémoire, sans relecture
+    add("2025-08-03T11:00:00", 40.0)
+    first_id = add("2025-08-01T10:00:00", 5.0)
+    check()
+    assert series_cache.misses == 1
+    assert series_cache.stats()["points"] == 4
+
+    # Modification : la série est oubliée puis relue
+    client.patch(f"/indicators/{first_id}", headers=admin_headers, json={"value": 7.0})
+    check()
+    assert series_cache.misses == 2
+
+
+def test_series_cache_reloads_after_a_write_from_another_process(
+    client, admin_headers, zone_and_source, series_cache
+):
+    from sqlalchemy import insert
+
+    from app.services import data_versions
+
+    zone_id, source_id = zone_and_source
+
+    def row(hour, value):
+        return {
+            "type": "series-process", "value": value, "unit": "u",
+            "timestamp": f"2025-08-05T{hour:02d}:00:00", "zone_id": zone_id, "source_id": source_id,
+        }
+
+    def check():
+        assert_same_points(
+            cached_timeseries(zone_id, "day", indicator_type="series-process"),
+            raw_timeseries(zone_id, "day", indicator_type="series-process"),
+        )
+
+    def write_elsewhere(hour, value):
+        # Comme generate_dataset ou un autre worker : version incrémentée
+        # en base, aucun listener de ce processus prévenu
+        db = TestingSessionLocal()
+        try:
+            item = row(hour, value)
+            db.execute(insert(Indicator), [{**item, "timestamp": datetime.fromisoformat(item["timestamp"])}])
+            data_versions.bump(db, {("series-process", zone_id)})
+            db.commit()
+        finally:
+            db.close()
+
+    assert client.post("/indicators/", headers=admin_headers, json=row(0, 1.0)).status_code == 201
+    check()
+    assert series_cache.misses == 1
+
+    # Version en base plus récente que la série : relue
+    write_elsewhere(1, 3.0)
+    check()
+    assert series_cache.misses == 2
+
+    # Écriture manquée puis ajout dans ce processus : version sautée, série
+    # oubliée au lieu d'être complétée
+    write_elsewhere(2, 5.0)
+    assert client.post("/indicators/", headers=admin_headers, json=row(3, 7.0)).status_code == 201
+    assert series_cache.stats()["series"] == 0
+    check()
+    assert series_cache.misses == 3
+
+
+def test_series_cache_lru_eviction(rollup_data):
+    from app.services.indicators import insert_indicators
+    from app.services.series_cache import SeriesCache
+
+    zone_id = rollup_data
+    db = TestingSessionLocal()
+    try:
+        source_id = db.query(Indicator.source_id).filter(Indicator.zone_id == zone_id).first()[0]
+        insert_indicators(
+            db,
+            [
+                {
+                    "type": "lru-test",
+                    "value": float(i),
+                    "unit": "u",
+                    "timestamp": datetime(2025, 9, 1) + timedelta(hours=i),
+                    "zone_id": zone_id,
+                    "source_id": source_id,
+                    "extra_data": None,
+                }
+                for i in range(300)
+            ],
+        )
+        db.commit()
+
+        cache = SeriesCache(max_points=1000)
+        assert len(cache.get(db, "lru-none", zone_id)[0]) == 0  # série vide
+        cache.get(db, TYPE, zone_id)  # 800 points
+        cache.get(db, "lru-test", zone_id)  # 300 points : dépasse 1000
+        assert cache.stats()["points"] == 300
+        assert cache.evictions == 2  # la série vide (plus ancienne), puis TYPE
+
+        # La série évincée est relue ; la plus ancienne part à son tour
+        cache.get(db, TYPE, zone_id)
+        assert (cache.misses, cache.evictions) == (4, 3)
+        assert cache.stats()["points"] == 800
+    finally:
+        db.close()
+
+
+def test_stats_on_database_filled_before_rollups(tmp_path, client, admin_headers):
+    """Base antérieure aux rollups : le démarrage les calcule avant de servir /stats."""
+    from sqlalchemy import insert
+
+    from app.api.deps import get_db, principal_cache
+    from app.db.base import Base
+    from app.main import app, prepare_database
+    from app.core.security import get_password_hash
+    from app.models.rollup import IndicatorRollup
+    from app.models.source import Source
+    from app.models.user import User
+    from app.models.zone import Zone
+    from app.services.stats_cache import stats_cache
+
+    raw_engine = create_engine(f"sqlite:///{tmp_path / 'raw.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(
+        bind=raw_engine, tables=[User.__table__, Zone.__table__, Source.__table__, Indicator.__table__]
+    )
+    start = datetime(2025, 11, 20)
+    with raw_engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"email": "admin-fixture@test.local", "hashed_password": get_password_hash("admin123"),
+              "role": "admin", "is_active": True}],
+        )
+        conn.execute(insert(Zone), [{"id": 1, "name": "Raw"}])
+        conn.execute(insert(Source), [{"id": 1, "name": "Raw"}])
+        conn.execute(
+            insert(Indicator),
+            [
+                {"type": "raw-only", "value": float(i), "unit": "u", "timestamp": start + timedelta(minutes=30 * i),
+                 "zone_id": 1, "source_id": 1}
+                for i in range(97)
+            ],
+        )
+
+    prepare_database(raw_engine)
+    RawSession = sessionmaker(autocommit=False, autoflush=False, bind=raw_engine)
+    with RawSession() as db:
+        assert db.query(func.sum(IndicatorRollup.value_count)).filter(
+            IndicatorRollup.granularity == "hour"
+        ).scalar() == 97
+
+    def raw_db():
+        with RawSession() as db:
+            yield db
+
+    previous = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = raw_db
+    stats_cache.clear()
+    principal_cache.clear()
+    try:
+        resp = client.get(
+            "/stats/average?indicator_type=raw-only&zone_id=1"
+            "&from_date=2025-11-20T00:00:00&to_date=2025-11-22T00:00:00",
+            headers=admin_headers,
+        )
+    finally:
+        app.dependency_overrides[get_db] = previous
+        stats_cache.clear()
+        principal_cache.clear()
+    assert resp.status_code == 200
+    assert resp.json()["count"] == 97
+    assert resp.json()["average"] == pytest.approx(48.0)
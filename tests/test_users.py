@@ -0,0 +1,33 @@
+# tests/test_users.py
+
+from app.api.deps import principal_cache
+
+
+def test_principal_cache_is_invalidated_on_user_changes(client, admin_headers):
+    resp = client.post(
+        "/auth/register",
+        json={"email": "cached@example.com", "password": "pw123456", "role": "user"},
+    )
+    assert resp.status_code == 200
+    user_id = resp.json()["id"]
+
+    resp = client.post(
+        "/auth/login", data={"username": "cached@example.com", "password": "pw123456"}
+    )
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/users/me", headers=headers).json()["role"] == "user"
+    hits = principal_cache.hits
+    assert client.get("/users/me", headers=headers).json()["role"] == "user"
+    assert principal_cache.hits == hits + 1
+
+    # Changement de rôle par un admin : le cache ne doit pas servir l'ancien rôle
+    resp = client.patch(f"/users/{user_id}", headers=admin_headers, json={"role": "admin"})
+    assert resp.status_code == 200
+    assert client.get("/users/me", headers=headers).json()["role"] == "admin"
+
+    # Suppression : le token ne doit plus être accepté
+    resp = client.delete(f"/users/{user_id}", headers=admin_headers)
+    assert resp.status_code == 204
+    assert client.get("/users/me", headers=headers).status_code == 401